@@ -3,7 +3,11 @@ JIVY Backend API: hospital flow engine + reasoning (Llama).
 No database — MVP for showcasing agentic AI.
 Run from project root: uvicorn backend.main:app --reload
 """
+import asyncio
+import json
+import os
 import sys
+import threading
 from pathlib import Path
 
 _root = Path(__file__).resolve().parent.parent
@@ -12,8 +16,11 @@ if str(_root) not in sys.path:
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 
+import jivy_metrics as metrics
+
 app = FastAPI(title="JIVY API", version="1.0.0")
 
 app.add_middleware(
@@ -25,33 +32,203 @@ app.add_middleware(
 )
 
 
+def _serialize_record(o):
+    """Make one simulation record JSON-safe (timestamps, etc.)."""
+    rec = dict(o)
+    ts = rec.get("timestamp")
+    if ts is not None and hasattr(ts, "isoformat"):
+        rec["timestamp"] = ts.isoformat()
+    return rec
+
+
 def _serialize_outputs(outputs):
     """Make simulation outputs JSON-safe (timestamps, etc.)."""
-    result = []
-    for o in outputs:
-        rec = dict(o)
-        ts = rec.get("timestamp")
-        if ts is not None and hasattr(ts, "isoformat"):
-            rec["timestamp"] = ts.isoformat()
-        result.append(rec)
-    return result
+    return [_serialize_record(o) for o in outputs]
+
+
+def _sse(data, event=None):
+    """Format one Server-Sent Events message."""
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data)}\n\n"
 
 
 # ----- Simulation (hospital_flow_engine) -----
+class _SimulationCache:
+    """Simulation session plus an index over its serialized outputs and
+    the full JSON payload, rebuilt only when the session reports a change."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.session = None
+        self.generation = None
+        self.index = None
+        self.payload = None
+        self.payload_version = None
+
+    def refresh(self):
+        """Sync with the session; returns the index of serialized records."""
+        from hospital_flow_engine.results import SimulationIndex
+        with self.lock:
+            if self.session is None:
+                from hospital_flow_engine.session import SimulationSession
+                self.session = SimulationSession()
+
+            mode, new_records = self.session.refresh()
+            if self.session.generation != self.generation:
+                self.index = SimulationIndex(_serialize_outputs(self.session.outputs))
+                self.generation = self.session.generation
+            elif mode == "tail":
+                self.index.append(_serialize_outputs(new_records))
+
+            return self.index
+
+    def get(self):
+        index = self.refresh()
+        with self.lock:
+            if self.payload_version != self.session.version:
+                payload = {"ok": True, "outputs": index.records}
+                if self.session.metrics is not None:
+                    payload["metrics"] = self.session.metrics
+                self.payload = json.dumps(payload)
+                self.payload_version = self.session.version
+
+            return self.payload
+
+
+_simulation_cache = _SimulationCache()
+
+
 @app.get("/api/simulation/run")
 def run_simulation():
-    from hospital_flow_engine.simulate import run_simulation as run_sim
+    # Polling costs a stat() of the inputs unless they changed
     try:
-        outputs = run_sim()
-        return {"ok": True, "outputs": _serialize_outputs(outputs)}
+        return Response(_simulation_cache.get(), media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/simulation/stream")
+def stream_simulation():
+    """Push decision records as Server-Sent Events while the engine runs."""
+    from hospital_flow_engine.simulate import iter_simulation
+
+    def events():
+        count = 0
+        try:
+            for record in iter_simulation():
+                count += 1
+                yield _sse(_serialize_record(record))
+        except Exception as e:
+            yield _sse({"ok": False, "detail": str(e)}, event="error")
+            return
+        yield _sse({"ok": True, "count": count}, event="end")
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def _fields(fields):
+    return [f for f in fields.split(",") if f] if fields else None
+
+
+@app.get("/api/simulation/records")
+def simulation_records(
+    patient_id: str | None = None,
+    decision: str | None = None,
+    risk_level: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    cursor: str | None = None,
+    limit: int = 100,
+    fields: str | None = None,
+):
+    """Filtered page of simulation records. Pass next_cursor back as
+    `cursor` for the next page; `fields` is a comma-separated projection."""
+    from hospital_flow_engine.results import project
+    index = _simulation_cache.refresh()
+    generation = _simulation_cache.generation
+
+    position = None
+    if cursor is not None:
+        # Cursors name a position within one simulation generation
+        try:
+            cursor_generation, position = cursor.split(":")
+            position = int(position)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if cursor_generation != str(generation):
+            raise HTTPException(status_code=409, detail="Cursor expired: simulation was re-run")
+
+    try:
+        positions, next_position = index.query(
+            patient_id=patient_id,
+            decision=decision,
+            risk_level=risk_level,
+            since=since,
+            until=until,
+            cursor=position,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    field_list = _fields(fields)
+    return {
+        "ok": True,
+        "records": [project(index.records[p], field_list) for p in positions],
+        "next_cursor": f"{generation}:{next_position}" if next_position is not None else None,
+    }
+
+
+@app.get("/api/patients/{patient_id}/timeline")
+def patient_timeline(patient_id: str, fields: str | None = None):
+    from hospital_flow_engine.results import project
+    index = _simulation_cache.refresh()
+    positions = index.patient_timeline(patient_id)
+    if not positions:
+        raise HTTPException(status_code=404, detail=f"No records for patient {patient_id}")
+
+    field_list = _fields(fields)
+    return {
+        "ok": True,
+        "patient_id": patient_id,
+        "records": [project(index.records[p], field_list) for p in positions],
+    }
+
+
 # ----- Reasoning (Llama) -----
+def _configure_explanation_cache():
+    """Persist explanations next to the backend so they survive restarts.
+    JIVY_EXPLAIN_CACHE_PATH="" keeps the cache in memory only."""
+    from reasoning.cache import configure_cache
+    path = os.environ.get(
+        "JIVY_EXPLAIN_CACHE_PATH",
+        str(Path(__file__).resolve().parent / "jivy_explanations.db"),
+    )
+    ttl = os.environ.get("JIVY_EXPLAIN_CACHE_TTL")
+    return configure_cache(
+        path=path or None,
+        ttl_seconds=float(ttl) if ttl else None,
+    )
+
+
+_explanation_cache = None
+_explanation_cache_lock = threading.Lock()
+
+
+def _get_explanation_cache():
+    """Configure the explanation cache on first use, so importing the app
+    (tests, scripts) never creates the database file."""
+    global _explanation_cache
+    with _explanation_cache_lock:
+        if _explanation_cache is None:
+            _explanation_cache = _configure_explanation_cache()
+        return _explanation_cache
+
+
 class ExplainRequest(BaseModel):
     simulation_record: dict
     audience: str = "doctor"
+    fused: bool = False
 
 
 def _ollama_unavailable_message():
@@ -64,32 +241,111 @@ def _ollama_unavailable_message():
     )
 
 
+# Seconds to wait for the LLM before answering with the engine's explanation
+LLM_TIMEOUT = float(os.environ.get("JIVY_LLM_TIMEOUT", "120"))
+
+
+def _fallback_response(rec, e):
+    """Engine explanation plus a note on why the LLM could not answer."""
+    fallback = rec.get("engine_explanation") or "No explanation available."
+    if isinstance(e, asyncio.TimeoutError):
+        # Checked first: TimeoutError is an OSError since Python 3.11
+        fallback += f"\n\n---\n[LLM timed out after {LLM_TIMEOUT:g}s]"
+    elif isinstance(e, (ConnectionError, OSError)):
+        # Ollama not running (e.g. connection refused on localhost:11434)
+        fallback += "\n\n---\n" + _ollama_unavailable_message()
+    else:
+        err = str(e).lower()
+        if "11434" in err or "connection" in err or "refused" in err or "ollama" in err:
+            fallback += "\n\n---\n" + _ollama_unavailable_message()
+        else:
+            # Other errors (e.g. missing langchain): still return fallback, don't 500
+            fallback += f"\n\n---\n[LLM unavailable: {e!s}]"
+    return {"ok": True, "explanation": fallback, "llm_available": False}
+
+
 @app.post("/api/reasoning/explain")
-def explain(req: ExplainRequest):
+async def explain(req: ExplainRequest):
+    # Async so in-flight LLM calls wait on the event loop instead of
+    # holding threadpool workers that the simulation endpoints need
     rec = req.simulation_record or {}
     audience = req.audience or "doctor"
     try:
-        from reasoning.post_simulation_chain import explain_simulation_output
-        explanation = explain_simulation_output(
+        await asyncio.to_thread(_get_explanation_cache)
+        from reasoning.post_simulation_chain import explain_simulation_output_async
+        explanation = await explain_simulation_output_async(
             simulation_record=rec,
             audience=audience,
+            timeout=LLM_TIMEOUT,
+            fused=req.fused,
         )
         return {"ok": True, "explanation": explanation, "llm_available": True}
-    except (ConnectionError, OSError) as e:
-        # Ollama not running (e.g. connection refused on localhost:11434)
-        fallback = rec.get("engine_explanation") or "No explanation available."
-        fallback += "\n\n---\n" + _ollama_unavailable_message()
-        return {"ok": True, "explanation": fallback, "llm_available": False}
     except Exception as e:
-        err = str(e).lower()
-        if "11434" in err or "connection" in err or "refused" in err or "ollama" in err:
-            fallback = rec.get("engine_explanation") or "No explanation available."
-            fallback += "\n\n---\n" + _ollama_unavailable_message()
-            return {"ok": True, "explanation": fallback, "llm_available": False}
-        # Other errors (e.g. missing langchain): still return fallback, don't 500
-        fallback = rec.get("engine_explanation") or "No explanation available."
-        fallback += f"\n\n---\n[LLM unavailable: {e!s}]"
-        return {"ok": True, "explanation": fallback, "llm_available": False}
+        return _fallback_response(rec, e)
+
+
+@app.post("/api/reasoning/explain/stream")
+async def explain_stream(req: ExplainRequest):
+    """Stream explanation tokens as Server-Sent Events ("token" messages,
+    then "end"; on LLM failure, or no token within LLM_TIMEOUT, a
+    "fallback" event instead)."""
+    rec = req.simulation_record or {}
+    audience = req.audience or "doctor"
+
+    async def events():
+        try:
+            await asyncio.to_thread(_get_explanation_cache)
+            from reasoning.post_simulation_chain import stream_simulation_explanation
+            async for token in stream_simulation_explanation(
+                simulation_record=rec,
+                audience=audience,
+                fused=req.fused,
+                timeout=LLM_TIMEOUT,
+            ):
+                yield _sse({"token": token})
+        except Exception as e:
+            yield _sse(_fallback_response(rec, e), event="fallback")
+            return
+        yield _sse({"ok": True, "llm_available": True}, event="end")
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/api/reasoning/cache")
+def explanation_cache_stats():
+    return {"ok": True, "cache": _get_explanation_cache().stats()}
+
+
+# ----- Metrics -----
+class MetricsToggle(BaseModel):
+    enabled: bool
+    reset: bool = False
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Stage timings and LLM token counts, Prometheus text format."""
+    return Response(
+        metrics.prometheus_text(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@app.get("/api/metrics")
+def metrics_summary():
+    return {"ok": True, "metrics": metrics.summary()}
+
+
+@app.post("/api/metrics")
+def toggle_metrics(req: MetricsToggle):
+    """Turn stage timing on or off at runtime (optionally clearing it)."""
+    if req.reset:
+        metrics.reset()
+    if req.enabled:
+        metrics.enable()
+    else:
+        metrics.disable()
+    return {"ok": True, "enabled": metrics.enabled()}
 
 
 if __name__ == "__main__":
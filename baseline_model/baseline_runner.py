@@ -1,76 +1,145 @@
+# Run from project root:
+#     python -m baseline_model.baseline_runner
+
 import pandas as pd
 import json
+from pathlib import Path
+
+from hospital_flow_engine.engine.rules import (
+    baseline_decision_spec,
+    baseline_risk_spec,
+    compile_rules,
+)
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "data"
+CONFIG_DIR = BASE_DIR / "config"
+
+_tables = None
+
 
 # -------------------------
 # Load data
 # -------------------------
-patients = pd.read_csv("data/patient_snapshot.csv")
-hospital = pd.read_csv("data/hospital_snapshot.csv")
+def load_snapshots(data_dir=DATA_DIR):
+    """
+    (patients, hospital) snapshot frames.
+    """
+    patients = pd.read_csv(Path(data_dir) / "patient_snapshot.csv")
+    hospital = pd.read_csv(Path(data_dir) / "hospital_snapshot.csv")
+    return patients, hospital
+
+
+def load_tables(config_dir=CONFIG_DIR):
+    """
+    (risk table, decision table) compiled from the JSON configs
+    (see engine/rules.py).
+    """
+    with open(Path(config_dir) / "baseline_risk_rules.json") as f:
+        risk_rules = json.load(f)
+
+    with open(Path(config_dir) / "baseline_decision_map.json") as f:
+        decision_map = json.load(f)
+
+    return (
+        compile_rules(baseline_risk_spec(risk_rules)),
+        compile_rules(baseline_decision_spec(decision_map)),
+    )
 
-with open("config/baseline_risk_rules.json") as f:
-    RISK_RULES = json.load(f)
 
-with open("config/baseline_decision_map.json") as f:
-    DECISION_MAP = json.load(f)
+def _default_tables():
+    global _tables
+    if _tables is None:
+        _tables = load_tables()
+    return _tables
+
 
 # -------------------------
 # Risk scoring (static)
 # -------------------------
 def compute_risk(row):
-    if (
-        row["spo2"] < 90
-        or row["heart_rate"] > 120
-        or row["systolic_bp"] < 90
-    ):
-        return "HIGH"
+    return _default_tables()[0].match(row)["risk_level"]
 
-    if (
-        90 <= row["spo2"] <= 94
-        or 100 <= row["heart_rate"] <= 120
-    ):
-        return "MEDIUM"
 
-    return "LOW"
+def compute_risk_frame(patients, risk_table=None):
+    """
+    compute_risk over every row at once.
+    """
+    risk_table = risk_table or _default_tables()[0]
+    columns = {field: patients[field].to_numpy() for field in risk_table.fields}
+    return risk_table.evaluate(columns, len(patients))["risk_level"]
 
 
 # -------------------------
 # Decision logic (static)
 # -------------------------
 def decide_action(risk, icu_beds):
-    action = DECISION_MAP[risk]
+    return _default_tables()[1].match(
+        {"risk_level": risk, "icu_beds_available": icu_beds}
+    )["decision"]
 
-    if action == "ESCALATE" and icu_beds == 0:
-        return "PRIORITIZE"
 
-    return action
+def decide_actions(risks, icu_beds, decision_table=None):
+    """
+    decide_action over whole columns.
+    """
+    decision_table = decision_table or _default_tables()[1]
+    columns = {"risk_level": risks, "icu_beds_available": icu_beds}
+    return decision_table.evaluate(columns, len(risks))["decision"]
 
 
 # -------------------------
 # Run baseline
 # -------------------------
-outputs = []
+def run_baseline(patients, hospital, risk_table=None, decision_table=None):
+    """
+    Baseline decision per patient snapshot, in patient row order.
+
+    Each patient is joined as-of to the latest hospital snapshot at or
+    before its timestamp (the earliest snapshot for patients seen
+    before any), in one sorted merge.
+    """
+    # Both join keys at one resolution (parsed units may differ)
+    snapshots = hospital.assign(
+        _ts=pd.to_datetime(hospital["timestamp"]).astype("datetime64[ns]")
+    )
+    snapshots = snapshots.sort_values("_ts", kind="stable")[["_ts", "icu_beds_available"]]
+
+    keys = pd.to_datetime(patients["timestamp"]).astype("datetime64[ns]")
+    keys = keys.clip(lower=snapshots["_ts"].iloc[0])
+    order = keys.to_numpy().argsort(kind="stable")
+
+    left = pd.DataFrame({"_ts": keys.to_numpy()[order]})
+    joined = pd.merge_asof(left, snapshots, on="_ts", direction="backward")
+
+    icu_beds = joined["icu_beds_available"].to_numpy()[order.argsort()]
+
+    risk = compute_risk_frame(patients, risk_table)
+    decision = decide_actions(risk, icu_beds, decision_table)
+
+    output = pd.DataFrame({
+        "patient_id": patients["patient_id"].to_numpy(),
+        "timestamp": patients["timestamp"].to_numpy(),
+        "risk_level": risk,
+        "decision": decision,
+    })
+    output["explanation"] = (
+        output["decision"] + " due to " + output["risk_level"] + " risk at snapshot"
+    )
+    return output
 
-for _, row in patients.iterrows():
-    timestamp = row["timestamp"]
-    hosp_state = hospital[hospital["timestamp"] == timestamp].iloc[0]
 
-    risk = compute_risk(row)
-    decision = decide_action(risk, hosp_state["icu_beds_available"])
+def main():
+    patients, hospital = load_snapshots()
+    output_df = run_baseline(patients, hospital)
 
-    explanation = f"{decision} due to {risk} risk at snapshot"
+    # -------------------------
+    # Save output
+    # -------------------------
+    output_df.to_csv(DATA_DIR / "baseline_output.csv", index=False)
 
-    outputs.append({
-        "patient_id": row["patient_id"],
-        "timestamp": timestamp,
-        "risk_level": risk,
-        "decision": decision,
-        "explanation": explanation
-    })
+    print("Baseline decisions generated successfully.")
 
-# -------------------------
-# Save output
-# -------------------------
-output_df = pd.DataFrame(outputs)
-output_df.to_csv("data/baseline_output.csv", index=False)
 
-print("Baseline decisions generated successfully.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Side-by-side comparison of the static baseline and the temporal engine.
+Run from project root:
+    python compare_engines.py [--patients PATH] [--chunk-rows N] [--out report.json]
+
+Both engines see the same rows, read once in chunks:
+- the baseline scores each chunk in one vectorized pass
+- the temporal engine streams the rows through one retained RiskAgent
+
+Decisions are joined per row (patient / timestamp) and folded into
+running totals, so memory stays bounded by the number of patients
+rather than the number of rows.
+"""
+import argparse
+import json
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from baseline_model.baseline_runner import load_tables, run_baseline
+from hospital_flow_engine.engine.risk_engine import RiskAgent
+from hospital_flow_engine.simulate import DATA_DIR, load_resource_model, simulate_frame
+
+
+# Decisions counted as an escalation by either engine
+ESCALATIONS = ("PRIORITIZE", "ESCALATE")
+
+# Rows read per chunk
+CHUNK_ROWS = 10_000
+
+# Temporal decision of rows still filling their window
+NO_DECISION = "NO_DECISION"
+
+
+def iter_chunks(source=None, chunk_rows=CHUNK_ROWS):
+    """
+    Patient frames of up to `chunk_rows` rows from a CSV path or a
+    DataFrame, with parsed timestamps.
+    """
+    if source is None:
+        source = DATA_DIR / "heart_attack_temporal_5steps.csv"
+
+    if isinstance(source, pd.DataFrame):
+        chunks = (
+            source.iloc[start:start + chunk_rows]
+            for start in range(0, len(source), chunk_rows)
+        )
+    else:
+        chunks = pd.read_csv(source, chunksize=chunk_rows)
+
+    for chunk in chunks:
+        chunk = chunk.copy()
+        chunk["timestamp"] = pd.to_datetime(chunk["timestamp"])
+        yield chunk
+
+
+class EngineComparison:
+    """
+    Running comparison totals.
+
+    - matrix: (baseline decision, temporal decision) row counts
+    - first escalation time per patient and engine, for lead times
+    - seconds spent in each engine, for throughput
+    """
+
+    def __init__(self):
+        self.matrix = Counter()
+        self.rows = 0
+        self.first_escalation = {"baseline": {}, "temporal": {}}
+        self.seconds = {"baseline": 0.0, "temporal": 0.0}
+        self.wall_seconds = 0.0
+
+    def add(self, patient_ids, timestamps, baseline, temporal):
+        """
+        Fold one chunk of row-aligned decisions into the totals.
+        """
+        self.rows += len(baseline)
+        self.matrix.update(zip(baseline, temporal))
+
+        for engine, decisions in (("baseline", baseline), ("temporal", temporal)):
+            first = self.first_escalation[engine]
+            for pid, ts, decision in zip(patient_ids, timestamps, decisions):
+                if decision in ESCALATIONS and (pid not in first or ts < first[pid]):
+                    first[pid] = ts
+
+    def lead_times(self):
+        """
+        Minutes by which the temporal engine escalated before the
+        baseline, for patients both engines escalated.
+        """
+        baseline = self.first_escalation["baseline"]
+        temporal = self.first_escalation["temporal"]
+        return [
+            (baseline[pid] - temporal[pid]).total_seconds() / 60
+            for pid in baseline.keys() & temporal.keys()
+        ]
+
+    def report(self):
+        decided = {k: v for k, v in self.matrix.items() if k[1] != NO_DECISION}
+        decided_rows = sum(decided.values())
+
+        same = sum(n for (b, t), n in decided.items() if b == t)
+        same_escalation = sum(
+            n for (b, t), n in decided.items()
+            if (b in ESCALATIONS) == (t in ESCALATIONS)
+        )
+
+        matrix = {}
+        for (b, t), n in sorted(self.matrix.items()):
+            matrix.setdefault(b, {})[t] = n
+
+        leads = np.array(self.lead_times())
+        baseline = self.first_escalation["baseline"]
+        temporal = self.first_escalation["temporal"]
+
+        lead_time = {
+            "patients_escalated_by_both": int(leads.size),
+            "temporal_earlier": int((leads > 0).sum()),
+            "baseline_earlier": int((leads < 0).sum()),
+            "same_time": int((leads == 0).sum()),
+            "temporal_only": len(temporal.keys() - baseline.keys()),
+            "baseline_only": len(baseline.keys() - temporal.keys()),
+        }
+        if leads.size:
+            lead_time.update({
+                "mean_minutes": float(leads.mean()),
+                "median_minutes": float(np.median(leads)),
+                "min_minutes": float(leads.min()),
+                "max_minutes": float(leads.max()),
+            })
+
+        return {
+            "rows": self.rows,
+            "decided_rows": decided_rows,
+            "agreement": {
+                "matrix": matrix,
+                "same_decision_rate": same / decided_rows if decided_rows else 0.0,
+                "same_escalation_rate": (
+                    same_escalation / decided_rows if decided_rows else 0.0
+                ),
+            },
+            "lead_time": lead_time,
+            "throughput": {
+                "wall_seconds": self.wall_seconds,
+                **{
+                    f"{engine}_rows_per_second": (
+                        self.rows / seconds if seconds else None
+                    )
+                    for engine, seconds in self.seconds.items()
+                },
+            },
+        }
+
+
+def _hospital_snapshots(resource_model, hospital_id):
+    """
+    One hospital's snapshots in the baseline's shape.
+    """
+    state = resource_model.state
+    state = state[state["hospital_id"] == hospital_id]
+    return pd.DataFrame({
+        "timestamp": state["timestamp"].to_numpy(),
+        "icu_beds_available": (
+            state["icu_beds_total"] - state["icu_beds_occupied"]
+        ).clip(lower=0).to_numpy(),
+    })
+
+
+def _baseline_chunk(chunk, hospital_ids, snapshots, resource_model, tables):
+    """
+    Baseline decisions for a chunk, row-aligned, each row joined to its
+    own hospital's snapshots.
+    """
+    # The temporal cohort names systolic pressure "sbp" and has no SpO2;
+    # a missing SpO2 never meets a threshold
+    frame = pd.DataFrame({
+        "patient_id": chunk["patient_id"].to_numpy(),
+        "timestamp": chunk["timestamp"].to_numpy(),
+        "heart_rate": chunk["heart_rate"].to_numpy(),
+        "systolic_bp": chunk["sbp"].to_numpy(),
+        "spo2": chunk["spo2"].to_numpy() if "spo2" in chunk else np.nan,
+    })
+
+    decisions = np.empty(len(frame), dtype=object)
+    for hospital_id, positions in pd.Series(hospital_ids).groupby(hospital_ids).indices.items():
+        if hospital_id not in snapshots:
+            snapshots[hospital_id] = _hospital_snapshots(resource_model, hospital_id)
+
+        output = run_baseline(frame.iloc[positions], snapshots[hospital_id], *tables)
+        decisions[positions] = output["decision"].to_numpy()
+
+    return decisions
+
+
+def compare_engines(source=None, chunk_rows=CHUNK_ROWS, resource_model=None,
+                    window_size=5):
+    """
+    Run both engines over `source` (CSV path or DataFrame) and return
+    the comparison report.
+    """
+    wall = time.perf_counter()
+
+    resource_model = resource_model or load_resource_model()
+    tables = load_tables()
+    risk_agent = RiskAgent(window_size=window_size)
+
+    comparison = EngineComparison()
+    snapshots = {}
+
+    for chunk in iter_chunks(source, chunk_rows):
+        if "hospital_id" in chunk:
+            hospital_ids = chunk["hospital_id"].fillna(resource_model.default_hospital_id)
+            hospital_ids = hospital_ids.to_numpy()
+        else:
+            hospital_ids = np.full(len(chunk), resource_model.default_hospital_id, dtype=object)
+
+        # ---- Baseline (vectorized per chunk) ----
+        t = time.perf_counter()
+        baseline = _baseline_chunk(chunk, hospital_ids, snapshots, resource_model, tables)
+        comparison.seconds["baseline"] += time.perf_counter() - t
+
+        # ---- Temporal engine (streaming, retained agent) ----
+        t = time.perf_counter()
+        records = dict(simulate_frame(chunk, resource_model, risk_agent, batch=False))
+        temporal = [
+            records[idx]["decision"] if idx in records else NO_DECISION
+            for idx in chunk.index
+        ]
+        comparison.seconds["temporal"] += time.perf_counter() - t
+
+        comparison.add(
+            chunk["patient_id"].tolist(),
+            chunk["timestamp"].tolist(),
+            baseline.tolist(),
+            temporal,
+        )
+
+    comparison.wall_seconds = time.perf_counter() - wall
+    return comparison.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--patients", type=Path, default=None)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    report = compare_engines(args.patients, args.chunk_rows)
+    text = json.dumps(report, indent=2)
+
+    if args.out:
+        args.out.write_text(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+RiskAgent checkpoints for warm restarts.
+
+A checkpoint is one .npz file (np.savez, no pickled objects) holding:
+- the agent's state (RiskAgent.state_arrays: per-patient windows,
+  last deterioration times, last risk states)
+- window_size / incremental and the engine version that wrote it
+- the stream position it covers: rows consumed and, for CSV sources,
+  the byte offset plus a hash of the bytes just before it
+
+Restoring rebuilds the agent from arrays, so restart cost grows with the
+census, not with the length of the history that produced it.
+
+iter_checkpointed_simulation() streams a patient CSV, checkpointing every
+`every_rows` rows / `every_seconds` seconds, and on start resumes from the
+checkpoint's byte offset when it still matches the file (otherwise it
+replays from the top).
+
+Run from project root:
+    python -m hospital_flow_engine.checkpoint --checkpoint agent.npz
+"""
+import argparse
+import hashlib
+import io
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from hospital_flow_engine.engine.risk_engine import RISK_ENGINE_VERSION, RiskAgent
+from hospital_flow_engine.simulate import DATA_DIR, _step, load_resource_model
+
+
+# File layout version of the checkpoint itself
+CHECKPOINT_FORMAT = 1
+
+# Bytes before the offset hashed to detect a rewritten source
+SOURCE_CHECK_BYTES = 4096
+
+# Bytes read per block while streaming a CSV
+BLOCK_BYTES = 1 << 20
+
+CHECKPOINT_EVERY_ROWS = 50_000
+
+
+class CheckpointError(ValueError):
+    pass
+
+
+class Checkpoint:
+    """
+    A loaded checkpoint: the restored agent and the stream position.
+    """
+
+    def __init__(self, risk_agent, rows=0, byte_offset=None, source_check=None):
+        self.risk_agent = risk_agent
+        self.rows = rows
+        self.byte_offset = byte_offset
+        self.source_check = source_check
+
+
+def _patient_id_array(ids):
+    array = np.array(ids)
+    if array.dtype.kind not in "iuU" and len(ids):
+        raise CheckpointError("patient ids must be all strings or all integers")
+    return array
+
+
+def save_checkpoint(path, risk_agent, rows=0, byte_offset=None, source_check=None):
+    """
+    Write `risk_agent`'s state and the stream position to `path`.
+    The file is replaced atomically, so a crash mid-write leaves the
+    previous checkpoint intact.
+    """
+    path = Path(path)
+    arrays = risk_agent.state_arrays()
+    arrays["patient_ids"] = _patient_id_array(arrays["patient_ids"])
+
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.savez(
+            f,
+            format=CHECKPOINT_FORMAT,
+            engine_version=RISK_ENGINE_VERSION,
+            window_size=risk_agent.window_size,
+            incremental=risk_agent.incremental,
+            rows=rows,
+            byte_offset=-1 if byte_offset is None else byte_offset,
+            source_check=source_check or "",
+            **arrays,
+        )
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path):
+    """
+    Checkpoint read from `path`. Raises CheckpointError if it was
+    written by another checkpoint format or engine version.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        if int(data["format"]) != CHECKPOINT_FORMAT:
+            raise CheckpointError(f"Unsupported checkpoint format: {int(data['format'])}")
+        if int(data["engine_version"]) != RISK_ENGINE_VERSION:
+            raise CheckpointError(
+                f"Checkpoint from engine version {int(data['engine_version'])}, "
+                f"running {RISK_ENGINE_VERSION}"
+            )
+
+        arrays = {name: data[name] for name in data.files}
+
+    arrays["patient_ids"] = arrays["patient_ids"].tolist()
+    risk_agent = RiskAgent.from_state_arrays(
+        arrays,
+        window_size=int(arrays["window_size"]),
+        incremental=bool(arrays["incremental"]),
+    )
+
+    byte_offset = int(arrays["byte_offset"])
+    return Checkpoint(
+        risk_agent,
+        rows=int(arrays["rows"]),
+        byte_offset=None if byte_offset < 0 else byte_offset,
+        source_check=str(arrays["source_check"]) or None,
+    )
+
+
+# --------------------------------------------------
+# Checkpointed CSV streaming
+# --------------------------------------------------
+def _source_check(f, offset):
+    start = max(offset - SOURCE_CHECK_BYTES, 0)
+    f.seek(start)
+    return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+
+def _resume_point(f, checkpoint_path, window_size, header_end):
+    """
+    (agent, rows, byte offset) to continue from, or None to replay.
+    """
+    if checkpoint_path is None or not Path(checkpoint_path).exists():
+        return None
+
+    try:
+        checkpoint = load_checkpoint(checkpoint_path)
+    except CheckpointError:
+        return None
+
+    offset = checkpoint.byte_offset
+    size = os.fstat(f.fileno()).st_size
+    if (
+        offset is None
+        or offset < header_end
+        or offset > size
+        or checkpoint.risk_agent.window_size != window_size
+        or _source_check(f, offset) != checkpoint.source_check
+    ):
+        return None
+
+    return checkpoint.risk_agent, checkpoint.rows, offset
+
+
+def iter_checkpointed_simulation(source=None, checkpoint_path=None,
+                                 resource_model=None, window_size=5,
+                                 every_rows=CHECKPOINT_EVERY_ROWS,
+                                 every_seconds=None, resume=True):
+    """
+    iter_simulation over a patient CSV, checkpointing to
+    `checkpoint_path` every `every_rows` rows and/or `every_seconds`
+    seconds (checked at block boundaries) and once at the end.
+
+    With resume=True a matching checkpoint is restored and streaming
+    continues from its byte offset; only records for rows after it are
+    yielded. A trailing line without a newline is not read yet.
+    """
+    source = Path(source) if source else DATA_DIR / "heart_attack_temporal_5steps.csv"
+    resource_model = resource_model or load_resource_model()
+
+    with open(source, "rb") as f:
+        header = f.readline()
+        columns = pd.read_csv(io.BytesIO(header)).columns.tolist()
+
+        start = _resume_point(f, checkpoint_path, window_size, len(header)) if resume else None
+        if start is None:
+            risk_agent, rows, offset = RiskAgent(window_size=window_size), 0, len(header)
+        else:
+            risk_agent, rows, offset = start
+
+        saved_rows, saved_at = rows, time.monotonic()
+        f.seek(offset)
+
+        while True:
+            block = f.read(BLOCK_BYTES)
+            if not block:
+                break
+
+            # Blocks end on a line boundary. A final line without a
+            # newline may still be being written: it is left for the
+            # next run, and the offset never moves past it
+            if not block.endswith(b"\n"):
+                block += f.readline()
+            partial = not block.endswith(b"\n")
+            if partial:
+                block = block[:block.rfind(b"\n") + 1]
+            offset += len(block)
+
+            if block.strip():
+                chunk = pd.read_csv(io.BytesIO(block), header=None, names=columns)
+                chunk["timestamp"] = pd.to_datetime(chunk["timestamp"])
+                rows += len(chunk)
+
+                for patient in chunk.to_dict("records"):
+                    record = _step(patient, risk_agent, resource_model)
+                    if record is not None:
+                        yield record
+
+            due = checkpoint_path is not None and (
+                (every_rows and rows - saved_rows >= every_rows)
+                or (every_seconds and time.monotonic() - saved_at >= every_seconds)
+            )
+            if due:
+                save_checkpoint(checkpoint_path, risk_agent, rows, offset, _source_check(f, offset))
+                f.seek(offset)
+                saved_rows, saved_at = rows, time.monotonic()
+
+            if partial:
+                break
+
+        if checkpoint_path is not None and rows != saved_rows:
+            save_checkpoint(checkpoint_path, risk_agent, rows, offset, _source_check(f, offset))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkpointed streaming simulation")
+    parser.add_argument("--source", type=Path, default=None)
+    parser.add_argument("--checkpoint", type=Path, required=True)
+    parser.add_argument("--every-rows", type=int, default=CHECKPOINT_EVERY_ROWS)
+    parser.add_argument("--no-resume", action="store_true")
+    args = parser.parse_args()
+
+    t = time.perf_counter()
+    records = sum(1 for _ in iter_checkpointed_simulation(
+        args.source, args.checkpoint, every_rows=args.every_rows,
+        resume=not args.no_resume
+    ))
+    checkpoint = load_checkpoint(args.checkpoint)
+
+    print(
+        f"{records} new records in {time.perf_counter() - t:.2f}s; "
+        f"checkpoint covers {checkpoint.rows} rows, "
+        f"{len(checkpoint.risk_agent.patient_history)} patients"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Columnar binary store for the engine's CSV inputs.
+
+Each table becomes a directory with one .npy file per column plus a
+manifest.json:
+- numeric columns are stored as-is
+- timestamps as int64 nanoseconds
+- string columns dictionary-encoded (int32 codes + a categories file)
+
+Loaders memory-map the files and read only the requested columns, so
+opening a table costs almost nothing and pages are shared with the OS
+cache instead of being copied into the process.
+
+Ingest the bundled data from project root:
+    python -m hospital_flow_engine.columnar
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "data"
+COLUMNAR_DIR = DATA_DIR / "columnar"
+
+MANIFEST = "manifest.json"
+
+# CSV inputs and the columns holding timestamps
+TABLES = {
+    "heart_attack_temporal_5steps": ("timestamp",),
+    "hospital_state_extended": ("timestamp",),
+    "hospital_static_extended": (),
+    "patient_stream": ("arrival_time",),
+}
+
+
+def _source_fingerprint(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+# --------------------------------------------------
+# Ingest
+# --------------------------------------------------
+def ingest_csv(csv_path, out_dir, timestamp_columns=("timestamp",)):
+    """
+    Convert one CSV into a columnar table directory.
+    """
+    csv_path = Path(csv_path)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    frame = pd.read_csv(csv_path)
+    columns = {}
+
+    for name in frame.columns:
+        series = frame[name]
+
+        if name in timestamp_columns:
+            values = pd.to_datetime(series).to_numpy("datetime64[ns]").view(np.int64)
+            np.save(out_dir / f"{name}.npy", values)
+            columns[name] = {"kind": "timestamp"}
+
+        elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            np.save(out_dir / f"{name}.npy", series.to_numpy())
+            columns[name] = {"kind": "numeric"}
+
+        else:
+            codes, categories = pd.factorize(series, use_na_sentinel=True)
+            np.save(out_dir / f"{name}.npy", codes.astype(np.int32))
+            np.save(
+                out_dir / f"{name}.categories.npy",
+                np.asarray(categories, dtype=str)
+            )
+            columns[name] = {"kind": "dictionary"}
+
+    manifest = {
+        "source": str(csv_path),
+        "source_fingerprint": _source_fingerprint(csv_path),
+        "rows": len(frame),
+        "columns": columns,
+    }
+    (out_dir / MANIFEST).write_text(json.dumps(manifest, indent=2))
+
+    return out_dir
+
+
+def ingest_all(data_dir=DATA_DIR, out_dir=COLUMNAR_DIR):
+    """
+    Convert every engine CSV found in `data_dir`.
+    """
+    written = []
+    for table, timestamp_columns in TABLES.items():
+        csv_path = Path(data_dir) / f"{table}.csv"
+        if csv_path.exists():
+            written.append(
+                ingest_csv(csv_path, Path(out_dir) / table, timestamp_columns)
+            )
+    return written
+
+
+# --------------------------------------------------
+# Load
+# --------------------------------------------------
+def read_manifest(table_dir):
+    return json.loads((Path(table_dir) / MANIFEST).read_text())
+
+
+def is_fresh(table_dir, csv_path):
+    """
+    True when `table_dir` was ingested from the current `csv_path`.
+    """
+    try:
+        manifest = read_manifest(table_dir)
+    except (OSError, ValueError):
+        return False
+    return manifest["source_fingerprint"] == _source_fingerprint(csv_path)
+
+
+def fresh_table(name, data_dir=DATA_DIR, out_dir=COLUMNAR_DIR):
+    """
+    Columnar directory for CSV table `name` if it is up to date, else None.
+    """
+    table_dir = Path(out_dir) / name
+    csv_path = Path(data_dir) / f"{name}.csv"
+    if csv_path.exists() and is_fresh(table_dir, csv_path):
+        return table_dir
+    return None
+
+
+def load_columns(table_dir, columns=None, mmap=True):
+    """
+    {column: array} for the requested columns (all when None), each
+    memory-mapped from disk. Dictionary columns come back as
+    pd.Categorical, timestamps as datetime64[ns].
+    """
+    table_dir = Path(table_dir)
+    manifest = read_manifest(table_dir)
+    mmap_mode = "r" if mmap else None
+
+    names = columns if columns is not None else list(manifest["columns"])
+    result = {}
+
+    for name in names:
+        if name not in manifest["columns"]:
+            continue
+
+        kind = manifest["columns"][name]["kind"]
+        values = np.load(table_dir / f"{name}.npy", mmap_mode=mmap_mode)
+
+        if kind == "timestamp":
+            result[name] = values.view("datetime64[ns]")
+        elif kind == "dictionary":
+            categories = np.load(table_dir / f"{name}.categories.npy")
+            result[name] = pd.Categorical.from_codes(
+                values, categories=categories.astype(object)
+            )
+        else:
+            result[name] = values
+
+    return result
+
+
+def load_frame(table_dir, columns=None, mmap=True):
+    """
+    DataFrame of the requested columns (missing ones are skipped).
+    """
+    return pd.DataFrame(load_columns(table_dir, columns, mmap), copy=False)
+
+
+if __name__ == "__main__":
+    for table_dir in ingest_all():
+        print(f"wrote {table_dir}")
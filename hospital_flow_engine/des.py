@@ -0,0 +1,418 @@
+"""
+Discrete-event admission scheduler.
+
+Replays admission requests (patient_stream.csv) against a regional
+network whose ICU / ward occupancy changes as patients are admitted,
+transferred and discharged, so decide() sees the load its own earlier
+decisions created.
+
+- Arrivals are read in time order and merged with a heap of pending
+  events (discharges, transfer arrivals)
+- Each arrival is decided against its hospital's live occupancy;
+  BLOCK / ESCALATE send the patient to the nearest hospital with
+  capacity (routing index kept in sync with occupancy)
+- Everyone else waits in a per-hospital, per-bed-type priority queue
+  ordered by decision tier, then severity, then arrival
+- Admissions happen whenever a bed is free for the head of a queue;
+  each admission schedules its discharge, and every bed occupied at
+  the start gets a residual-stay discharge
+
+Run from project root:
+    python -m hospital_flow_engine.des [--arrivals N] [--hours H] [--drain]
+"""
+import argparse
+import heapq
+import json
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from hospital_flow_engine.engine.decision_engine import decide
+from hospital_flow_engine.engine.pressure_engine import compute_pressure
+from hospital_flow_engine.engine.routing import HospitalRoutingIndex
+from hospital_flow_engine.simulate import DATA_DIR, TRANSFER_DECISIONS, load_resource_model
+
+
+NS_PER_MINUTE = 60_000_000_000
+
+# Severity score (0-100) -> risk level passed to decide(), highest first
+SEVERITY_LEVELS = ((80, "CRITICAL"), (65, "HIGH"), (45, "MODERATE"))
+
+# Queue tier per decision (lower tiers are admitted first)
+ADMISSION_TIERS = {
+    "PRIORITIZE": 0,
+    "ESCALATE": 0,
+    "ALLOW": 1,
+    "BLOCK": 2,
+    "DELAY": 2,
+    "OBSERVE": 3,
+}
+
+# Travel time of a transfer, and transfers allowed per patient
+TRANSFER_MINUTES = 30
+MAX_TRANSFERS = 2
+
+# Mean length of stay by bed type, scaled by 0.5 + severity / 100
+MEAN_STAY_HOURS = {"icu": 72, "ward": 36}
+
+ICU, WARD = 0, 1
+BEDS = ("icu", "ward")
+
+# Event kinds (CENSUS_DISCHARGE: a patient already in bed at the start;
+# the event's patient slot holds the bed type)
+DISCHARGE, TRANSFER, CENSUS_DISCHARGE = 0, 1, 2
+
+
+def load_arrivals(path=None):
+    arrivals = pd.read_csv(path or DATA_DIR / "patient_stream.csv")
+    arrivals["arrival_time"] = pd.to_datetime(arrivals["arrival_time"])
+    return arrivals
+
+
+def severity_level(severity):
+    for floor, level in SEVERITY_LEVELS:
+        if severity >= floor:
+            return level
+    return "LOW"
+
+
+class AdmissionScheduler:
+    """
+    Discrete-event simulation of admissions over a hospital network.
+
+    Occupancy starts from the resource model's snapshot at `start`
+    (default: first arrival); each bed occupied then is freed after a
+    residual stay drawn from MEAN_STAY_HOURS (exponential stays are
+    memoryless, so the residual has the same mean). Arrivals without a
+    hospital_id are placed in a random hospital. Lengths of stay are
+    drawn from `seed`, so runs are reproducible.
+    """
+
+    def __init__(self, resource_model, arrivals, start=None, seed=0,
+                 record_timeline=False):
+        rng = np.random.default_rng(seed)
+        arrivals = arrivals.sort_values("arrival_time", kind="stable")
+
+        self.resource_model = resource_model
+        self.hospital_ids = resource_model.hospital_ids
+        self._codes = codes = {hid: i for i, hid in enumerate(self.hospital_ids)}
+        hospitals = len(self.hospital_ids)
+
+        # ---- Arrivals as per-patient columns ----
+        self._arrival = arrivals["arrival_time"].to_numpy("datetime64[ns]").view(np.int64)
+        self.patient_ids = arrivals["patient_id"].to_numpy()
+        self._severity = arrivals["severity_score"].to_numpy().tolist()
+        self._bed = np.where(arrivals["requires_icu"].to_numpy() == 1, ICU, WARD).tolist()
+        self._risk = [
+            {"risk_level": severity_level(s), "confidence": 1.0, "reasons": ()}
+            for s in self._severity
+        ]
+
+        if "hospital_id" in arrivals.columns:
+            home = [codes[hid] for hid in arrivals["hospital_id"]]
+        else:
+            home = rng.integers(0, hospitals, len(arrivals)).tolist()
+        self._home = home
+
+        mean_hours = np.where(
+            np.asarray(self._bed) == ICU, MEAN_STAY_HOURS["icu"], MEAN_STAY_HOURS["ward"]
+        ) * (0.5 + np.asarray(self._severity) / 100)
+        self._stay = (rng.exponential(mean_hours) * 60 * NS_PER_MINUTE).astype(np.int64).tolist()
+
+        self._transfers = [0] * len(arrivals)
+
+        # ---- Live occupancy, seeded from the snapshot at start ----
+        if start is None:
+            start = self._arrival[0] if len(arrivals) else pd.Timestamp.now()
+        snapshot = resource_model.network_snapshot(pd.Timestamp(start))
+
+        self._occupied = [
+            snapshot["icu_beds_occupied"].tolist(),
+            snapshot["ward_beds_occupied"].tolist(),
+        ]
+        self._total = [
+            snapshot["icu_beds_total"].tolist(),
+            snapshot["ward_beds_total"].tolist(),
+        ]
+        self._accepting = snapshot["icu_accepting"].tolist()
+        self._ward_available = np.ones(hospitals, dtype=bool)
+
+        last = resource_model.state.groupby("hospital_id", sort=False)[["lat", "long"]].last()
+        last = last.reindex(self.hospital_ids)
+        self.routing = HospitalRoutingIndex(self.hospital_ids, last["lat"], last["long"])
+
+        self._states = [None] * hospitals
+        for code in range(hospitals):
+            self._refresh(code)
+
+        # ---- Queues and events ----
+        self._queues = [([], []) for _ in range(hospitals)]
+        self._events = []
+        self._seq = 0
+        self._next_arrival = 0
+        self.now = pd.Timestamp(start).value
+
+        # ---- Starting census: residual stays ----
+        for bed, name in ((ICU, "icu"), (WARD, "ward")):
+            occupied = np.asarray(self._occupied[bed], dtype=np.int64)
+            codes_in_bed = np.repeat(np.arange(hospitals), occupied)
+            stays = rng.exponential(MEAN_STAY_HOURS[name], len(codes_in_bed))
+            ends = self.now + (stays * 60 * NS_PER_MINUTE).astype(np.int64)
+            for when, code in zip(ends.tolist(), codes_in_bed.tolist()):
+                self._schedule(when, CENSUS_DISCHARGE, bed, code)
+
+        # ---- Statistics ----
+        self.counts = Counter()
+        self.decisions = Counter()
+        self.waits = []
+        self.arrival_pressures = []     # live pressure each arrival was decided at
+        self.admissions = np.zeros(hospitals, dtype=np.int64)
+        self.transfers_in = np.zeros(hospitals, dtype=np.int64)
+        self.transfers_out = np.zeros(hospitals, dtype=np.int64)
+        self.peak_occupied = [list(self._occupied[ICU]), list(self._occupied[WARD])]
+        self.max_queue = np.zeros(hospitals, dtype=np.int64)
+
+        self.timeline = [] if record_timeline else None
+
+    # --------------------------------------------------
+    # Capacity
+    # --------------------------------------------------
+    def _refresh(self, code):
+        """
+        Recompute a hospital's resource state after its occupancy changed.
+        """
+        icu, ward = self._occupied[ICU][code], self._occupied[WARD][code]
+        icu_total, ward_total = self._total[ICU][code], self._total[WARD][code]
+
+        pressure = compute_pressure(
+            {"icu_beds_occupied": icu, "ward_beds_occupied": ward},
+            {"icu_beds_total": icu_total, "ward_beds_total": ward_total}
+        )
+        icu_full = icu >= icu_total
+
+        self._states[code] = {
+            "pressure": pressure,
+            "icu_full": icu_full,
+            "ward_full": ward >= ward_total,
+        }
+        self.routing.pressure[code] = pressure
+        self.routing.icu_available[code] = self._accepting[code] and not icu_full
+        self._ward_available[code] = ward < ward_total
+
+    def _schedule(self, when, kind, patient, code):
+        self._seq += 1
+        heapq.heappush(self._events, (when, self._seq, kind, patient, code))
+
+    # --------------------------------------------------
+    # Event handlers
+    # --------------------------------------------------
+    def _arrive(self, patient, code):
+        state = self._states[code]
+        decision, _ = decide(self._risk[patient], state)
+        self.decisions[decision] += 1
+        self.arrival_pressures.append(state["pressure"])
+
+        if decision in TRANSFER_DECISIONS and self._transfers[patient] < MAX_TRANSFERS:
+            # Route by the bed type the patient needs
+            available = None if self._bed[patient] == ICU else self._ward_available
+            target = self.routing.nearest_from(self.hospital_ids[code], available=available)
+
+            if target is not None:
+                target = self._codes[target["hospital_id"]]
+                self._transfers[patient] += 1
+                self.transfers_out[code] += 1
+                self.counts["transfers"] += 1
+                self._schedule(
+                    self.now + TRANSFER_MINUTES * NS_PER_MINUTE, TRANSFER, patient, target
+                )
+                return
+
+        bed = self._bed[patient]
+        queue = self._queues[code][bed]
+        self._seq += 1
+        heapq.heappush(queue, (
+            ADMISSION_TIERS.get(decision, 1), -self._severity[patient], self._seq, patient
+        ))
+
+        waiting = len(self._queues[code][ICU]) + len(self._queues[code][WARD])
+        if waiting > self.max_queue[code]:
+            self.max_queue[code] = waiting
+
+        self._admit(code, bed)
+
+    def _admit(self, code, bed):
+        """
+        Admit from the head of the queue while beds are free.
+        """
+        queue = self._queues[code][bed]
+        occupied = self._occupied[bed]
+        total = self._total[bed][code]
+
+        if not queue or occupied[code] >= total:
+            return
+
+        while queue and occupied[code] < total:
+            patient = heapq.heappop(queue)[-1]
+            occupied[code] += 1
+
+            self.counts["admissions"] += 1
+            self.admissions[code] += 1
+            self.waits.append((self.now - self._arrival[patient]) / NS_PER_MINUTE)
+            self._schedule(self.now + self._stay[patient], DISCHARGE, patient, code)
+
+        if occupied[code] > self.peak_occupied[bed][code]:
+            self.peak_occupied[bed][code] = occupied[code]
+        self._refresh(code)
+
+    def _discharge(self, bed, code):
+        self._occupied[bed][code] -= 1
+        self.counts["discharges"] += 1
+        self._refresh(code)
+        self._admit(code, bed)
+
+    # --------------------------------------------------
+    # Main loop
+    # --------------------------------------------------
+    def run(self, until=None):
+        """
+        Process events in time order until none remain, or until the
+        next one is past `until` (a later call continues from there).
+        Returns report().
+        """
+        until = pd.Timestamp(until).value if until is not None else None
+        events = self._events
+        arrival = self._arrival
+        n = len(arrival)
+        i = self._next_arrival
+
+        while True:
+            # Pending events at the same instant as an arrival go first,
+            # so beds freed at t are visible to arrivals at t
+            from_heap = events and (i >= n or events[0][0] <= arrival[i])
+            if from_heap:
+                when = events[0][0]
+            elif i < n:
+                when = int(arrival[i])
+            else:
+                break
+
+            # Left in place, so a later run() resumes from here
+            if until is not None and when > until:
+                break
+
+            if from_heap:
+                _, _, kind, patient, code = heapq.heappop(events)
+            else:
+                kind, patient, code = None, i, self._home[i]
+                i += 1
+                self._next_arrival = i
+            self.now = when
+
+            if kind is None:
+                self.counts["arrivals"] += 1
+                self._arrive(patient, code)
+            elif kind == DISCHARGE:
+                self._discharge(self._bed[patient], code)
+            elif kind == CENSUS_DISCHARGE:
+                self._discharge(patient, code)
+            else:
+                self.transfers_in[code] += 1
+                self._arrive(patient, code)
+
+            if self.timeline is not None:
+                self.timeline.append((
+                    when,
+                    sum(self._occupied[ICU]),
+                    sum(self._occupied[WARD]),
+                ))
+
+        return self.report()
+
+    # --------------------------------------------------
+    # Results
+    # --------------------------------------------------
+    def report(self):
+        waits = np.asarray(self.waits)
+        queued = sum(len(q) for pair in self._queues for q in pair)
+        pending = Counter(event[2] for event in self._events)
+
+        wait = {}
+        if waits.size:
+            p50, p95 = np.percentile(waits, [50, 95])
+            wait = {
+                "mean": float(waits.mean()),
+                "p50": float(p50),
+                "p95": float(p95),
+                "max": float(waits.max()),
+            }
+
+        return {
+            "simulated_until": pd.Timestamp(self.now).isoformat(),
+            "events": {
+                "arrivals": self.counts["arrivals"],
+                "admissions": self.counts["admissions"],
+                "discharges": self.counts["discharges"],
+                "transfers": self.counts["transfers"],
+            },
+            "decisions": dict(self.decisions),
+            "wait_minutes": wait,
+            "still_queued": queued,
+            "still_admitted": pending[DISCHARGE] + pending[CENSUS_DISCHARGE],
+            "in_transfer": pending[TRANSFER],
+        }
+
+    def hospital_summary(self):
+        """
+        Per-hospital admissions, transfers, peak occupancy and queue length.
+        """
+        return pd.DataFrame({
+            "hospital_id": self.hospital_ids,
+            "admissions": self.admissions,
+            "transfers_in": self.transfers_in,
+            "transfers_out": self.transfers_out,
+            "peak_icu_occupied": self.peak_occupied[ICU],
+            "icu_beds_total": self._total[ICU],
+            "peak_ward_occupied": self.peak_occupied[WARD],
+            "ward_beds_total": self._total[WARD],
+            "max_queue": self.max_queue,
+        })
+
+    def timeline_frame(self):
+        """
+        Network-wide occupancy after every event (record_timeline=True).
+        """
+        frame = pd.DataFrame(self.timeline, columns=["time", "icu_occupied", "ward_occupied"])
+        frame["time"] = pd.to_datetime(frame["time"])
+        return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Discrete-event admission scheduler")
+    parser.add_argument("--arrivals", type=int, default=None,
+                        help="synthetic arrivals instead of patient_stream.csv")
+    parser.add_argument("--hours", type=int, default=168,
+                        help="span of the synthetic arrivals")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--drain", action="store_true",
+                        help="run until every queue and bed is empty, "
+                             "not just to the last arrival")
+    args = parser.parse_args()
+
+    if args.arrivals:
+        from hospital_flow_engine.synthetic import generate_arrivals
+        arrivals = generate_arrivals(args.arrivals, span_hours=args.hours, seed=args.seed)
+    else:
+        arrivals = load_arrivals()
+
+    t = time.perf_counter()
+    scheduler = AdmissionScheduler(load_resource_model(), arrivals, seed=args.seed)
+    report = scheduler.run(None if args.drain else arrivals["arrival_time"].max())
+    report["wall_seconds"] = time.perf_counter() - t
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
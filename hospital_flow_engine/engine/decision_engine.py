@@ -1,63 +1,115 @@
 # engine/decision_engine.py
 
+import os
+
+import jivy_metrics as metrics
+from hospital_flow_engine.engine.rules import compile_rules, load_rules
+
+
+# --------------------------------------------------
+# Default rule set (see rules.py for the format)
+# --------------------------------------------------
+DEFAULT_DECISION_RULES = {
+    "defaults": {"icu_full": False, "confidence": 1.0, "reasons": []},
+
+    # -------- Detect worsening trends --------
+    "reason_sets": {
+        "worsening": [
+            "worsening_heart_rate",
+            "falling_blood_pressure",
+            "rising_troponin_trend",
+            "rising_ck_mb_trend"
+        ]
+    },
+
+    "rules": [
+        # 1️⃣ HARD CAPACITY CONSTRAINT (GLOBAL OVERRIDE)
+        {"when": {"pressure": ">=0.9"},
+         "then": {"decision": "BLOCK", "explanation": "Hospital at critical capacity"}},
+
+        # 2️⃣ CRITICAL RISK
+        {"when": {"risk_level": "CRITICAL", "icu_full": True},
+         "then": {"decision": "ESCALATE", "explanation": "Critical risk but ICU unavailable"}},
+        {"when": {"risk_level": "CRITICAL"},
+         "then": {"decision": "PRIORITIZE", "explanation": "Critical patient prioritized"}},
+
+        # 3️⃣ HIGH RISK
+        {"when": {"risk_level": "HIGH", "worsening": True, "confidence": ">=0.8"},
+         "then": {"decision": "PRIORITIZE", "explanation": "High risk with worsening trends"}},
+        {"when": {"risk_level": "HIGH", "pressure": ">=0.75"},
+         "then": {"decision": "DELAY", "explanation": "High risk but system overloaded"}},
+        {"when": {"risk_level": "HIGH"},
+         "then": {"decision": "ALLOW", "explanation": "High risk, resources available"}},
+
+        # 4️⃣ MODERATE RISK
+        {"when": {"risk_level": "MODERATE", "worsening": True},
+         "then": {"decision": "OBSERVE", "explanation": "Moderate risk with early deterioration"}},
+        {"when": {"risk_level": "MODERATE"},
+         "then": {"decision": "ALLOW", "explanation": "Moderate risk stable"}},
+    ],
+
+    # 5️⃣ LOW RISK
+    "otherwise": {"decision": "OBSERVE", "explanation": "Risk stable"},
+}
+
+_rules = None
+_match = None
+
+
+def set_decision_rules(spec=None):
+    """
+    Replace the active rule set: a spec dict, a JSON file path, or None
+    for the default (or the file named by JIVY_DECISION_RULES).
+    """
+    global _rules, _match
+    if spec is None:
+        spec = os.environ.get("JIVY_DECISION_RULES") or DEFAULT_DECISION_RULES
+    _rules = compile_rules(spec) if isinstance(spec, dict) else load_rules(spec)
+
+    # decide() runs once per streamed row: match (risk, resource) with
+    # the table compiled into one function instead of walking the rules
+    _match = _rules.matcher(2)
+    return _rules
+
+
+def get_decision_rules():
+    if _rules is None:
+        set_decision_rules()
+    return _rules
+
+
+@metrics.timed("decide")
 def decide(risk_state, resource_state):
     """
     Decide hospital action based on patient risk state
     and current hospital resource constraints.
     """
+    if _match is None:
+        set_decision_rules()
 
-    pressure = resource_state["pressure"]
-    icu_full = resource_state.get("icu_full", False)
+    # Risk state fields shadow resource state fields
+    outcome = _match(risk_state, resource_state)
+    return outcome["decision"], outcome["explanation"]
 
-    risk_level = risk_state["risk_level"]
-    confidence = risk_state.get("confidence", 1.0)
-    reasons = risk_state.get("reasons", [])
 
-    # -------- Detect worsening trends --------
-    worsening_indicators = [
-        "worsening_heart_rate",
-        "falling_blood_pressure",
-        "rising_troponin_trend",
-        "rising_ck_mb_trend"
-    ]
-
-    worsening = any(r in reasons for r in worsening_indicators)
-
-    # --------------------------------------------------
-    # 1️⃣ HARD CAPACITY CONSTRAINT (GLOBAL OVERRIDE)
-    # --------------------------------------------------
-    if pressure >= 0.9:
-        return "BLOCK", "Hospital at critical capacity"
-
-    # --------------------------------------------------
-    # 2️⃣ CRITICAL RISK
-    # --------------------------------------------------
-    if risk_level == "CRITICAL":
-        if icu_full:
-            return "ESCALATE", "Critical risk but ICU unavailable"
-        return "PRIORITIZE", "Critical patient prioritized"
-
-    # --------------------------------------------------
-    # 3️⃣ HIGH RISK
-    # --------------------------------------------------
-    if risk_level == "HIGH":
-        if worsening and confidence >= 0.8:
-            return "PRIORITIZE", "High risk with worsening trends"
-
-        if pressure >= 0.75:
-            return "DELAY", "High risk but system overloaded"
-
-        return "ALLOW", "High risk, resources available"
-
-    # --------------------------------------------------
-    # 4️⃣ MODERATE RISK
-    # --------------------------------------------------
-    if risk_level == "MODERATE":
-        if worsening:
-            return "OBSERVE", "Moderate risk with early deterioration"
-        return "ALLOW", "Moderate risk stable"
-
-    # --------------------------------------------------
-    # 5️⃣ LOW RISK
-    # --------------------------------------------------
-    return "OBSERVE", "Risk stable"
+@metrics.timed("decide_many")
+def decide_many(risk_states, resource_states, rules=None):
+    """
+    decide() for whole cohorts: one vectorized rules pass over the
+    paired risk / resource states. Returns (decisions, explanations).
+    `rules` (a compiled RuleTable) overrides the active rule set.
+    """
+    if rules is None:
+        rules = get_decision_rules()
+
+    # Risk state fields shadow resource state fields, as in decide()
+    columns = {}
+    for field in rules.fields:
+        default = rules.defaults.get(field)
+        columns[field] = [
+            risk[field] if field in risk else resource.get(field, default)
+            for risk, resource in zip(risk_states, resource_states)
+        ]
+
+    outcome = rules.evaluate(columns, len(risk_states))
+    return outcome["decision"].tolist(), outcome["explanation"].tolist()
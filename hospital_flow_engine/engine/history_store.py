@@ -0,0 +1,220 @@
+# engine/history_store.py
+
+import numpy as np
+
+
+# Vitals kept per timestep, in column order
+VITALS = ("heart_rate", "sbp", "troponin", "ck_mb")
+
+
+class PatientHistoryStore:
+    """
+    Compact Patient History Store
+    -----------------------------
+    - One fixed-size ring buffer per patient (a "slot")
+    - Keeps only the vitals the risk engine reads + int64 timestamps
+    - Slots live in preallocated arrays that double when full
+    - Discharged / inactive patients free their slot for reuse
+    """
+
+    def __init__(self, window_size, capacity=1024):
+        self.window_size = window_size
+        self._slots = {}
+        self._free = []
+        self._head = []
+        self._count = []
+
+        self._vitals = np.empty((capacity, window_size, len(VITALS)))
+        self._timestamps = np.empty((capacity, window_size), dtype=np.int64)
+        self._last_seen = np.empty(capacity, dtype=np.int64)
+
+    # --------------------------------------------------
+    # 1️⃣ SLOT MANAGEMENT
+    # --------------------------------------------------
+    def _grow(self):
+        capacity = len(self._vitals)
+
+        self._vitals = np.concatenate([self._vitals, np.empty_like(self._vitals)])
+        self._timestamps = np.concatenate(
+            [self._timestamps, np.empty_like(self._timestamps)]
+        )
+        self._last_seen = np.concatenate(
+            [self._last_seen, np.empty_like(self._last_seen)]
+        )
+
+        return capacity
+
+    def _acquire(self, patient_id):
+        if self._free:
+            slot = self._free.pop()
+            self._head[slot] = 0
+            self._count[slot] = 0
+        else:
+            slot = len(self._head)
+            if slot == len(self._vitals):
+                self._grow()
+            self._head.append(0)
+            self._count.append(0)
+
+        self._slots[patient_id] = slot
+        return slot
+
+    # --------------------------------------------------
+    # 2️⃣ WRITE
+    # --------------------------------------------------
+    def append(self, patient_id, vitals, timestamp):
+        """
+        Push one timestep (vitals tuple ordered as VITALS, int64 ns
+        timestamp). Returns the vitals tuple that fell out of a full
+        window, or None.
+        """
+        slot = self._slots.get(patient_id)
+        if slot is None:
+            slot = self._acquire(patient_id)
+
+        count = self._count[slot]
+        head = self._head[slot]
+        evicted = None
+
+        if count == self.window_size:
+            pos = head
+            evicted = tuple(self._vitals[slot, pos].tolist())
+            self._head[slot] = (head + 1) % self.window_size
+        else:
+            pos = (head + count) % self.window_size
+            self._count[slot] = count + 1
+
+        self._vitals[slot, pos] = vitals
+        self._timestamps[slot, pos] = timestamp
+        self._last_seen[slot] = timestamp
+
+        return evicted
+
+    # --------------------------------------------------
+    # 3️⃣ READ
+    # --------------------------------------------------
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, patient_id):
+        return patient_id in self._slots
+
+    def patient_ids(self):
+        return list(self._slots)
+
+    def count(self, patient_id):
+        slot = self._slots.get(patient_id)
+        return 0 if slot is None else self._count[slot]
+
+    def first(self, patient_id):
+        """
+        Oldest (vitals, timestamp) in the patient's window.
+        """
+        slot = self._slots[patient_id]
+        pos = self._head[slot]
+        return (
+            tuple(self._vitals[slot, pos].tolist()),
+            int(self._timestamps[slot, pos]),
+        )
+
+    def last(self, patient_id):
+        """
+        Newest (vitals, timestamp) in the patient's window.
+        """
+        slot = self._slots[patient_id]
+        pos = (self._head[slot] + self._count[slot] - 1) % self.window_size
+        return (
+            tuple(self._vitals[slot, pos].tolist()),
+            int(self._timestamps[slot, pos]),
+        )
+
+    def window(self, patient_id):
+        """
+        (vitals[n, len(VITALS)], timestamps[n]) ordered oldest first.
+        """
+        slot = self._slots[patient_id]
+        order = (
+            self._head[slot] + np.arange(self._count[slot])
+        ) % self.window_size
+        return self._vitals[slot, order], self._timestamps[slot, order]
+
+    # --------------------------------------------------
+    # 4️⃣ EVICTION
+    # --------------------------------------------------
+    def evict(self, patient_id):
+        """
+        Drop a patient's history and free its slot.
+        """
+        slot = self._slots.pop(patient_id, None)
+        if slot is None:
+            return False
+
+        self._count[slot] = 0
+        self._free.append(slot)
+        return True
+
+    def evict_inactive(self, before):
+        """
+        Evict every patient whose newest timestep is older than `before`
+        (int64 ns). Returns the evicted patient ids.
+        """
+        if not self._slots:
+            return []
+
+        ids = list(self._slots)
+        slots = np.fromiter(self._slots.values(), dtype=np.int64, count=len(ids))
+        stale = np.flatnonzero(self._last_seen[slots] < before)
+
+        evicted = [ids[i] for i in stale]
+        for patient_id in evicted:
+            self.evict(patient_id)
+
+        return evicted
+
+    # --------------------------------------------------
+    # 5️⃣ SNAPSHOT / RESTORE
+    # --------------------------------------------------
+    def to_arrays(self):
+        """
+        Every window as dense arrays: patient_ids (list), counts[n],
+        vitals[n, window, len(VITALS)] and timestamps[n, window] ordered
+        oldest first (zero past each count), last_seen[n].
+        """
+        ids = list(self._slots)
+        slots = np.fromiter(self._slots.values(), dtype=np.int64, count=len(ids))
+
+        head = np.asarray(self._head, dtype=np.int64)[slots]
+        counts = np.asarray(self._count, dtype=np.int64)[slots]
+        order = (head[:, None] + np.arange(self.window_size)) % self.window_size
+        filled = np.arange(self.window_size) < counts[:, None]
+
+        vitals = self._vitals[slots[:, None], order]
+        timestamps = self._timestamps[slots[:, None], order]
+        vitals[~filled] = 0
+        timestamps[~filled] = 0
+
+        return {
+            "patient_ids": ids,
+            "counts": counts,
+            "vitals": vitals,
+            "timestamps": timestamps,
+            "last_seen": self._last_seen[slots],
+        }
+
+    @classmethod
+    def from_arrays(cls, window_size, arrays):
+        """
+        Store holding the windows of a to_arrays() snapshot.
+        """
+        ids = list(arrays["patient_ids"])
+        n = len(ids)
+        store = cls(window_size, capacity=max(n, 1))
+
+        store._vitals[:n] = arrays["vitals"]
+        store._timestamps[:n] = arrays["timestamps"]
+        store._last_seen[:n] = arrays["last_seen"]
+        store._slots = dict(zip(ids, range(n)))
+        store._head = [0] * n
+        store._count = np.asarray(arrays["counts"], dtype=np.int64).tolist()
+
+        return store
@@ -1,3 +1,9 @@
+import numpy as np
+
+import jivy_metrics as metrics
+
+
+@metrics.timed("compute_pressure")
 def compute_pressure(state_row, static_row):
     icu_ratio = state_row["icu_beds_occupied"] / static_row["icu_beds_total"]
     ward_ratio = state_row["ward_beds_occupied"] / static_row["ward_beds_total"]
@@ -7,4 +13,20 @@ def compute_pressure(state_row, static_row):
         0.4 * ward_ratio
     )
 
+    if np.ndim(pressure):
+        return _round_pressure(np.minimum(np.asarray(pressure, dtype=float), 1.0))
+
     return round(min(pressure, 1.0), 2)
+
+
+def _round_pressure(pressure):
+    # np.round can differ from round() on values sitting on a half-cent;
+    # re-round those few with round() so both paths agree exactly
+    rounded = np.round(pressure, 2)
+    scaled = pressure * 100
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+
+    if ties.any():
+        rounded[ties] = [round(p, 2) for p in pressure[ties].tolist()]
+
+    return rounded
@@ -1,23 +1,301 @@
+import copy
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
+import jivy_metrics as metrics
+from hospital_flow_engine.columnar import load_frame
+
+from hospital_flow_engine.engine.pressure_engine import compute_pressure
+from hospital_flow_engine.engine.routing import HospitalRoutingIndex
+
+
 class HospitalResourceModel:
+    """
+    Regional hospital resource model.
+
+    Snapshots are indexed by hospital_id into a columnar store sorted by
+    (hospital, timestamp), so per-hospital as-of lookups are a binary
+    search within that hospital's segment and a network-wide snapshot
+    is one vectorized pass over all hospitals.
+    """
+
+    # Snapshot columns the model reads (the rest stay on disk when
+    # loading from a columnar table)
+    STATE_COLUMNS = [
+        "hospital_id", "timestamp", "lat", "long",
+        "icu_beds_total", "ward_beds_total",
+        "icu_beds_occupied", "ward_beds_occupied",
+        "icu_accepting", "ward_accepting",
+    ]
+
     def __init__(self, static_path, state_path):
-        self.static = pd.read_csv(static_path)
-        self.state = pd.read_csv(state_path, parse_dates=["timestamp"])
+        self.static = self._read_table(static_path)
+        self.state = self._read_table(state_path, self.STATE_COLUMNS, ["timestamp"])
+        self._index_hospitals()
         self._validate()
+        self._build_timeline()
+        self._routing = None
+        self._routing_tick = None
+
+    @staticmethod
+    def _read_table(path, columns=None, parse_dates=None):
+        """
+        CSV file, or columnar table directory (see columnar.py).
+        """
+        if Path(path).is_dir():
+            frame = load_frame(path, columns)
+            # Dictionary-encoded strings back to plain columns
+            for name in frame.columns:
+                if isinstance(frame[name].dtype, pd.CategoricalDtype):
+                    frame[name] = frame[name].astype(object)
+            return frame
+
+        return pd.read_csv(path, parse_dates=parse_dates)
+
+    def _index_hospitals(self):
+        """
+        Key static rows by hospital_id and sort snapshots by hospital.
+        """
+        if "hospital_id" not in self.static.columns:
+            # Static rows are listed in the same order as the hospitals
+            # first appear in the state file
+            ids = pd.unique(self.state["hospital_id"])
+            if len(ids) != len(self.static):
+                raise ValueError("Cannot align static rows to hospital_id")
+            self.static["hospital_id"] = ids
+
+        self.hospital_ids = self.static["hospital_id"].to_numpy()
+        self.default_hospital_id = self.hospital_ids[0]
+        self._hospital_codes = {hid: code for code, hid in enumerate(self.hospital_ids)}
+
+        codes = pd.Index(self.hospital_ids).get_indexer(self.state["hospital_id"])
+        if (codes < 0).any():
+            raise ValueError("State references hospital_id missing from static data")
+
+        # Capacity reported with each snapshot, else the static totals
+        for column in ("icu_beds_total", "ward_beds_total"):
+            if column not in self.state.columns:
+                self.state[column] = self.static[column].to_numpy()[codes]
+
+        self.state["_code"] = codes
+        self.state = self.state.sort_values(
+            ["_code", "timestamp"], kind="stable"
+        ).reset_index(drop=True)
+
+        self._codes = self.state["_code"].to_numpy()
+        self._offsets = np.searchsorted(self._codes, np.arange(len(self.hospital_ids) + 1))
 
     def _validate(self):
-        if (self.state["icu_beds_occupied"] > self.static["icu_beds_total"].iloc[0]).any():
+        if (self.state["icu_beds_occupied"] > self.state["icu_beds_total"]).any():
             raise ValueError("ICU occupancy exceeds total capacity")
 
-        if (self.state["ward_beds_occupied"] > self.static["ward_beds_total"].iloc[0]).any():
+        if (self.state["ward_beds_occupied"] > self.state["ward_beds_total"]).any():
             raise ValueError("Ward occupancy exceeds total capacity")
 
-    def get_latest_state(self):
-        return self.state.sort_values("timestamp").iloc[-1]
+    def _build_timeline(self):
+        """
+        Precompute the resource state of every snapshot once.
+        """
+        self._ts = self.state["timestamp"].to_numpy("datetime64[ns]").view(np.int64)
+        self._icu_occupied = self.state["icu_beds_occupied"].to_numpy()
+        self._ward_occupied = self.state["ward_beds_occupied"].to_numpy()
+        self._icu_total = self.state["icu_beds_total"].to_numpy()
+        self._ward_total = self.state["ward_beds_total"].to_numpy()
+
+        if "icu_accepting" in self.state.columns:
+            self._icu_accepting = (self.state["icu_accepting"] == "Yes").to_numpy()
+        else:
+            self._icu_accepting = np.ones(len(self.state), dtype=bool)
+
+        pressure = compute_pressure(self.state, self.state)
+        icu_full = self._icu_occupied >= self._icu_total
+        ward_full = self._ward_occupied >= self._ward_total
+
+        self._timeline = [
+            {"pressure": p, "icu_full": icu, "ward_full": ward}
+            for p, icu, ward in zip(
+                pressure.tolist(), icu_full.tolist(), ward_full.tolist()
+            )
+        ]
+
+    # --------------------------------------------------
+    # What-if copies
+    # --------------------------------------------------
+    def with_capacity(self, icu_beds=0, ward_beds=0, hospital_ids=None):
+        """
+        Copy of the model with `icu_beds` / `ward_beds` added to (or,
+        when negative, closed at) every snapshot of `hospital_ids`
+        (default: all hospitals). Patients in closed beds are dropped
+        from occupancy. Built from the loaded data, no re-read.
+        """
+        model = copy.copy(self)
+        model.state = self.state.copy()
+
+        rows = np.ones(len(model.state), dtype=bool)
+        if hospital_ids is not None:
+            rows = model.state["hospital_id"].isin(list(hospital_ids)).to_numpy()
+
+        for bed, delta in (("icu", icu_beds), ("ward", ward_beds)):
+            total = f"{bed}_beds_total"
+            occupied = f"{bed}_beds_occupied"
+
+            # Keep at least one bed so pressure stays defined
+            totals = model.state[total].to_numpy()
+            totals = np.where(rows, np.maximum(totals + delta, 1), totals)
+            model.state[total] = totals
+            model.state[occupied] = np.minimum(model.state[occupied].to_numpy(), totals)
+
+        model._build_timeline()
+        model._routing = None
+        model._routing_tick = None
+        return model
+
+    # --------------------------------------------------
+    # Per-hospital lookups
+    # --------------------------------------------------
+    def _segment(self, hospital_id):
+        if hospital_id is None:
+            hospital_id = self.default_hospital_id
+
+        code = self._hospital_codes.get(hospital_id)
+        if code is None:
+            raise KeyError(f"Unknown hospital_id: {hospital_id}")
+
+        start, end = self._offsets[code], self._offsets[code + 1]
+        if start == end:
+            raise KeyError(f"No snapshots for hospital_id: {hospital_id}")
+
+        return start, end
+
+    def _timeline_index(self, timestamp, hospital_id=None):
+        # Last snapshot at or before `timestamp`; times before the first
+        # snapshot resolve to the earliest known state
+        start, end = self._segment(hospital_id)
+        t = pd.Timestamp(timestamp).value
+        idx = np.searchsorted(self._ts[start:end], t, side="right") - 1
+        return start + max(int(idx), 0)
+
+    def get_latest_state(self, hospital_id=None):
+        """
+        Most recent snapshot of a hospital, or of the whole network when
+        hospital_id is None.
+        """
+        if hospital_id is None:
+            return self.state.iloc[int(np.argmax(self._ts))]
+
+        _, end = self._segment(hospital_id)
+        return self.state.iloc[end - 1]
+
+    def get_state_at(self, timestamp, hospital_id=None):
+        """
+        Hospital snapshot that was current at `timestamp` (as-of lookup).
+        """
+        return self.state.iloc[self._timeline_index(timestamp, hospital_id)]
+
+    @metrics.timed("resource_state_at")
+    def resource_state_at(self, timestamp, hospital_id=None):
+        """
+        Precomputed resource state (pressure, icu_full, ward_full) of a
+        hospital (default: the first one) current at `timestamp`.
+        The returned dict is shared; treat it as read-only.
+        """
+        return self._timeline[self._timeline_index(timestamp, hospital_id)]
+
+    def get_static(self, hospital_id=None):
+        if hospital_id is None:
+            return self.static.iloc[0]
+        return self.static.iloc[self._hospital_codes[hospital_id]]
+
+    # --------------------------------------------------
+    # Network-wide snapshot
+    # --------------------------------------------------
+    def network_snapshot(self, timestamp):
+        """
+        As-of state of every hospital at `timestamp`, as a dict of arrays
+        aligned with self.hospital_ids. Pressure is recomputed for the
+        whole network in one vectorized pass.
+        """
+        t = pd.Timestamp(timestamp).value
+        starts, ends = self._offsets[:-1], self._offsets[1:]
+
+        # Within a hospital segment snapshots are time-sorted, so the ones
+        # at or before t form a prefix; count it per segment
+        seen = np.concatenate([[0], np.cumsum(self._ts <= t)])
+        prefix = seen[ends] - seen[starts]
+        has_state = ends > starts
+        idx = np.where(has_state, starts + np.maximum(prefix, 1) - 1, 0)
+
+        icu_occupied = self._icu_occupied[idx]
+        ward_occupied = self._ward_occupied[idx]
+        icu_total = self._icu_total[idx]
+        ward_total = self._ward_total[idx]
+
+        pressure = compute_pressure(
+            {"icu_beds_occupied": icu_occupied, "ward_beds_occupied": ward_occupied},
+            {"icu_beds_total": icu_total, "ward_beds_total": ward_total}
+        )
+
+        return {
+            "hospital_id": self.hospital_ids,
+            "has_state": has_state,
+            "snapshot_index": idx,
+            "pressure": np.where(has_state, pressure, np.nan),
+            "icu_full": has_state & (icu_occupied >= icu_total),
+            "icu_accepting": has_state & self._icu_accepting[idx],
+            "ward_full": has_state & (ward_occupied >= ward_total),
+            "icu_beds_occupied": icu_occupied,
+            "ward_beds_occupied": ward_occupied,
+            "icu_beds_total": icu_total,
+            "ward_beds_total": ward_total,
+        }
+
+    # --------------------------------------------------
+    # Transfer routing
+    # --------------------------------------------------
+    def routing_index(self, timestamp):
+        """
+        Spatial index of the network with capacity as of `timestamp`.
+        Built once (locations come from each hospital's latest snapshot)
+        and refreshed only when `timestamp` resolves to different
+        snapshots than the previous call.
+        """
+        snapshot = self.network_snapshot(timestamp)
+        tick = snapshot["snapshot_index"].tobytes()
+
+        if self._routing is None:
+            last = np.maximum(self._offsets[1:] - 1, 0)
+            self._routing = HospitalRoutingIndex(
+                self.hospital_ids,
+                self.state["lat"].to_numpy()[last],
+                self.state["long"].to_numpy()[last],
+            )
+
+        if tick != self._routing_tick:
+            self._routing.refresh(
+                snapshot["pressure"],
+                snapshot["icu_accepting"] & ~snapshot["icu_full"]
+            )
+            self._routing_tick = tick
+
+        return self._routing
+
+    @metrics.timed("suggest_transfer")
+    def suggest_transfer(self, timestamp, hospital_id=None, k=3, max_pressure=0.9):
+        """
+        k nearest other hospitals with ICU capacity and pressure below
+        max_pressure at `timestamp`.
+        """
+        if hospital_id is None:
+            hospital_id = self.default_hospital_id
+
+        routing = self.routing_index(timestamp)
+        lat, long = routing.location(hospital_id)
 
-    def get_static(self):
-        return self.static.iloc[0]
+        return routing.nearest(
+            lat, long, k=k, max_pressure=max_pressure, exclude=hospital_id
+        )
 
     @staticmethod
     def build_resource_state(hospital_state, hospital_static, pressure):
@@ -25,4 +303,4 @@ class HospitalResourceModel:
             "pressure": pressure,
             "icu_full": hospital_state["icu_beds_occupied"] >= hospital_static["icu_beds_total"],
             "ward_full": hospital_state["ward_beds_occupied"] >= hospital_static["ward_beds_total"]
-        }
\ No newline at end of file
+        }
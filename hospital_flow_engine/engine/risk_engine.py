@@ -1,6 +1,78 @@
 # engine/risk_engine.py
 
-from collections import defaultdict, deque
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+import jivy_metrics as metrics
+from hospital_flow_engine.engine.history_store import VITALS, PatientHistoryStore
+
+
+# Static threshold reasons, in the order their hit counters are stored
+THRESHOLD_REASONS = (
+    "tachycardia",
+    "hypotension",
+    "elevated_troponin",
+    "elevated_ck_mb",
+)
+
+# Trend reasons, in the order update() reports them
+TREND_REASONS = (
+    "worsening_heart_rate",
+    "falling_blood_pressure",
+    "rising_troponin_trend",
+    "rising_ck_mb_trend",
+)
+
+STABLE_REASONS = ("stable_for_60_min", "stable_for_30_min")
+
+def threshold_flags(heart_rate, sbp, troponin, ck_mb):
+    """
+    Static threshold flags, ordered as THRESHOLD_REASONS. Works on
+    scalars, arrays and Series alike; the single source of the limits
+    for observe(), full-window scoring, score_frame and checkpoint
+    restores.
+    """
+    return (
+        heart_rate > 100,
+        sbp < 100,
+        troponin > 0.04,
+        ck_mb > 5,
+    )
+
+
+# Every reason, in report order (bit order of checkpointed reason masks)
+REASONS = THRESHOLD_REASONS + TREND_REASONS + STABLE_REASONS
+
+RISK_LEVELS = ("LOW", "MODERATE", "HIGH", "CRITICAL")
+
+TREND_FIELDS = ("hr_slope", "sbp_slope", "troponin_slope", "ck_mb_slope")
+
+# Bump whenever scoring or the agent's state layout changes: checkpoints
+# written by another version are refused (see checkpoint.py)
+RISK_ENGINE_VERSION = 1
+
+NS_PER_MINUTE = 60 * 10**9
+
+# Checkpointed "no timestamp" (NaT)
+NO_TIME = np.iinfo(np.int64).min
+
+
+def _last_per_slot(slots):
+    """
+    Positions of the last occurrence of each value in `slots`.
+    """
+    return np.flatnonzero(~pd.Series(slots).duplicated(keep="last").to_numpy())
+
+
+def _timestamp_ns(value):
+    """
+    int64 nanoseconds for a pandas Timestamp / datetime / string / int.
+    """
+    if isinstance(value, pd.Timestamp):
+        return value.value
+    return pd.Timestamp(value).value
 
 
 class RiskAgent:
@@ -11,11 +83,22 @@ class RiskAgent:
     - Computes static + trend-based risk signals
     - Applies time-aware stabilization decay
     - Outputs explainable risk states
+    - Scores whole cohorts in batch (score_frame)
+
+    With incremental=True (default) per-patient threshold hit counts are
+    maintained as rows enter and leave the window, so update() costs the
+    same for any window_size. incremental=False rescans the window.
+
+    History is a PatientHistoryStore holding only heart_rate, sbp,
+    troponin, ck_mb and an int64 timestamp per timestep; use discharge()
+    or evict_inactive() to release patients that left the census.
     """
 
-    def __init__(self, window_size=3):
+    def __init__(self, window_size=3, incremental=True):
         self.window_size = window_size
-        self.patient_history = defaultdict(lambda: deque(maxlen=window_size))
+        self.incremental = incremental
+        self.patient_history = PatientHistoryStore(window_size)
+        self.patient_hits = defaultdict(lambda: [0, 0, 0, 0])
         self.patient_risk_state = {}
 
     # --------------------------------------------------
@@ -26,7 +109,27 @@ class RiskAgent:
         Observe a single patient timestep.
         """
         pid = patient_row["patient_id"]
-        self.patient_history[pid].append(patient_row)
+        vitals = (
+            patient_row["heart_rate"],
+            patient_row["sbp"],
+            patient_row.get("troponin", 0),
+            patient_row.get("ck_mb", 0),
+        )
+
+        evicted = self.patient_history.append(
+            pid, vitals, _timestamp_ns(patient_row["timestamp"])
+        )
+
+        if self.incremental:
+            hits = self.patient_hits[pid]
+
+            # Row that just fell out of the full window
+            if evicted is not None:
+                for i, hit in enumerate(threshold_flags(*evicted)):
+                    hits[i] -= hit
+
+            for i, hit in enumerate(threshold_flags(*vitals)):
+                hits[i] += hit
 
         # Initialize patient state on first observation
         if pid not in self.patient_risk_state:
@@ -37,51 +140,63 @@ class RiskAgent:
     # --------------------------------------------------
     # 2️⃣ TREND COMPUTATION (SLOPES)
     # --------------------------------------------------
-    def _compute_trends(self, rows):
+    def _compute_trends(self, first, last):
         """
         Computes slope-based trends across the window.
         """
-        first = rows[0]
-        last = rows[-1]
-
         return {
-            "hr_slope": last["heart_rate"] - first["heart_rate"],
-            "sbp_slope": last["sbp"] - first["sbp"],
-            "troponin_slope": last.get("troponin", 0) - first.get("troponin", 0),
-            "ck_mb_slope": last.get("ck_mb", 0) - first.get("ck_mb", 0),
+            "hr_slope": last[0] - first[0],
+            "sbp_slope": last[1] - first[1],
+            "troponin_slope": last[2] - first[2],
+            "ck_mb_slope": last[3] - first[3],
         }
 
     # --------------------------------------------------
     # 3️⃣ SIGNAL COMPUTATION (STATIC + TRENDS)
     # --------------------------------------------------
-    def _compute_signal(self, rows):
+    def _compute_signal(self, patient_id):
         """
         Disease-specific logic: HEART ATTACK
         Combines static thresholds and trend-based reasoning.
         """
-        score = 0
-        reasons = []
+        rows, _ = self.patient_history.window(patient_id)
 
         # -------- Static thresholds --------
-        for r in rows:
-            if r["heart_rate"] > 100:
-                score += 1
-                reasons.append("tachycardia")
+        counts = [int(np.count_nonzero(flags)) for flags in threshold_flags(*rows.T)]
 
-            if r["sbp"] < 100:
-                score += 1
-                reasons.append("hypotension")
+        return self._score_signal(patient_id, counts)
 
-            if r.get("troponin", 0) > 0.04:
-                score += 2
-                reasons.append("elevated_troponin")
+    def _compute_signal_incremental(self, patient_id):
+        """
+        Same signal as _compute_signal, read from the running hit
+        counters instead of rescanning the window.
+        """
+        return self._score_signal(patient_id, self.patient_hits[patient_id])
 
-            if r.get("ck_mb", 0) > 5:
-                score += 1
-                reasons.append("elevated_ck_mb")
+    def _score_signal(self, patient_id, counts):
+        tachycardia, hypotension, troponin, ck_mb = counts
+
+        score = tachycardia + hypotension + 2 * troponin + ck_mb
+        reasons = [
+            name for name, count in zip(THRESHOLD_REASONS, counts)
+            if count
+        ]
 
         # -------- Trend analysis --------
-        trends = self._compute_trends(rows)
+        first, _ = self.patient_history.first(patient_id)
+        last, _ = self.patient_history.last(patient_id)
+
+        trends = self._compute_trends(first, last)
+        trend_score, trend_reasons = self._score_trends(trends)
+
+        return score + trend_score, reasons + trend_reasons, trends
+
+    def _score_trends(self, trends):
+        """
+        Trend-based reasoning over window slopes.
+        """
+        score = 0
+        reasons = []
 
         if trends["hr_slope"] > 10:
             score += 1
@@ -99,40 +214,39 @@ class RiskAgent:
             score += 1
             reasons.append("rising_ck_mb_trend")
 
-        return score, list(set(reasons)), trends
+        return score, reasons
 
     # --------------------------------------------------
     # 4️⃣ UPDATE RISK STATE (TIME-AWARE)
     # --------------------------------------------------
+    @metrics.timed("risk_update")
     def update(self, patient_id: str):
         """
         Update and return the patient's risk state.
         """
-        history = self.patient_history[patient_id]
+        observed = self.patient_history.count(patient_id)
 
-        if len(history) < self.window_size:
+        if observed < self.window_size:
             return None  # insufficient temporal context
 
-        score, reasons, trends = self._compute_signal(history)
+        if self.incremental:
+            score, reasons, trends = self._compute_signal_incremental(patient_id)
+        else:
+            score, reasons, trends = self._compute_signal(patient_id)
 
-        now = history[-1]["timestamp"]
+        _, now = self.patient_history.last(patient_id)
         state = self.patient_risk_state[patient_id]
 
         # -------- Detect deterioration --------
-        worsening = any(r in reasons for r in [
-            "worsening_heart_rate",
-            "falling_blood_pressure",
-            "rising_troponin_trend",
-            "rising_ck_mb_trend"
-        ])
+        worsening = any(r in reasons for r in TREND_REASONS)
 
         # -------- Time-based stabilization decay --------
         if worsening:
-            state["last_deterioration_time"] = now
+            state["last_deterioration_time"] = pd.Timestamp(now)
         else:
             last_bad = state.get("last_deterioration_time")
-            if last_bad:
-                stable_minutes = (now - last_bad).total_seconds() / 60
+            if last_bad is not None:
+                stable_minutes = (now - last_bad.value) / NS_PER_MINUTE
 
                 if stable_minutes >= 60:
                     score -= 2
@@ -157,9 +271,309 @@ class RiskAgent:
         state.update({
             "risk_level": level,
             "signal_score": score,
-            "confidence": min(len(history) / self.window_size, 1.0),
+            "confidence": min(observed / self.window_size, 1.0),
             "reasons": reasons,
             "trends": trends
         })
 
         return state
+
+    # --------------------------------------------------
+    # 5️⃣ CENSUS MANAGEMENT
+    # --------------------------------------------------
+    def discharge(self, patient_id):
+        """
+        Forget a patient (history, counters and risk state).
+        """
+        self.patient_history.evict(patient_id)
+        self.patient_hits.pop(patient_id, None)
+        self.patient_risk_state.pop(patient_id, None)
+
+    def evict_inactive(self, before):
+        """
+        Discharge every patient not observed since `before`.
+        Returns the evicted patient ids.
+        """
+        evicted = self.patient_history.evict_inactive(_timestamp_ns(before))
+
+        for patient_id in evicted:
+            self.patient_hits.pop(patient_id, None)
+            self.patient_risk_state.pop(patient_id, None)
+
+        return evicted
+
+    # --------------------------------------------------
+    # 6️⃣ CHECKPOINT STATE
+    # --------------------------------------------------
+    def state_arrays(self):
+        """
+        The agent's full state as plain numpy arrays: history windows
+        (PatientHistoryStore.to_arrays), last deterioration time (ns,
+        NO_TIME if none) and the last risk state of every patient.
+        Threshold hit counters are not stored; they follow from the
+        windows.
+        """
+        arrays = self.patient_history.to_arrays()
+        ids = arrays["patient_ids"]
+        n = len(ids)
+
+        last_deterioration = np.full(n, NO_TIME, dtype=np.int64)
+        level = np.full(n, -1, dtype=np.int8)
+        signal_score = np.zeros(n, dtype=np.int64)
+        confidence = np.zeros(n)
+        reasons = np.zeros(n, dtype=np.int64)
+        trends = np.zeros((n, len(TREND_FIELDS)))
+
+        bits = {reason: 1 << i for i, reason in enumerate(REASONS)}
+        levels = {name: i for i, name in enumerate(RISK_LEVELS)}
+
+        for i, patient_id in enumerate(ids):
+            state = self.patient_risk_state.get(patient_id)
+            if state is None:
+                continue
+
+            if state.get("last_deterioration_time") is not None:
+                last_deterioration[i] = state["last_deterioration_time"].value
+
+            if "risk_level" in state:
+                level[i] = levels[state["risk_level"]]
+                signal_score[i] = state["signal_score"]
+                confidence[i] = state["confidence"]
+                reasons[i] = sum(bits[r] for r in state["reasons"])
+                trends[i] = [state["trends"][f] for f in TREND_FIELDS]
+
+        arrays.update({
+            "last_deterioration": last_deterioration,
+            "risk_level": level,
+            "signal_score": signal_score,
+            "confidence": confidence,
+            "reasons": reasons,
+            "trends": trends,
+        })
+        return arrays
+
+    @classmethod
+    def from_state_arrays(cls, arrays, window_size, incremental=True):
+        """
+        Agent restored from state_arrays(); continues exactly where the
+        snapshotted agent stopped.
+        """
+        agent = cls(window_size=window_size, incremental=incremental)
+        agent.patient_history = PatientHistoryStore.from_arrays(window_size, arrays)
+        ids = list(arrays["patient_ids"])
+
+        if incremental:
+            vitals = np.asarray(arrays["vitals"])
+            filled = np.arange(window_size) < np.asarray(arrays["counts"])[:, None]
+            hits = np.stack([
+                flags & filled for flags in threshold_flags(*np.moveaxis(vitals, -1, 0))
+            ], axis=-1).sum(axis=1)
+            agent.patient_hits.update(zip(ids, hits.tolist()))
+
+        reason_names = np.array(REASONS, dtype=object)
+        reason_bits = 1 << np.arange(len(REASONS))
+
+        for patient_id, last_bad, level, score, confidence, mask, trends in zip(
+            ids,
+            np.asarray(arrays["last_deterioration"]).tolist(),
+            np.asarray(arrays["risk_level"]).tolist(),
+            np.asarray(arrays["signal_score"]).tolist(),
+            np.asarray(arrays["confidence"]).tolist(),
+            np.asarray(arrays["reasons"]).tolist(),
+            np.asarray(arrays["trends"]).tolist(),
+        ):
+            state = {
+                "last_deterioration_time": (
+                    None if last_bad == NO_TIME else pd.Timestamp(last_bad)
+                )
+            }
+            if level >= 0:
+                state.update({
+                    "risk_level": RISK_LEVELS[level],
+                    "signal_score": score,
+                    "confidence": confidence,
+                    "reasons": list(reason_names[(mask & reason_bits) > 0]),
+                    "trends": dict(zip(TREND_FIELDS, trends)),
+                })
+            agent.patient_risk_state[patient_id] = state
+
+        return agent
+
+    @classmethod
+    def from_frame(cls, df, scored=None, window_size=3, incremental=True):
+        """
+        Agent in the state a fresh agent reaches by observe() + update()
+        over every row of `df`, built from score_frame's result
+        (`scored`, computed if not given) without replaying the rows.
+        """
+        agent = cls(window_size=window_size, incremental=incremental)
+        if scored is None:
+            scored = agent.score_frame(df)
+
+        w = window_size
+        pid = df["patient_id"]
+        ids = pd.unique(pid)
+        slot = pd.Series(np.arange(len(ids)), index=ids)
+
+        # -------- History windows (last w rows, oldest first) --------
+        tail = df.groupby(pid, sort=False).tail(w)
+        rows = slot[tail["patient_id"]].to_numpy()
+        pos = tail.groupby("patient_id", sort=False).cumcount().to_numpy()
+        ts = pd.to_datetime(tail["timestamp"]).astype("datetime64[ns]").to_numpy().view(np.int64)
+
+        counts = np.bincount(rows, minlength=len(ids))
+        vitals = np.zeros((len(ids), w, len(VITALS)))
+        timestamps = np.zeros((len(ids), w), dtype=np.int64)
+        for i, name in enumerate(VITALS):
+            if name in tail.columns:
+                vitals[rows, pos, i] = tail[name].to_numpy()
+        timestamps[rows, pos] = ts
+        last_seen = np.zeros(len(ids), dtype=np.int64)
+        newest = _last_per_slot(rows)
+        last_seen[rows[newest]] = ts[newest]
+
+        # -------- Risk state (last scored row per patient) --------
+        n = len(ids)
+        last_deterioration = np.full(n, NO_TIME, dtype=np.int64)
+        level = np.full(n, -1, dtype=np.int8)
+        signal_score = np.zeros(n, dtype=np.int64)
+        confidence = np.zeros(n)
+        reasons = np.zeros(n, dtype=np.int64)
+        trends = np.zeros((n, len(TREND_FIELDS)))
+
+        if len(scored):
+            scored_rows = slot[pid.loc[scored.index]].to_numpy()
+            scored_ts = (
+                pd.to_datetime(df["timestamp"].loc[scored.index])
+                .astype("datetime64[ns]").to_numpy().view(np.int64)
+            )
+            bits = {reason: 1 << i for i, reason in enumerate(REASONS)}
+            masks = np.array([sum(bits[r] for r in rs) for rs in scored["reasons"]], dtype=np.int64)
+            trend_mask = sum(bits[r] for r in TREND_REASONS)
+
+            worsening = np.flatnonzero((masks & trend_mask) > 0)
+            worsening = worsening[_last_per_slot(scored_rows[worsening])]
+            last_deterioration[scored_rows[worsening]] = scored_ts[worsening]
+
+            last = _last_per_slot(scored_rows)
+            at = scored_rows[last]
+            level[at] = pd.Categorical(
+                scored["risk_level"].to_numpy()[last], categories=RISK_LEVELS
+            ).codes
+            signal_score[at] = scored["signal_score"].to_numpy()[last]
+            confidence[at] = scored["confidence"].to_numpy()[last]
+            reasons[at] = masks[last]
+            trends[at] = scored[list(TREND_FIELDS)].to_numpy()[last]
+
+        return cls.from_state_arrays({
+            "patient_ids": list(ids),
+            "counts": np.minimum(counts, w),
+            "vitals": vitals,
+            "timestamps": timestamps,
+            "last_seen": last_seen,
+            "last_deterioration": last_deterioration,
+            "risk_level": level,
+            "signal_score": signal_score,
+            "confidence": confidence,
+            "reasons": reasons,
+            "trends": trends,
+        }, window_size, incremental)
+
+    # --------------------------------------------------
+    # 7️⃣ BATCH SCORING (WHOLE COHORT)
+    # --------------------------------------------------
+    @metrics.timed("risk_score_frame")
+    def score_frame(self, df):
+        """
+        Score a full cohort frame in one vectorized pass.
+
+        Equivalent to calling observe() + update() on every row of `df`
+        in order with a fresh agent. Returns a frame indexed like `df`
+        holding only the rows that had a full window, with columns
+        risk_level, signal_score, confidence, reasons and the four slopes.
+        The agent's own history and state are left untouched.
+        """
+        w = self.window_size
+        pid = df["patient_id"]
+        ts = pd.to_datetime(df["timestamp"])
+        by_patient = df.groupby(pid, sort=False)
+
+        eligible = (by_patient.cumcount() >= w - 1).to_numpy()
+
+        def column(name):
+            if name in df.columns:
+                return df[name]
+            return pd.Series(0, index=df.index)
+
+        vitals = pd.DataFrame({
+            "heart_rate": df["heart_rate"],
+            "sbp": df["sbp"],
+            "troponin": column("troponin"),
+            "ck_mb": column("ck_mb"),
+        })
+
+        # -------- Static thresholds (rolling hit counts) --------
+        hits = pd.DataFrame(dict(zip(THRESHOLD_REASONS, threshold_flags(
+            vitals["heart_rate"], vitals["sbp"], vitals["troponin"], vitals["ck_mb"]
+        )))).astype(np.int64)
+
+        cum = hits.groupby(pid, sort=False).cumsum()
+        window_hits = cum - cum.groupby(pid, sort=False).shift(w, fill_value=0)
+
+        score = (
+            window_hits["tachycardia"]
+            + window_hits["hypotension"]
+            + 2 * window_hits["elevated_troponin"]
+            + window_hits["elevated_ck_mb"]
+        ).to_numpy()
+
+        # -------- Trend analysis (first vs last in window) --------
+        first = vitals.groupby(pid, sort=False).shift(w - 1)
+        slopes = vitals - first
+
+        trend_hits = pd.DataFrame({
+            "worsening_heart_rate": slopes["heart_rate"] > 10,
+            "falling_blood_pressure": slopes["sbp"] < -15,
+            "rising_troponin_trend": slopes["troponin"] > 0.02,
+            "rising_ck_mb_trend": slopes["ck_mb"] > 1,
+        })
+
+        score = score + trend_hits.sum(axis=1).to_numpy()
+        worsening = eligible & trend_hits.any(axis=1).to_numpy()
+
+        # -------- Time-based stabilization decay --------
+        last_bad = ts.where(worsening).groupby(pid, sort=False).ffill()
+        stable_minutes = ((ts - last_bad).dt.total_seconds() / 60).to_numpy()
+        decaying = eligible & ~worsening & ~np.isnan(stable_minutes)
+
+        stable_60 = decaying & (stable_minutes >= 60)
+        stable_30 = decaying & ~stable_60 & (stable_minutes >= 30)
+
+        score = np.maximum(score - 2 * stable_60 - stable_30, 0)
+
+        # -------- Risk level mapping --------
+        level = np.select(
+            [score >= 6, score >= 4, score >= 2],
+            ["CRITICAL", "HIGH", "MODERATE"],
+            default="LOW"
+        )
+
+        # -------- Reasons --------
+        reason_flags = pd.concat([window_hits > 0, trend_hits], axis=1)
+        reason_flags["stable_for_60_min"] = stable_60
+        reason_flags["stable_for_30_min"] = stable_30
+        reason_flags = reason_flags[eligible]
+
+        names = reason_flags.columns.to_numpy()
+        reasons = [list(names[mask]) for mask in reason_flags.to_numpy()]
+
+        return pd.DataFrame({
+            "risk_level": level[eligible],
+            "signal_score": score[eligible],
+            "confidence": 1.0,
+            "reasons": reasons,
+            "hr_slope": slopes["heart_rate"].to_numpy()[eligible],
+            "sbp_slope": slopes["sbp"].to_numpy()[eligible],
+            "troponin_slope": slopes["troponin"].to_numpy()[eligible],
+            "ck_mb_slope": slopes["ck_mb"].to_numpy()[eligible],
+        }, index=df.index[eligible])
@@ -0,0 +1,225 @@
+# engine/routing.py
+
+import math
+
+import numpy as np
+
+
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LONG_EQUATOR = 111.320
+
+# Neighbours kept per hospital for nearest_from()
+NEIGHBORS = 32
+
+
+class HospitalRoutingIndex:
+    """
+    Nearest Available Hospital Index
+    --------------------------------
+    - Uniform grid over hospital coordinates (local planar km)
+    - Per-hospital pressure + ICU availability, refreshable in bulk
+      or one hospital at a time as occupancy changes
+    - k-nearest queries expand grid rings outward and stop as soon as
+      no unvisited cell can hold a closer facility; when few hospitals
+      qualify (a saturated network) they fall back to one vectorized
+      scan instead of walking every empty ring
+    """
+
+    def __init__(self, hospital_ids, lat, long, cell_km=2.0):
+        self.hospital_ids = np.asarray(hospital_ids)
+        self._codes = {hid: i for i, hid in enumerate(self.hospital_ids)}
+        self.cell_km = cell_km
+
+        lat = np.asarray(lat, dtype=float)
+        long = np.asarray(long, dtype=float)
+
+        # Equirectangular projection around the network's mean latitude
+        self._long_scale = KM_PER_DEG_LONG_EQUATOR * math.cos(math.radians(lat.mean()))
+        self._x = long * self._long_scale
+        self._y = lat * KM_PER_DEG_LAT
+
+        cx = np.floor(self._x / cell_km).astype(np.int64)
+        cy = np.floor(self._y / cell_km).astype(np.int64)
+
+        self._cells = {}
+        for i, cell in enumerate(zip(cx.tolist(), cy.tolist())):
+            self._cells.setdefault(cell, []).append(i)
+        self._cells = {cell: np.array(ids) for cell, ids in self._cells.items()}
+
+        self._bounds = (int(cx.min()), int(cx.max()), int(cy.min()), int(cy.max()))
+
+        self.pressure = np.zeros(len(self.hospital_ids))
+        self.icu_available = np.ones(len(self.hospital_ids), dtype=bool)
+
+        self._neighbors = None
+        self._neighbor_dist = None
+
+    # --------------------------------------------------
+    # 1️⃣ CAPACITY REFRESH
+    # --------------------------------------------------
+    def refresh(self, pressure, icu_available):
+        """
+        Replace pressure / ICU availability for every hospital
+        (arrays aligned with hospital_ids).
+        """
+        self.pressure = np.asarray(pressure, dtype=float).copy()
+        self.icu_available = np.asarray(icu_available, dtype=bool).copy()
+
+    def update(self, hospital_id, pressure=None, icu_available=None):
+        """
+        Refresh a single hospital after its occupancy changed.
+        """
+        i = self._codes[hospital_id]
+        if pressure is not None:
+            self.pressure[i] = pressure
+        if icu_available is not None:
+            self.icu_available[i] = icu_available
+
+    # --------------------------------------------------
+    # 2️⃣ K-NEAREST QUERY
+    # --------------------------------------------------
+    def location(self, hospital_id):
+        i = self._codes[hospital_id]
+        return self._y[i] / KM_PER_DEG_LAT, self._x[i] / self._long_scale
+
+    def nearest(self, lat, long, k=3, max_pressure=0.9, exclude=None):
+        """
+        k nearest hospitals with ICU capacity and pressure below
+        max_pressure, as [{hospital_id, distance_km, pressure}] sorted
+        by distance.
+        """
+        x = long * self._long_scale
+        y = lat * KM_PER_DEG_LAT
+        cx = math.floor(x / self.cell_km)
+        cy = math.floor(y / self.cell_km)
+        skip = self._codes.get(exclude)
+
+        found_ids = []
+        found_dist = []
+
+        min_x, max_x, min_y, max_y = self._bounds
+        last_ring = max(cx - min_x, max_x - cx, cy - min_y, max_y - cy, 0)
+
+        # Walking more cells than hold hospitals costs more than a scan
+        budget = len(self._cells)
+        visited = 0
+
+        for ring in range(last_ring + 1):
+            visited += 8 * ring or 1
+            if visited > budget:
+                return self._scan(x, y, k, max_pressure, skip)
+
+            for cell in self._ring_cells(cx, cy, ring):
+                ids = self._cells.get(cell)
+                if ids is None:
+                    continue
+
+                ok = self.icu_available[ids] & (self.pressure[ids] < max_pressure)
+                if skip is not None:
+                    ok &= ids != skip
+
+                ids = ids[ok]
+                if len(ids):
+                    found_ids.append(ids)
+                    found_dist.append(np.hypot(self._x[ids] - x, self._y[ids] - y))
+
+            # Every unvisited cell is at least ring * cell_km away
+            if found_ids and sum(len(d) for d in found_dist) >= k:
+                dist = np.concatenate(found_dist)
+                if np.partition(dist, k - 1)[k - 1] <= ring * self.cell_km:
+                    break
+
+        if not found_ids:
+            return []
+
+        return self._closest(np.concatenate(found_ids), np.concatenate(found_dist), k)
+
+    def _scan(self, x, y, k, max_pressure, skip, available=None):
+        """
+        nearest() over every hospital in one pass.
+        """
+        available = self.icu_available if available is None else available
+        ok = available & (self.pressure < max_pressure)
+        if skip is not None:
+            ok[skip] = False
+
+        ids = np.flatnonzero(ok)
+        if not len(ids):
+            return []
+
+        return self._closest(ids, np.hypot(self._x[ids] - x, self._y[ids] - y), k)
+
+    def _closest(self, ids, dist, k):
+        order = np.argsort(dist, kind="stable")[:k]
+
+        return [
+            {
+                "hospital_id": self.hospital_ids[i],
+                "distance_km": round(float(d), 2),
+                "pressure": float(self.pressure[i]),
+            }
+            for i, d in zip(ids[order].tolist(), dist[order].tolist())
+        ]
+
+    def nearest_from(self, hospital_id, max_pressure=0.9, available=None):
+        """
+        Closest other qualifying hospital to `hospital_id` (as
+        nearest(k=1) from its location), or None. `available` (bool
+        array aligned with hospital_ids) replaces ICU availability,
+        e.g. to route patients who need a ward bed.
+
+        Reads a per-hospital list of its NEIGHBORS closest facilities,
+        built on first use; falls back to a scan of the whole network
+        when none of them qualifies.
+        """
+        if self._neighbors is None:
+            self._build_neighbors()
+
+        available = self.icu_available if available is None else available
+        i = self._codes[hospital_id]
+        order = self._neighbors[i]
+        ok = available[order] & (self.pressure[order] < max_pressure)
+
+        if ok.any():
+            j = ok.argmax()
+            return self._closest(order[j:j + 1], self._neighbor_dist[i, j:j + 1], 1)[0]
+
+        if len(order) == len(self.hospital_ids) - 1:
+            return None
+
+        # The answer lies beyond the neighbour list: one pass over all
+        found = self._scan(self._x[i], self._y[i], 1, max_pressure, i, available)
+        return found[0] if found else None
+
+    def _build_neighbors(self, block=1024):
+        n = len(self.hospital_ids)
+        limit = min(NEIGHBORS, n - 1)
+
+        self._neighbors = np.empty((n, limit), dtype=np.int64)
+        self._neighbor_dist = np.empty((n, limit))
+
+        for start in range(0, n, block):
+            rows = np.arange(start, min(start + block, n))
+            dist = np.hypot(
+                self._x[rows, None] - self._x[None, :],
+                self._y[rows, None] - self._y[None, :]
+            )
+            dist[np.arange(len(rows)), rows] = np.inf
+
+            # Same order as nearest(): by distance, ties by position
+            order = np.argsort(dist, axis=1, kind="stable")[:, :limit]
+            self._neighbors[rows] = order
+            self._neighbor_dist[rows] = np.take_along_axis(dist, order, axis=1)
+
+    @staticmethod
+    def _ring_cells(cx, cy, ring):
+        if ring == 0:
+            yield cx, cy
+            return
+
+        for dx in range(-ring, ring + 1):
+            yield cx + dx, cy - ring
+            yield cx + dx, cy + ring
+        for dy in range(-ring + 1, ring):
+            yield cx - ring, cy + dy
+            yield cx + ring, cy + dy
@@ -0,0 +1,336 @@
+# engine/rules.py
+
+"""
+Declarative rule tables.
+
+A rule set is plain data (a dict, or the same thing as JSON):
+
+    {
+        "defaults":    {field: value used when an input lacks the field},
+        "reason_sets": {name: [reason, ...]},
+        "rules": [
+            {"when": {field: condition, ...}, "then": {output: value, ...}},
+            {"any":  {field: condition, ...}, "then": {...}},
+            ...
+        ],
+        "otherwise": {output: value, ...}
+    }
+
+Rules are tried in order and the first match wins. "when" needs every
+condition to hold, "any" at least one. A condition is
+- a comparison string: "<90", ">=0.9", "==0"
+- an inclusive range string: "90-94"
+- a list: membership
+- any other value: equality
+
+Each reason set adds a boolean field that is true when the input's
+"reasons" contain any of the set's reasons.
+
+compile_rules() turns a rule set into a RuleTable once; evaluate() then
+scores whole arrays of inputs in one vectorized pass and match() checks
+a single input. matcher() compiles the whole table into one Python
+function for per-row callers.
+"""
+
+import json
+import operator
+import re
+
+import numpy as np
+
+
+_COMPARISON = re.compile(r"^\s*(<=|>=|==|!=|<|>)\s*(-?\d+(?:\.\d+)?)\s*$")
+_RANGE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*-\s*(-?\d+(?:\.\d+)?)\s*$")
+
+_MISSING = object()
+
+_OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+def parse_condition(condition):
+    """
+    Condition -> (op, operand): op is a comparison symbol, "range"
+    (operand = (low, high)), "in" (operand = set) or "==".
+    """
+    if isinstance(condition, str):
+        match = _COMPARISON.match(condition)
+        if match:
+            return match.group(1), float(match.group(2))
+
+        match = _RANGE.match(condition)
+        if match:
+            return "range", (float(match.group(1)), float(match.group(2)))
+
+    if isinstance(condition, (list, tuple, set)):
+        return "in", set(condition)
+
+    return "==", condition
+
+
+class _Predicate:
+    """
+    One compiled field condition, with a scalar and an array form.
+    """
+
+    def __init__(self, field, condition):
+        self.field = field
+        self.op, self.operand = parse_condition(condition)
+
+    def source(self, variable, constants):
+        """
+        Python expression testing `variable` (for RuleTable.matcher);
+        operands that are not plain numbers go into `constants`.
+        """
+        if self.op == "range":
+            low, high = self.operand
+            return f"({low!r} <= {variable} <= {high!r})"
+
+        if self.op in ("in", "==") or not isinstance(self.operand, (int, float)):
+            name = f"_c{len(constants)}"
+            constants[name] = self.operand
+            op = "in" if self.op == "in" else self.op
+            return f"({variable} {op} {name})"
+
+        return f"({variable} {self.op} {self.operand!r})"
+
+    def check(self, value):
+        if self.op == "range":
+            low, high = self.operand
+            return low <= value <= high
+        if self.op == "in":
+            return value in self.operand
+        return _OPERATORS[self.op](value, self.operand)
+
+    def mask(self, values):
+        if self.op == "range":
+            low, high = self.operand
+            return (values >= low) & (values <= high)
+        if self.op == "in":
+            return np.isin(values, list(self.operand))
+        return np.asarray(_OPERATORS[self.op](values, self.operand), dtype=bool)
+
+
+class RuleTable:
+    """
+    Compiled rule set.
+
+    - Conditions are parsed once into predicates
+    - Outputs are lookup tables indexed by the matching rule
+      (the last slot holds "otherwise")
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.defaults = dict(spec.get("defaults", {}))
+        self.reason_sets = {
+            name: frozenset(reasons)
+            for name, reasons in spec.get("reason_sets", {}).items()
+        }
+
+        self._rules = []
+        for rule in spec["rules"]:
+            if "any" in rule:
+                mode, conditions = any, rule["any"]
+            else:
+                mode, conditions = all, rule["when"]
+            predicates = [_Predicate(f, c) for f, c in conditions.items()]
+            self._rules.append((mode, predicates, rule["then"]))
+
+        otherwise = spec.get("otherwise", {})
+        outcomes = [then for _, _, then in self._rules] + [otherwise]
+
+        self.outputs = sorted({key for then in outcomes for key in then})
+        self._lookup = {}
+        for key in self.outputs:
+            table = np.empty(len(outcomes), dtype=object)
+            table[:] = [then.get(key) for then in outcomes]
+            self._lookup[key] = table
+
+        self._outcomes = outcomes
+        self._matchers = {}
+
+        # Input fields the rules read (reason sets read "reasons")
+        fields = {p.field for _, predicates, _ in self._rules for p in predicates}
+        if fields & set(self.reason_sets):
+            fields = (fields - set(self.reason_sets)) | {"reasons"}
+        self.fields = sorted(fields)
+
+    # --------------------------------------------------
+    # Single input
+    # --------------------------------------------------
+    def match(self, values):
+        """
+        Outputs of the first rule matching `values` (a field mapping).
+        """
+        return self.matcher(1)(values)
+
+    def matcher(self, sources=1):
+        """
+        match() compiled into one function of `sources` field mappings;
+        each field is read from the first mapping holding it, then from
+        defaults. Built once per source count.
+        """
+        compiled = self._matchers.get(sources)
+        if compiled is None:
+            compiled = self._matchers[sources] = self._compile(sources)
+        return compiled
+
+    def _compile(self, sources):
+        args = [f"s{i}" for i in range(sources)]
+        defaults = dict(self.defaults)
+        defaults.setdefault("reasons", ())
+        namespace = {"_MISSING": _MISSING, "_defaults": defaults}
+        lines = [f"def _match({', '.join(args)}):"]
+
+        def fetch(field, variable):
+            default = "_MISSING" if field not in defaults else f"_defaults[{field!r}]"
+            expression = default
+            for arg in reversed(args):
+                expression = f"{arg}[{field!r}] if {field!r} in {arg} else ({expression})"
+            lines.append(f"    {variable} = {expression}")
+            if field not in defaults:
+                lines.append(f"    if {variable} is _MISSING: raise KeyError({field!r})")
+
+        used = {p.field for _, predicates, _ in self._rules for p in predicates}
+        variables = {}
+        if used & set(self.reason_sets):
+            fetch("reasons", "reasons")
+        for i, field in enumerate(sorted(used)):
+            variable = variables[field] = f"v{i}"
+            if field in self.reason_sets:
+                namespace[f"_set{i}"] = self.reason_sets[field]
+                lines.append(f"    {variable} = not _set{i}.isdisjoint(reasons)")
+            else:
+                fetch(field, variable)
+
+        for i, (mode, predicates, then) in enumerate(self._rules):
+            namespace[f"_then{i}"] = then
+            tests = [p.source(variables[p.field], namespace) for p in predicates]
+            joiner = " and " if mode is all else " or "
+            condition = joiner.join(tests) or ("True" if mode is all else "False")
+            lines.append(f"    if {condition}: return _then{i}")
+
+        namespace["_otherwise"] = self._outcomes[-1]
+        lines.append("    return _otherwise")
+
+        exec("\n".join(lines), namespace)
+        return namespace["_match"]
+
+    def _value(self, values, field):
+        if field in self.reason_sets:
+            reasons = values.get("reasons", self.defaults.get("reasons", ()))
+            return not self.reason_sets[field].isdisjoint(reasons)
+        if field in values:
+            return values[field]
+        return self.defaults[field]
+
+    # --------------------------------------------------
+    # Whole arrays
+    # --------------------------------------------------
+    def rule_index(self, columns, size=None):
+        """
+        Index of the first matching rule per row (len(rules) where
+        none matched). `columns` maps fields to equal-length arrays.
+        """
+        if size is None:
+            size = len(next(iter(columns.values())))
+
+        cache = {}
+        remaining = np.ones(size, dtype=bool)
+        index = np.full(size, len(self._rules), dtype=np.intp)
+
+        for i, (mode, predicates, _) in enumerate(self._rules):
+            if not remaining.any():
+                break
+
+            masks = [p.mask(self._column(columns, p.field, size, cache)) for p in predicates]
+            combine = np.logical_and if mode is all else np.logical_or
+            hit = combine.reduce(masks) if masks else np.full(size, mode is all)
+            hit = hit & remaining
+
+            index[hit] = i
+            remaining &= ~hit
+
+        return index
+
+    def evaluate(self, columns, size=None):
+        """
+        {output: object array} for every row of `columns`.
+        """
+        index = self.rule_index(columns, size)
+        return {key: table[index] for key, table in self._lookup.items()}
+
+    def _column(self, columns, field, size, cache):
+        if field in cache:
+            return cache[field]
+
+        if field in self.reason_sets:
+            wanted = self.reason_sets[field]
+            reasons = columns.get("reasons")
+            if reasons is None:
+                reasons = [self.defaults.get("reasons", ())] * size
+            values = np.fromiter(
+                (not wanted.isdisjoint(r) for r in reasons), dtype=bool, count=size
+            )
+        elif field in columns:
+            values = np.asarray(columns[field])
+        else:
+            values = np.full(size, self.defaults[field])
+
+        cache[field] = values
+        return values
+
+
+def compile_rules(spec):
+    return RuleTable(spec)
+
+
+def load_rules(path):
+    """
+    Compile a rule set stored as JSON.
+    """
+    with open(path) as f:
+        return RuleTable(json.load(f))
+
+
+# --------------------------------------------------
+# Baseline engine configs
+# --------------------------------------------------
+def baseline_risk_spec(risk_rules):
+    """
+    baseline_risk_rules.json -> rule set: a level matches when any of
+    its vitals is in range; checked in file order, LOW otherwise.
+    """
+    return {
+        "rules": [
+            {"any": conditions, "then": {"risk_level": level}}
+            for level, conditions in risk_rules.items()
+        ],
+        "otherwise": {"risk_level": "LOW"},
+    }
+
+
+def baseline_decision_spec(decision_map):
+    """
+    baseline_decision_map.json -> rule set, with the baseline's
+    override: ESCALATE becomes PRIORITIZE when no ICU bed is free.
+    """
+    rules = []
+    for risk_level, decision in decision_map.items():
+        if decision == "ESCALATE":
+            rules.append({
+                "when": {"risk_level": risk_level, "icu_beds_available": "==0"},
+                "then": {"decision": "PRIORITIZE"},
+            })
+        rules.append({
+            "when": {"risk_level": risk_level},
+            "then": {"decision": decision},
+        })
+    return {"rules": rules}
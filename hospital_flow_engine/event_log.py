@@ -0,0 +1,536 @@
+"""
+Append-only decision event log.
+
+Every decision the engine takes can be logged with the inputs decide()
+saw: one event per record holding timestamp, patient_id, hospital_id,
+the risk state, the resource state, decision and explanation.
+
+Layout (one directory per log):
+- decisions-000001.jsonl   one JSON event per line, append-only
+- decisions-000001.idx.npz sidecar index written when the segment is
+                           sealed: byte offset, timestamp (ns) and
+                           patient_id per event, plus time / patient
+                           sort orders for binary search
+
+- DecisionLogWriter: the engine hands events to a bounded queue; a
+  background thread serializes and writes them, rolling to a new
+  segment every `segment_events` events. Sealed segments are never
+  modified.
+- DecisionLogReader: audit queries (patient_id and / or time range)
+  through the sidecar indexes, time-ordered replay from any timestamp,
+  and replay_decisions() re-deciding logged inputs under another rule
+  set, in vectorized batches.
+
+Run from project root:
+    python -m hospital_flow_engine.event_log record --log decision_log
+    python -m hospital_flow_engine.event_log query --log decision_log --patient P0119
+    python -m hospital_flow_engine.event_log replay --log decision_log --rules new_rules.json
+"""
+import argparse
+import heapq
+import json
+import queue
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from hospital_flow_engine.engine.decision_engine import decide_many
+from hospital_flow_engine.engine.rules import compile_rules, load_rules
+
+
+SEGMENT_EVENTS = 100_000
+
+# Events waiting for the writer thread before append() blocks / drops
+QUEUE_EVENTS = 50_000
+
+WHEN_FULL = ("block", "drop")
+
+# Seconds a blocked append() waits between writer health checks
+_PUT_POLL = 0.1
+
+# Events re-decided per vectorized rules pass during replay
+REPLAY_BATCH = 10_000
+
+_SEGMENT = re.compile(r"decisions-(\d{6})\.jsonl$")
+
+_STOP = object()
+
+
+def _segment_path(directory, number):
+    return Path(directory) / f"decisions-{number:06d}.jsonl"
+
+
+def _index_path(segment):
+    return segment.with_name(segment.name[:-len(".jsonl")] + ".idx.npz")
+
+
+def _segments(directory):
+    """
+    Segment paths of a log directory, oldest first.
+    """
+    directory = Path(directory)
+    if not directory.exists():
+        return []
+    return sorted(p for p in directory.iterdir() if _SEGMENT.match(p.name))
+
+
+def _json_default(value):
+    # numpy scalars from the engine; anything else as text
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _write_index(segment, offsets, timestamps, patient_ids):
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    patient_ids = np.array([str(p) for p in patient_ids], dtype=str)
+
+    np.savez(
+        _index_path(segment),
+        offsets=np.asarray(offsets, dtype=np.int64),
+        timestamps=timestamps,
+        patient_ids=patient_ids,
+        time_order=np.argsort(timestamps, kind="stable"),
+        patient_order=np.argsort(patient_ids, kind="stable"),
+    )
+
+
+# --------------------------------------------------
+# Writer
+# --------------------------------------------------
+class DecisionLogWriter:
+    """
+    Background-thread writer. append() only enqueues; serialization,
+    file writes and segment rolls happen on the writer thread. Each
+    writer starts a new segment after the existing ones.
+
+    At most `max_queued` events wait for the writer. When the queue is
+    full, when_full="block" makes append() wait for room (the engine
+    slows to the disk's pace) and "drop" discards the event, counting
+    it in `dropped`.
+
+    Use as a context manager, or call close() to drain the queue and
+    seal the last segment. An error on the writer thread is re-raised by
+    the next append() and by close().
+    """
+
+    def __init__(self, directory, segment_events=SEGMENT_EVENTS,
+                 max_queued=QUEUE_EVENTS, when_full="block"):
+        if when_full not in WHEN_FULL:
+            raise ValueError(f"when_full must be one of {WHEN_FULL}, got {when_full!r}")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_events = segment_events
+        self.when_full = when_full
+        self.dropped = 0
+
+        existing = _segments(self.directory)
+        self._number = int(_SEGMENT.match(existing[-1].name).group(1)) if existing else 0
+
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._error = None
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name="decision-log", daemon=True)
+        self._thread.start()
+
+    def append(self, timestamp, patient_id, hospital_id, risk_state,
+               resource_state, decision, explanation):
+        """
+        Queue one decision. Risk state fields are copied here: the
+        agent keeps updating its state dicts after this returns.
+        """
+        if self._error is not None:
+            raise self._error
+
+        item = (
+            timestamp, patient_id, hospital_id,
+            risk_state["risk_level"], risk_state["signal_score"],
+            risk_state.get("confidence"), list(risk_state.get("reasons", ())),
+            resource_state, decision, explanation,
+        )
+
+        if self.when_full == "drop":
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+            return
+
+        self._put(item)
+
+    def _put(self, item):
+        # Wait for room, but give up once the writer thread has died:
+        # nothing would ever drain the queue
+        while True:
+            try:
+                self._queue.put(item, timeout=_PUT_POLL)
+                return
+            except queue.Full:
+                if self._error is not None:
+                    raise self._error
+                if not self._thread.is_alive():
+                    raise RuntimeError("decision log writer thread has stopped")
+
+    def close(self):
+        if self._thread.is_alive():
+            self._put(_STOP)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # ---- Writer thread ----
+    def _open_segment(self):
+        self._number += 1
+        self._segment = _segment_path(self.directory, self._number)
+        self._file = open(self._segment, "wb")
+        self._offset = 0
+        self._offsets, self._timestamps, self._patient_ids = [], [], []
+
+    def _seal(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        _write_index(self._segment, self._offsets, self._timestamps, self._patient_ids)
+
+    def _write(self, item):
+        (timestamp, patient_id, hospital_id, risk_level, signal_score,
+         confidence, reasons, resource_state, decision, explanation) = item
+
+        if self._file is None:
+            self._open_segment()
+
+        timestamp = pd.Timestamp(timestamp)
+        line = json.dumps({
+            "timestamp": timestamp.isoformat(),
+            "patient_id": patient_id,
+            "hospital_id": hospital_id,
+            "risk_state": {
+                "risk_level": risk_level,
+                "signal_score": signal_score,
+                "confidence": confidence,
+                "reasons": reasons,
+            },
+            "resource_state": resource_state,
+            "decision": decision,
+            "explanation": explanation,
+        }, default=_json_default).encode() + b"\n"
+
+        self._file.write(line)
+        self._offsets.append(self._offset)
+        self._timestamps.append(timestamp.value)
+        self._patient_ids.append(patient_id)
+        self._offset += len(line)
+
+        if len(self._offsets) >= self.segment_events:
+            self._seal()
+
+    def _run(self):
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                self._write(item)
+
+                # Make events visible to readers once the backlog is written
+                if self._file is not None and self._queue.empty():
+                    self._file.flush()
+        except Exception as e:
+            self._error = e
+        finally:
+            try:
+                self._seal()
+            except Exception as e:
+                self._error = self._error or e
+
+
+# --------------------------------------------------
+# Reader
+# --------------------------------------------------
+class SegmentIndex:
+    """
+    Sidecar index of one segment (built by scanning the segment when it
+    was never sealed, e.g. still being written or after a crash).
+    """
+
+    def __init__(self, segment):
+        self.segment = segment
+        path = _index_path(segment)
+
+        if path.exists():
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        else:
+            arrays = self._scan(segment)
+
+        self.offsets = arrays["offsets"]
+        self.timestamps = arrays["timestamps"]
+        self.patient_ids = arrays["patient_ids"]
+        self.time_order = arrays["time_order"]
+        self.patient_order = arrays["patient_order"]
+
+        self.sorted_times = self.timestamps[self.time_order]
+        self.sorted_patients = self.patient_ids[self.patient_order]
+        self.sealed = path.exists()
+
+    @staticmethod
+    def _scan(segment):
+        offsets, timestamps, patient_ids = [], [], []
+        offset = 0
+        with open(segment, "rb") as f:
+            for line in f:
+                # A torn last line (writer mid-write) is not an event yet
+                if line.endswith(b"\n"):
+                    event = json.loads(line)
+                    offsets.append(offset)
+                    timestamps.append(pd.Timestamp(event["timestamp"]).value)
+                    patient_ids.append(str(event["patient_id"]))
+                offset += len(line)
+
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        patient_ids = np.array(patient_ids, dtype=str)
+        return {
+            "offsets": np.asarray(offsets, dtype=np.int64),
+            "timestamps": timestamps,
+            "patient_ids": patient_ids,
+            "time_order": np.argsort(timestamps, kind="stable"),
+            "patient_order": np.argsort(patient_ids, kind="stable"),
+        }
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def positions(self, patient_id=None, since=None, until=None):
+        """
+        Event positions matching the filters, in timestamp order.
+        """
+        lo = np.searchsorted(self.sorted_times, since, "left") if since is not None else 0
+        hi = (
+            np.searchsorted(self.sorted_times, until, "right")
+            if until is not None else len(self.sorted_times)
+        )
+        by_time = self.time_order[lo:hi]
+
+        if patient_id is None:
+            return by_time
+
+        start = np.searchsorted(self.sorted_patients, str(patient_id), "left")
+        end = np.searchsorted(self.sorted_patients, str(patient_id), "right")
+        mine = self.patient_order[start:end]
+
+        if len(by_time) == len(self):
+            return mine[np.argsort(self.timestamps[mine], kind="stable")]
+        return by_time[np.isin(by_time, mine)]
+
+
+class DecisionLogReader:
+    """
+    Queries and replays over a log directory. Sealed segment indexes are
+    loaded once and kept; unsealed ones are re-read on every call.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._indexes = {}
+
+    def _segment_indexes(self):
+        indexes = []
+        for segment in _segments(self.directory):
+            index = self._indexes.get(segment)
+            if index is None:
+                index = SegmentIndex(segment)
+                if index.sealed:
+                    self._indexes[segment] = index
+            indexes.append(index)
+        return indexes
+
+    @staticmethod
+    def _read(segment, offsets):
+        events = []
+        with open(segment, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                events.append(json.loads(f.readline()))
+        return events
+
+    def _matches(self, patient_id, since, until):
+        """
+        (segment, positions in time order) for every segment with matches.
+        """
+        since = pd.Timestamp(since).value if since is not None else None
+        until = pd.Timestamp(until).value if until is not None else None
+
+        for index in self._segment_indexes():
+            if not len(index):
+                continue
+            if since is not None and index.sorted_times[-1] < since:
+                continue
+            if until is not None and index.sorted_times[0] > until:
+                continue
+
+            positions = index.positions(patient_id, since, until)
+            if len(positions):
+                yield index, positions
+
+    def query(self, patient_id=None, since=None, until=None, limit=None):
+        """
+        Logged events for a patient and / or time range
+        (since <= timestamp <= until), oldest first.
+        """
+        streams = []
+        for index, positions in self._matches(patient_id, since, until):
+            streams.append([
+                (int(index.timestamps[p]), n, index.segment, int(index.offsets[p]))
+                for n, p in enumerate(positions)
+            ])
+
+        # Events merged across segments by time (then segment order)
+        picked = list(heapq.merge(*streams, key=lambda e: e[0]))[:limit]
+
+        by_segment = {}
+        for i, (_, _, segment, offset) in enumerate(picked):
+            by_segment.setdefault(segment, []).append((offset, i))
+
+        events = [None] * len(picked)
+        for segment, items in by_segment.items():
+            items.sort()
+            for (_, i), event in zip(items, self._read(segment, [o for o, _ in items])):
+                events[i] = event
+        return events
+
+    def replay(self, since=None, until=None, speed=None):
+        """
+        Events in timestamp order from `since`. speed=None replays as
+        fast as possible; speed=60.0 paces events at 60x real time.
+        """
+        streams = []
+        for index, positions in self._matches(None, since, until):
+            streams.append(_iter_segment_events(index, positions))
+
+        clock_start = event_start = None
+        for ns, event in heapq.merge(*streams, key=lambda e: e[0]):
+            if speed:
+                if clock_start is None:
+                    clock_start, event_start = time.monotonic(), ns
+                delay = (ns - event_start) / 1e9 / speed - (time.monotonic() - clock_start)
+                if delay > 0:
+                    time.sleep(delay)
+            yield event
+
+    def replay_decisions(self, rules=None, since=None, until=None,
+                         batch_size=REPLAY_BATCH):
+        """
+        Re-decide logged inputs under `rules` (a spec dict, JSON path or
+        compiled RuleTable; None: the active rules). Yields
+        (event, decision, explanation) in timestamp order.
+        """
+        if isinstance(rules, dict):
+            rules = compile_rules(rules)
+        elif isinstance(rules, (str, Path)):
+            rules = load_rules(rules)
+
+        batch = []
+        for event in self.replay(since, until):
+            batch.append(event)
+            if len(batch) >= batch_size:
+                yield from _redecide(batch, rules)
+                batch = []
+        if batch:
+            yield from _redecide(batch, rules)
+
+    def compare_rules(self, rules, since=None, until=None):
+        """
+        How `rules` would have decided the logged history:
+        (logged decision, replayed decision) counts and changed events.
+        """
+        matrix = Counter()
+        for event, decision, _ in self.replay_decisions(rules, since, until):
+            matrix[(event["decision"], decision)] += 1
+
+        total = sum(matrix.values())
+        changed = sum(n for (old, new), n in matrix.items() if old != new)
+
+        transitions = {}
+        for (old, new), n in sorted(matrix.items()):
+            transitions.setdefault(old, {})[new] = n
+
+        return {
+            "events": total,
+            "changed": changed,
+            "changed_rate": changed / total if total else 0.0,
+            "transitions": transitions,
+        }
+
+
+def _iter_segment_events(index, positions, chunk=REPLAY_BATCH):
+    """
+    (timestamp ns, event) for `positions`, read a chunk at a time.
+    """
+    for start in range(0, len(positions), chunk):
+        part = positions[start:start + chunk]
+        events = DecisionLogReader._read(index.segment, index.offsets[part].tolist())
+        yield from zip(index.timestamps[part].tolist(), events)
+
+
+def _redecide(events, rules):
+    decisions, explanations = decide_many(
+        [event["risk_state"] for event in events],
+        [event["resource_state"] for event in events],
+        rules=rules,
+    )
+    return zip(events, decisions, explanations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decision event log")
+    parser.add_argument("command", choices=["record", "query", "replay"])
+    parser.add_argument("--log", type=Path, default=Path("decision_log"))
+    parser.add_argument("--patient", default=None)
+    parser.add_argument("--since", default=None)
+    parser.add_argument("--until", default=None)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--rules", default=None,
+                        help="replay: JSON rule set to compare with the logged decisions")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        from hospital_flow_engine.simulate import run_simulation
+
+        with DecisionLogWriter(args.log) as log:
+            outputs = run_simulation(event_log=log)
+        print(f"Logged {len(outputs)} decisions to {args.log}")
+
+    elif args.command == "query":
+        t = time.perf_counter()
+        events = DecisionLogReader(args.log).query(
+            args.patient, args.since, args.until, args.limit
+        )
+        for event in events:
+            print(json.dumps(event))
+        print(f"{len(events)} events in {(time.perf_counter() - t) * 1e3:.1f} ms")
+
+    else:
+        t = time.perf_counter()
+        report = DecisionLogReader(args.log).compare_rules(args.rules, args.since, args.until)
+        report["seconds"] = time.perf_counter() - t
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import heapq
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from hospital_flow_engine.simulate import (
+    load_patients,
+    load_resource_model,
+    simulate_frame,
+)
+
+
+# ------------------------------------------------------------------
+# Worker-side state: one read-only resource model per process
+# ------------------------------------------------------------------
+_worker_resource_model = None
+
+
+def _init_worker(resource_model):
+    global _worker_resource_model
+    _worker_resource_model = resource_model
+
+
+def _run_shard(shard):
+    # Row positions travel as the frame index, so results can be merged
+    # back into input order
+    return simulate_frame(shard, _worker_resource_model)
+
+
+def shard_of(patient_ids, shards):
+    """
+    Stable shard number per patient id (crc32, identical across
+    processes and runs, unlike hash()).
+    """
+    codes, uniques = pd.factorize(pd.Series(patient_ids))
+    per_id = np.array(
+        [zlib.crc32(str(pid).encode()) % shards for pid in uniques],
+        dtype=np.int64
+    )
+    return per_id[codes]
+
+
+def run_simulation_parallel(workers=None, patients=None, resource_model=None):
+    """
+    Runs the simulation with the patient stream hash-partitioned by
+    patient_id across a process pool. Every patient's rows land in one
+    shard, so each shard's RiskAgent sees exactly the history the
+    single-process run would; results are merged back in input row
+    order and match run_simulation() record for record.
+    """
+    workers = workers or os.cpu_count() or 1
+    patients = load_patients() if patients is None else patients
+    resource_model = resource_model or load_resource_model()
+
+    patients = patients.reset_index(drop=True)
+
+    if workers == 1:
+        return [record for _, record in simulate_frame(patients, resource_model)]
+
+    shard_ids = shard_of(patients["patient_id"], workers)
+    shards = [patients[shard_ids == s] for s in range(workers)]
+    shards = [shard for shard in shards if len(shard)]
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(resource_model,)
+    ) as pool:
+        results = list(pool.map(_run_shard, shards))
+
+    merged = heapq.merge(*results, key=lambda pair: pair[0])
+    return [record for _, record in merged]
@@ -0,0 +1,143 @@
+from bisect import bisect_left, bisect_right
+
+import pandas as pd
+
+
+# Largest page a single query may return
+MAX_PAGE_SIZE = 1000
+
+
+def _ns(value):
+    return pd.Timestamp(value).value
+
+
+class SimulationIndex:
+    """
+    Indexes over simulation records (by patient_id, decision,
+    risk_level and timestamp) so queries touch only matching records.
+
+    Records keep their run order; a record's position in that order is
+    its id, and query pages are ordered by it. Cursors are the position
+    to resume from. append() extends every index in place.
+    """
+
+    FIELDS = ("patient_id", "decision", "risk_level")
+
+    def __init__(self, records=()):
+        self.records = []
+        self._postings = {field: {} for field in self.FIELDS}
+        self._ts = []
+        self._time_sorted = True
+        self._time_order = None
+        self._time_keys = None
+
+        self.append(records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def append(self, records):
+        for record in records:
+            pos = len(self.records)
+            self.records.append(record)
+
+            for field in self.FIELDS:
+                self._postings[field].setdefault(record.get(field), []).append(pos)
+
+            ts = _ns(record["timestamp"])
+            if self._ts and ts < self._ts[-1]:
+                self._time_sorted = False
+            self._ts.append(ts)
+
+        self._time_order = None
+
+    # --------------------------------------------------
+    # Lookups
+    # --------------------------------------------------
+    def _time_positions(self, since, until):
+        """
+        Positions with since <= timestamp <= until, in position order.
+        """
+        lo = _ns(since) if since is not None else None
+        hi = _ns(until) if until is not None else None
+
+        if self._time_sorted:
+            start = 0 if lo is None else bisect_left(self._ts, lo)
+            end = len(self._ts) if hi is None else bisect_right(self._ts, hi)
+            return range(start, end)
+
+        # Out-of-order runs: time-sorted order, rebuilt after appends
+        if self._time_order is None:
+            self._time_order = sorted(range(len(self._ts)), key=self._ts.__getitem__)
+            self._time_keys = [self._ts[i] for i in self._time_order]
+
+        keys = self._time_keys
+        start = 0 if lo is None else bisect_left(keys, lo)
+        end = len(keys) if hi is None else bisect_right(keys, hi)
+        return sorted(self._time_order[start:end])
+
+    def query(self, patient_id=None, decision=None, risk_level=None,
+              since=None, until=None, cursor=None, limit=100):
+        """
+        Positions of matching records, at most `limit` of them starting
+        at position `cursor`, plus the cursor of the next page (None on
+        the last page).
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        start = int(cursor) if cursor is not None else 0
+
+        filters = {
+            field: value
+            for field, value in zip(self.FIELDS, (patient_id, decision, risk_level))
+            if value is not None
+        }
+
+        # Walk the most selective posting list, check the rest per record
+        if filters:
+            base = min(
+                (self._postings[f].get(v, []) for f, v in filters.items()),
+                key=len
+            )
+        elif since is not None or until is not None:
+            base = self._time_positions(since, until)
+        else:
+            base = range(len(self.records))
+
+        lo = _ns(since) if since is not None else None
+        hi = _ns(until) if until is not None else None
+
+        page = []
+        i = bisect_left(base, start)
+        while i < len(base):
+            pos = base[i]
+            i += 1
+
+            record = self.records[pos]
+            if any(record.get(f) != v for f, v in filters.items()):
+                continue
+            if lo is not None and self._ts[pos] < lo:
+                continue
+            if hi is not None and self._ts[pos] > hi:
+                continue
+
+            if len(page) == limit:
+                return page, str(pos)
+            page.append(pos)
+
+        return page, None
+
+    def patient_timeline(self, patient_id):
+        """
+        Positions of a patient's records in timestamp order.
+        """
+        positions = self._postings["patient_id"].get(patient_id, [])
+        return sorted(positions, key=self._ts.__getitem__)
+
+
+def project(record, fields):
+    """
+    Keep only `fields` of a record (all fields when None).
+    """
+    if not fields:
+        return record
+    return {field: record[field] for field in fields if field in record}
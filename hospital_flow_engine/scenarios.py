@@ -0,0 +1,369 @@
+"""
+Monte Carlo what-if scenarios.
+
+A Scenario perturbs the loaded inputs:
+- arrival_multiplier: scales patient_stream arrivals (each arrival is
+  repeated a Poisson(multiplier) number of times, jittered in time)
+- icu_beds / ward_beds: beds added or closed per hospital
+  (HospitalResourceModel.with_capacity)
+- vitals_noise: relative Gaussian noise on the cohort's vitals and on
+  arrival severity scores
+
+Each replication runs both input streams under the scenario:
+- "admissions": the discrete-event scheduler (des.py) over the arrivals,
+  so decisions see the occupancy earlier admissions created
+- "vitals": the temporal engine over the vitals cohort
+
+Replications run on a process pool. Inputs are loaded once and shipped
+to each worker once; a replication's randomness comes only from
+(seed, replication number), so results are reproducible whatever the
+worker count. Aggregates are streaming (Welford moments for decision
+rates, fixed-bin histograms for pressure), so memory does not grow with
+the number of replications.
+
+Run from project root:
+    python -m hospital_flow_engine.scenarios --replications 1000 \\
+        --arrival-multiplier 1.3 --icu-beds -5
+"""
+import argparse
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from hospital_flow_engine.des import AdmissionScheduler, load_arrivals
+from hospital_flow_engine.simulate import load_patients, load_resource_model, simulate_frame
+
+
+DECISIONS = ("BLOCK", "ESCALATE", "PRIORITIZE", "DELAY", "ALLOW", "OBSERVE")
+
+# Pressure histogram resolution (pressure is rounded to 0.01)
+PRESSURE_BINS = 101
+
+# Spread of the arrival time of repeated arrivals
+ARRIVAL_JITTER_MINUTES = 60
+
+VITALS = ("heart_rate", "sbp", "troponin", "ck_mb")
+
+
+class Scenario:
+    """
+    One set of input perturbations (see module docstring).
+    """
+
+    def __init__(self, name="baseline", arrival_multiplier=1.0, icu_beds=0,
+                 ward_beds=0, hospital_ids=None, vitals_noise=0.0):
+        self.name = name
+        self.arrival_multiplier = arrival_multiplier
+        self.icu_beds = icu_beds
+        self.ward_beds = ward_beds
+        self.hospital_ids = tuple(hospital_ids) if hospital_ids else None
+        self.vitals_noise = vitals_noise
+
+    def capacity_key(self):
+        return self.icu_beds, self.ward_beds, self.hospital_ids
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "arrival_multiplier": self.arrival_multiplier,
+            "icu_beds": self.icu_beds,
+            "ward_beds": self.ward_beds,
+            "hospital_ids": list(self.hospital_ids) if self.hospital_ids else None,
+            "vitals_noise": self.vitals_noise,
+        }
+
+
+# --------------------------------------------------
+# Streaming statistics
+# --------------------------------------------------
+class RunningStats:
+    """
+    Count / mean / variance / min / max in constant memory (Welford).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        std = math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": std,
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class PressureHistogram:
+    """
+    Fixed 0.01-wide bins over [0, 1]; percentiles from cumulative counts.
+    """
+
+    def __init__(self):
+        self.counts = np.zeros(PRESSURE_BINS, dtype=np.int64)
+
+    def add_counts(self, counts):
+        self.counts += counts
+
+    @staticmethod
+    def bin_counts(pressures):
+        values = np.asarray(pressures, dtype=float)
+        values = values[~np.isnan(values)]
+        bins = np.clip(np.rint(values * (PRESSURE_BINS - 1)), 0, PRESSURE_BINS - 1)
+        return np.bincount(bins.astype(np.int64), minlength=PRESSURE_BINS)
+
+    def percentile(self, q):
+        total = self.counts.sum()
+        if not total:
+            return None
+        rank = np.searchsorted(np.cumsum(self.counts), q / 100 * total)
+        return min(int(rank), PRESSURE_BINS - 1) / (PRESSURE_BINS - 1)
+
+    def summary(self):
+        total = int(self.counts.sum())
+        if not total:
+            return {"samples": 0}
+        levels = np.arange(PRESSURE_BINS) / (PRESSURE_BINS - 1)
+        return {
+            "samples": total,
+            "mean": float((levels * self.counts).sum() / total),
+            **{f"p{q}": self.percentile(q) for q in (50, 90, 95, 99)},
+        }
+
+
+class StreamSummary:
+    """
+    Per-stream aggregate over replications: decision rates + pressure.
+    """
+
+    def __init__(self):
+        self.rates = {decision: RunningStats() for decision in DECISIONS}
+        self.pressure = PressureHistogram()
+
+    def add(self, counts, pressure_counts):
+        total = sum(counts.values())
+        for decision, stats in self.rates.items():
+            stats.add(counts.get(decision, 0) / total if total else 0.0)
+        self.pressure.add_counts(pressure_counts)
+
+    def summary(self):
+        return {
+            "decision_rates": {d: s.summary() for d, s in self.rates.items()},
+            "pressure": self.pressure.summary(),
+        }
+
+
+# --------------------------------------------------
+# Perturbations
+# --------------------------------------------------
+def perturb_arrivals(arrivals, scenario, rng):
+    """
+    Arrivals repeated Poisson(arrival_multiplier) times each (copies are
+    jittered in time and get suffixed ids), with severity noise.
+    """
+    if scenario.arrival_multiplier != 1.0:
+        repeats = rng.poisson(scenario.arrival_multiplier, len(arrivals))
+        arrivals = arrivals.loc[arrivals.index.repeat(repeats)].reset_index(drop=True)
+
+        copy_number = arrivals.groupby("patient_id", sort=False).cumcount()
+        jitter = rng.uniform(-ARRIVAL_JITTER_MINUTES, ARRIVAL_JITTER_MINUTES, len(arrivals))
+        jitter = np.where(copy_number > 0, jitter, 0)
+
+        arrivals["arrival_time"] = arrivals["arrival_time"] + pd.to_timedelta(jitter, unit="min")
+        arrivals["patient_id"] = arrivals["patient_id"].astype(str) + np.where(
+            copy_number > 0, "#" + copy_number.astype(str), ""
+        )
+
+    if scenario.vitals_noise:
+        arrivals = arrivals.copy()
+        severity = arrivals["severity_score"].to_numpy() * (
+            1 + rng.normal(0, scenario.vitals_noise, len(arrivals))
+        )
+        arrivals["severity_score"] = np.clip(np.rint(severity), 0, 100).astype(np.int64)
+
+    return arrivals
+
+
+def perturb_vitals(patients, scenario, rng):
+    if not scenario.vitals_noise:
+        return patients
+
+    patients = patients.copy()
+    for column in VITALS:
+        values = patients[column].to_numpy()
+        noisy = values * (1 + rng.normal(0, scenario.vitals_noise, len(values)))
+        if np.issubdtype(values.dtype, np.integer):
+            noisy = np.rint(noisy).astype(values.dtype)
+        patients[column] = noisy
+    return patients
+
+
+# --------------------------------------------------
+# Worker side: inputs shipped once per process
+# --------------------------------------------------
+_worker_inputs = None
+_worker_models = {}
+
+
+def _init_worker(inputs):
+    global _worker_inputs
+    _worker_inputs = inputs
+    _worker_models.clear()
+
+
+def _model_for(scenario):
+    key = scenario.capacity_key()
+    if key not in _worker_models:
+        base = _worker_inputs["resource_model"]
+        if key == (0, 0, None):
+            _worker_models[key] = base
+        else:
+            _worker_models[key] = base.with_capacity(
+                scenario.icu_beds, scenario.ward_beds, scenario.hospital_ids
+            )
+    return _worker_models[key]
+
+
+def run_replication(task):
+    """
+    One seeded replication: ({stream: (decision counts, pressure bins)}).
+    """
+    scenario, seed, replication = task
+    rng = np.random.default_rng([seed, replication])
+    model = _model_for(scenario)
+
+    # ---- Admission stream (discrete-event) ----
+    arrivals = perturb_arrivals(_worker_inputs["arrivals"], scenario, rng)
+    scheduler = AdmissionScheduler(
+        model, arrivals, start=_worker_inputs["start"],
+        seed=int(rng.integers(2**32))
+    )
+    scheduler.run(arrivals["arrival_time"].max())
+
+    # ---- Vitals stream (temporal engine) ----
+    patients = perturb_vitals(_worker_inputs["patients"], scenario, rng)
+    records = [record for _, record in simulate_frame(patients, model)]
+
+    vitals_counts = {}
+    for record in records:
+        vitals_counts[record["decision"]] = vitals_counts.get(record["decision"], 0) + 1
+
+    return {
+        "admissions": (
+            dict(scheduler.decisions),
+            PressureHistogram.bin_counts(scheduler.arrival_pressures),
+        ),
+        "vitals": (
+            vitals_counts,
+            PressureHistogram.bin_counts([r["pressure"] for r in records]),
+        ),
+    }
+
+
+def run_scenarios(scenarios, replications=100, seed=0, workers=None,
+                  resource_model=None, patients=None, arrivals=None):
+    """
+    `replications` runs of each scenario; returns one summary per
+    scenario, in order. Same seed, same results.
+    """
+    workers = workers or os.cpu_count() or 1
+    arrivals = load_arrivals() if arrivals is None else arrivals
+
+    inputs = {
+        "resource_model": resource_model or load_resource_model(),
+        "patients": load_patients() if patients is None else patients,
+        "arrivals": arrivals,
+        "start": arrivals["arrival_time"].min(),
+    }
+
+    summaries = [
+        {"admissions": StreamSummary(), "vitals": StreamSummary()}
+        for _ in scenarios
+    ]
+    tasks = [
+        (scenario, seed, replication)
+        for scenario in scenarios
+        for replication in range(replications)
+    ]
+    owners = [i for i in range(len(scenarios)) for _ in range(replications)]
+
+    def fold(results):
+        # Results arrive in task order, so aggregation order is fixed too
+        for i, result in zip(owners, results):
+            for stream, (counts, pressure_counts) in result.items():
+                summaries[i][stream].add(counts, pressure_counts)
+
+    if workers == 1:
+        _init_worker(inputs)
+        fold(map(run_replication, tasks))
+    else:
+        chunksize = max(1, len(tasks) // (workers * 8))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(inputs,)
+        ) as pool:
+            fold(pool.map(run_replication, tasks, chunksize=chunksize))
+
+    return [
+        {
+            "scenario": scenario.to_dict(),
+            "replications": replications,
+            "seed": seed,
+            **{stream: summary.summary() for stream, summary in streams.items()},
+        }
+        for scenario, streams in zip(scenarios, summaries)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo what-if scenarios")
+    parser.add_argument("--replications", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--arrival-multiplier", type=float, default=1.0)
+    parser.add_argument("--icu-beds", type=int, default=0,
+                        help="ICU beds added (negative: closed) per hospital")
+    parser.add_argument("--ward-beds", type=int, default=0)
+    parser.add_argument("--hospital", action="append", default=None,
+                        help="limit bed changes to this hospital_id (repeatable)")
+    parser.add_argument("--vitals-noise", type=float, default=0.0)
+    args = parser.parse_args()
+
+    scenarios = [
+        Scenario("baseline"),
+        Scenario(
+            "what-if",
+            arrival_multiplier=args.arrival_multiplier,
+            icu_beds=args.icu_beds,
+            ward_beds=args.ward_beds,
+            hospital_ids=args.hospital,
+            vitals_noise=args.vitals_noise,
+        ),
+    ]
+
+    results = run_scenarios(scenarios, args.replications, args.seed, args.workers)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
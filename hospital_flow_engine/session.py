@@ -0,0 +1,188 @@
+import hashlib
+import io
+import os
+from pathlib import Path
+
+import pandas as pd
+
+import jivy_metrics as metrics
+from hospital_flow_engine.columnar import fresh_table
+from hospital_flow_engine.engine.resource_model import HospitalResourceModel
+from hospital_flow_engine.engine.risk_engine import RiskAgent
+from hospital_flow_engine.simulate import DATA_DIR, iter_simulation, load_patients, simulate_frame
+
+
+# Bytes before the read offset re-hashed to detect an in-place rewrite
+TAIL_CHECK_BYTES = 4096
+
+
+def _stat(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _columnar_or_csv(csv_path):
+    # Up-to-date columnar copy of a CSV input (columnar.py), else the CSV
+    csv_path = Path(csv_path)
+    return fresh_table(csv_path.stem, data_dir=csv_path.parent) or csv_path
+
+
+class SimulationSession:
+    """
+    Simulation result kept alive between requests.
+
+    - Inputs are fingerprinted (size, mtime, content hash near the read
+      offset) together with the engine parameters
+    - refresh() is a no-op while nothing changed
+    - Full runs take the vectorized batch path (and columnar inputs when
+      they are fresh); rows appended to the patient file are pushed
+      through the retained RiskAgent, so only the tail is simulated
+    - Both paths stop at the last complete line of the patient file
+    - A patient file that changed without growing is hashed in full
+      against everything read so far
+    - Any other change (hospital files, rewritten patient file, new
+      parameters) triggers a full re-run
+    """
+
+    def __init__(self, patients_path=None, static_path=None, state_path=None,
+                 window_size=5):
+        self.patients_path = patients_path or DATA_DIR / "heart_attack_temporal_5steps.csv"
+        self.static_path = static_path or DATA_DIR / "hospital_static_extended.csv"
+        self.state_path = state_path or DATA_DIR / "hospital_state_extended.csv"
+        self.window_size = window_size
+
+        self.outputs = []
+        self.generation = 0     # bumps on every full re-run
+        self.version = 0        # bumps on every change
+        self.metrics = None     # stage timings of the last change (jivy_metrics.py)
+
+        self._params = None
+        self._resource_fingerprint = None
+        self._patients_fingerprint = None
+        self._offset = 0
+        self._columns = None
+        self._check_hash = None
+        self._read_hash = None  # running sha256 of the bytes read so far
+        self._risk_agent = None
+        self._resource_model = None
+
+    def _tail_hash(self, f, offset):
+        start = max(offset - TAIL_CHECK_BYTES, 0)
+        f.seek(start)
+        return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+    def _hash_read(self, f):
+        f.seek(0)
+        digest = hashlib.sha256()
+        remaining = self._offset
+        while remaining:
+            block = f.read(min(remaining, 1 << 20))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+        return digest.digest()
+
+    def refresh(self):
+        """
+        Bring outputs up to date with the input files.
+        Returns (mode, new_records): mode is None (unchanged), "tail"
+        (new_records were appended) or "full" (outputs were rebuilt).
+        """
+        before = metrics.snapshot() if metrics.enabled() else None
+        mode, new_records = self._refresh()
+
+        if mode is not None:
+            self.metrics = metrics.summary(since=before) if before is not None else None
+        return mode, new_records
+
+    def _refresh(self):
+        params = (self.window_size,)
+        resource_fingerprint = (_stat(self.static_path), _stat(self.state_path))
+        patients_fingerprint = _stat(self.patients_path)
+
+        if (
+            params != self._params
+            or resource_fingerprint != self._resource_fingerprint
+            or self._risk_agent is None
+        ):
+            return self._full_run(params, resource_fingerprint)
+
+        if patients_fingerprint == self._patients_fingerprint:
+            return None, []
+
+        size = patients_fingerprint[0]
+        with open(self.patients_path, "rb") as f:
+            if size <= self._patients_fingerprint[0]:
+                # Not an append: same-size in-place edits can sit anywhere,
+                # so compare everything read so far, not just the tail
+                if size < self._offset or self._hash_read(f) != self._read_hash.digest():
+                    return self._full_run(params, resource_fingerprint)
+                self._patients_fingerprint = patients_fingerprint
+                return None, []
+
+            if self._tail_hash(f, self._offset) != self._check_hash:
+                return self._full_run(params, resource_fingerprint)
+
+            f.seek(self._offset)
+            tail = f.read(size - self._offset)
+
+        # Only complete lines; a row still being written waits for next time
+        complete = tail.rfind(b"\n") + 1
+        self._patients_fingerprint = patients_fingerprint
+
+        if not tail[:complete].strip():
+            return None, []
+
+        rows = pd.read_csv(io.BytesIO(tail[:complete]), header=None, names=self._columns)
+        new_records = list(iter_simulation(rows, self._risk_agent, self._resource_model))
+
+        self._read_hash.update(tail[:complete])
+        with open(self.patients_path, "rb") as f:
+            self._offset += complete
+            self._check_hash = self._tail_hash(f, self._offset)
+
+        self.outputs.extend(new_records)
+        self.version += 1
+        return "tail", new_records
+
+    def _full_run(self, params, resource_fingerprint):
+        self._resource_model = HospitalResourceModel(
+            static_path=_columnar_or_csv(self.static_path),
+            state_path=_columnar_or_csv(self.state_path)
+        )
+        patients_fingerprint = _stat(self.patients_path)
+        with open(self.patients_path, "rb") as f:
+            data = f.read(patients_fingerprint[0])
+
+        # Only complete lines, as on the tail path
+        complete = data.rfind(b"\n") + 1
+        data = data[:complete]
+        self._columns = pd.read_csv(io.BytesIO(data), nrows=0).columns.tolist()
+
+        table = None
+        if complete == patients_fingerprint[0]:
+            table = fresh_table(Path(self.patients_path).stem,
+                                data_dir=Path(self.patients_path).parent)
+        patients = load_patients(table or io.BytesIO(data))
+
+        # One vectorized scoring pass serves the records and the agent the
+        # tail path continues with
+        scored = RiskAgent(window_size=self.window_size).score_frame(patients)
+        self.outputs = [
+            record for _, record in
+            simulate_frame(patients, self._resource_model, batch=True, scored=scored)
+        ]
+        self._risk_agent = RiskAgent.from_frame(patients, scored, window_size=self.window_size)
+
+        self._params = params
+        self._resource_fingerprint = resource_fingerprint
+        self._patients_fingerprint = patients_fingerprint
+        self._offset = complete
+        self._read_hash = hashlib.sha256(data)
+        with open(self.patients_path, "rb") as f:
+            self._check_hash = self._tail_hash(f, self._offset)
+
+        self.generation += 1
+        self.version += 1
+        return "full", self.outputs
@@ -1,10 +1,11 @@
 import pandas as pd
 from pathlib import Path
 
+import jivy_metrics as metrics
 from hospital_flow_engine.engine.risk_engine import RiskAgent
-from hospital_flow_engine.engine.pressure_engine import compute_pressure
-from hospital_flow_engine.engine.decision_engine import decide
+from hospital_flow_engine.engine.decision_engine import decide, decide_many
 from hospital_flow_engine.engine.resource_model import HospitalResourceModel
+from hospital_flow_engine.columnar import fresh_table, load_frame
 
 
 # ------------------------------------------------------------------
@@ -16,28 +17,267 @@ DATA_DIR = BASE_DIR / "data"                   # hospital_flow_engine/data
 
 
 
-def run_simulation():
+# Rows parsed per CSV chunk when streaming from a file
+STREAM_CHUNK_ROWS = 1000
+
+# Decisions that come with a transfer suggestion
+TRANSFER_DECISIONS = ("BLOCK", "ESCALATE")
+
+
+# Patient columns the engine reads
+PATIENT_COLUMNS = ["timestamp", "patient_id", "hospital_id", "heart_rate", "sbp", "troponin", "ck_mb"]
+
+
+def _input_path(name):
+    # Prefer an up-to-date columnar copy (see columnar.py) over the CSV
+    return fresh_table(name) or DATA_DIR / f"{name}.csv"
+
+
+def load_resource_model():
+    return HospitalResourceModel(
+        static_path=_input_path("hospital_static_extended"),
+        state_path=_input_path("hospital_state_extended")
+    )
+
+
+def run_simulation(batch=True, with_metrics=False, event_log=None):
     """
     Runs the hospital flow simulation and returns structured outputs
     suitable for post-hoc reasoning.
+
+    With batch=True the risk agent scores the whole cohort in one
+    vectorized pass; batch=False runs the original per-row loop.
+    Both produce the same records.
+
+    with_metrics=True returns (outputs, per-stage timing summary of this
+    run); the summary is empty unless metrics are enabled (jivy_metrics.py).
+    Decisions are also appended to `event_log` (a DecisionLogWriter,
+    see event_log.py) when given.
+    """
+    before = metrics.snapshot() if with_metrics else None
+
+    with metrics.timer("load_inputs"):
+        # ---- Load patient data ----
+        patients = load_patients()
+
+        # ---- Initialize models ----
+        resource_model = load_resource_model()
+
+    outputs = [
+        record for _, record in
+        simulate_frame(patients, resource_model, batch=batch, event_log=event_log)
+    ]
+
+    if with_metrics:
+        return outputs, metrics.summary(since=before)
+    return outputs
+
+
+def load_patients(path=None):
+    """
+    Patient vitals from a CSV (path or binary buffer) or a columnar
+    table directory (only the engine's columns are read from the latter).
     """
+    if path is None:
+        path = _input_path("heart_attack_temporal_5steps")
+    elif not hasattr(path, "read"):
+        path = Path(path)
 
-    # ---- Load patient data ----
-    patients = pd.read_csv(DATA_DIR / "heart_attack_temporal_5steps.csv")
+    if isinstance(path, Path) and path.is_dir():
+        return load_frame(path, PATIENT_COLUMNS)
+
+    patients = pd.read_csv(path)
     patients["timestamp"] = pd.to_datetime(patients["timestamp"])
+    return patients
+
+
+@metrics.timed("simulate_frame")
+def simulate_frame(patients, resource_model, risk_agent=None, batch=True,
+                   event_log=None, scored=None):
+    """
+    Simulates an already-loaded patient frame.
+    Returns (row index label, record) pairs in row order.
+    `scored` reuses a score_frame() result for `patients` (batch only).
+    """
+    risk_agent = risk_agent or RiskAgent(window_size=5)
+
+    if not batch:
+        # ---- Simulation loop ----
+        return [
+            (idx, _decision_record(patient, risk_state, resource_model, event_log))
+            for idx, patient, risk_state in _iter_row_risk_states(risk_agent, patients)
+        ]
+
+    scored = list(_iter_batch_risk_states(risk_agent, patients, scored))
+    placed = [_place(patient, resource_model) for _, patient, _ in scored]
+
+    # ---- One rules pass over the whole cohort ----
+    decisions, explanations = decide_many(
+        [risk_state for _, _, risk_state in scored],
+        [resource_state for _, resource_state in placed]
+    )
+
+    if event_log is not None:
+        for (_, patient, risk_state), (hospital_id, resource_state), decision, explanation in zip(
+            scored, placed, decisions, explanations
+        ):
+            event_log.append(
+                patient["timestamp"], patient["patient_id"], hospital_id,
+                risk_state, resource_state, decision, explanation
+            )
+
+    return [
+        (idx, _build_record(
+            patient, risk_state, hospital_id, resource_state,
+            decision, explanation, resource_model
+        ))
+        for (idx, patient, risk_state), (hospital_id, resource_state), decision, explanation
+        in zip(scored, placed, decisions, explanations)
+    ]
+
+
+def iter_simulation(source=None, risk_agent=None, resource_model=None, event_log=None):
+    """
+    Streams the simulation: yields one decision record per row as soon
+    as that patient has a full window, holding only the agent's rolling
+    state in memory.
+
+    `source` may be a CSV path (read in chunks), a DataFrame, or any
+    iterable of vitals row dicts; None streams the bundled cohort.
+    """
+    risk_agent = risk_agent or RiskAgent(window_size=5)
+    resource_model = resource_model or load_resource_model()
+
+    for patient in iter_patient_rows(source):
+        record = _step(patient, risk_agent, resource_model, event_log)
+        if record is not None:
+            yield record
+
+
+async def aiter_simulation(source, risk_agent=None, resource_model=None, event_log=None):
+    """
+    Async variant of iter_simulation for async row sources
+    (e.g. a socket reader); plain iterables are accepted too.
+    """
+    risk_agent = risk_agent or RiskAgent(window_size=5)
+    resource_model = resource_model or load_resource_model()
+
+    if not hasattr(source, "__aiter__"):
+        for record in iter_simulation(source, risk_agent, resource_model, event_log):
+            yield record
+        return
+
+    async for patient in source:
+        record = _step(_normalize_row(patient), risk_agent, resource_model, event_log)
+        if record is not None:
+            yield record
+
+
+def iter_patient_rows(source=None):
+    """
+    Yields vitals row dicts with parsed timestamps from a CSV path,
+    DataFrame or iterable of dicts.
+    """
+    if source is None:
+        source = DATA_DIR / "heart_attack_temporal_5steps.csv"
+
+    if isinstance(source, (str, Path)):
+        for chunk in pd.read_csv(source, chunksize=STREAM_CHUNK_ROWS):
+            chunk["timestamp"] = pd.to_datetime(chunk["timestamp"])
+            yield from chunk.to_dict("records")
+        return
+
+    if isinstance(source, pd.DataFrame):
+        frame = source.copy()
+        frame["timestamp"] = pd.to_datetime(frame["timestamp"])
+        yield from frame.to_dict("records")
+        return
+
+    for row in source:
+        yield _normalize_row(row)
+
 
-    # ---- Initialize models ----
-    resource_model = HospitalResourceModel(
-        static_path=DATA_DIR / "hospital_static_extended.csv",
-        state_path=DATA_DIR / "hospital_state_extended.csv"
+def _normalize_row(row):
+    if isinstance(row["timestamp"], pd.Timestamp):
+        return row
+    return {**row, "timestamp": pd.Timestamp(row["timestamp"])}
+
+
+def _step(patient, risk_agent, resource_model, event_log=None):
+    """
+    One simulation step: observe, update, decide. None until the
+    patient has enough temporal context.
+    """
+    risk_agent.observe(patient)
+    risk_state = risk_agent.update(patient["patient_id"])
+
+    if risk_state is None:
+        return None
+
+    return _decision_record(patient, risk_state, resource_model, event_log)
+
+
+def _place(patient, resource_model):
+    """
+    (hospital_id, resource_state) of the patient's hospital at the
+    row's timestamp.
+    """
+    # Patients without a hospital_id are placed in the default hospital
+    hospital_id = patient.get("hospital_id")
+    if hospital_id is None or pd.isna(hospital_id):
+        hospital_id = resource_model.default_hospital_id
+
+    resource_state = resource_model.resource_state_at(
+        patient["timestamp"], hospital_id
+    )
+    return hospital_id, resource_state
+
+
+def _decision_record(patient, risk_state, resource_model, event_log=None):
+    hospital_id, resource_state = _place(patient, resource_model)
+    decision, explanation = decide(risk_state, resource_state)
+
+    if event_log is not None:
+        event_log.append(
+            patient["timestamp"], patient["patient_id"], hospital_id,
+            risk_state, resource_state, decision, explanation
+        )
+
+    return _build_record(
+        patient, risk_state, hospital_id, resource_state,
+        decision, explanation, resource_model
     )
 
-    risk_agent = RiskAgent(window_size=5)
 
-    outputs = []
+def _build_record(patient, risk_state, hospital_id, resource_state,
+                  decision, explanation, resource_model):
+    pressure = resource_state["pressure"]
+
+    record = {
+        "timestamp": patient["timestamp"],
+        "patient_id": patient["patient_id"],
+        "hospital_id": hospital_id,
+        "risk_level": risk_state["risk_level"],
+        "signal_score": risk_state["signal_score"],
+        "decision": decision,
+        "engine_explanation": explanation,
+        "pressure": pressure,
+    }
+
+    # Point BLOCK / ESCALATE at the nearest facilities that can take them
+    if decision in TRANSFER_DECISIONS:
+        record["transfer_suggestion"] = resource_model.suggest_transfer(
+            patient["timestamp"], hospital_id
+        )
+
+    return record
+
 
-    # ---- Simulation loop ----
-    for _, row in patients.iterrows():
+def _iter_row_risk_states(risk_agent, patients):
+    """
+    Per-row path: observe + update every timestep.
+    """
+    for idx, row in patients.iterrows():
         patient = row.to_dict()
 
         risk_agent.observe(patient)
@@ -46,29 +286,37 @@ def run_simulation():
         if risk_state is None:
             continue
 
-        hospital_state = resource_model.get_latest_state()
-        hospital_static = resource_model.get_static()
+        yield idx, patient, risk_state
 
-        pressure = compute_pressure(hospital_state, hospital_static)
 
-        resource_state = HospitalResourceModel.build_resource_state(
-            hospital_state,
-            hospital_static,
-            pressure
-        )
+def _iter_batch_risk_states(risk_agent, patients, scored=None):
+    """
+    Batch path: score the whole cohort at once, then walk scored rows.
+    """
+    if scored is None:
+        scored = risk_agent.score_frame(patients)
+    rows = patients.loc[scored.index]
 
-        decision, explanation = decide(risk_state, resource_state)
+    if "hospital_id" in rows.columns:
+        hospital_ids = rows["hospital_id"]
+    else:
+        hospital_ids = [None] * len(rows)
 
-        record = {
-            "timestamp": patient["timestamp"],
-            "patient_id": patient["patient_id"],
-            "risk_level": risk_state["risk_level"],
-            "signal_score": risk_state["signal_score"],
-            "decision": decision,
-            "engine_explanation": explanation,
-            "pressure": pressure,
+    for idx, ts, pid, hid, level, score, confidence, reasons in zip(
+        rows.index,
+        rows["timestamp"],
+        rows["patient_id"],
+        hospital_ids,
+        scored["risk_level"].tolist(),
+        scored["signal_score"].tolist(),
+        scored["confidence"].tolist(),
+        scored["reasons"],
+    ):
+        patient = {"timestamp": ts, "patient_id": pid, "hospital_id": hid}
+        risk_state = {
+            "risk_level": level,
+            "signal_score": score,
+            "confidence": confidence,
+            "reasons": reasons,
         }
-
-        outputs.append(record)
-
-    return outputs
+        yield idx, patient, risk_state
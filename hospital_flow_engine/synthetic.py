@@ -0,0 +1,158 @@
+"""
+Synthetic inputs shaped like the bundled data, for benchmarks and
+capacity experiments at sizes the sample files cannot reach.
+
+- generate_cohort(): vitals rows like heart_attack_temporal_5steps.csv
+  (one row per patient step, grouped by patient, 30 minutes apart)
+- generate_network(): hospital (static, state) frames like
+  hospital_static_extended.csv / hospital_state_extended.csv
+- generate_arrivals(): admission requests like patient_stream.csv
+
+Everything is generated column-wise with numpy; ids are categorical so
+10M-row cohorts stay compact.
+"""
+import numpy as np
+import pandas as pd
+
+
+STEP_MINUTES = 30
+SNAPSHOT_MINUTES = 15
+
+# Share of patients whose vitals drift towards deterioration
+DETERIORATING_SHARE = 0.3
+
+# Severity from which an arrival needs an ICU bed (as in patient_stream.csv)
+ICU_SEVERITY = 80
+
+# Region the bundled hospitals sit in (Pune)
+CENTER_LAT = 18.52
+CENTER_LONG = 73.85
+SPREAD_DEG = 0.1
+
+
+def _ids(prefix, count, width):
+    return np.array([f"{prefix}{i:0{width}d}" for i in range(count)], dtype=object)
+
+
+def generate_cohort(rows, steps=5, hospital_ids=None, seed=0,
+                    start="2026-01-31 06:00:00", span_hours=168):
+    """
+    Patient vitals frame of about `rows` rows (`steps` per patient).
+
+    Patients arrive uniformly over `span_hours`; a DETERIORATING_SHARE
+    of them worsen step by step (rising heart rate and cardiac markers,
+    falling systolic pressure). With `hospital_ids`, each patient is
+    placed in one of them.
+    """
+    rng = np.random.default_rng(seed)
+    patients = max(1, rows // steps)
+    size = patients * steps
+
+    step = np.tile(np.arange(steps), patients)
+    worsening = np.repeat(rng.random(patients) < DETERIORATING_SHARE, steps)
+    drift = np.where(worsening, step, 0)
+
+    def per_patient(values):
+        return np.repeat(values, steps)
+
+    heart_rate = per_patient(rng.normal(80, 12, patients)) + drift * rng.uniform(4, 8, size)
+    sbp = per_patient(rng.normal(128, 20, patients)) - drift * rng.uniform(5, 10, size)
+    troponin = per_patient(rng.lognormal(np.log(0.014), 1.0, patients)) * 1.6 ** drift
+    ck_mb = per_patient(rng.lognormal(np.log(3.0), 0.6, patients)) * 1.3 ** drift
+
+    arrival = pd.Timestamp(start).value + per_patient(
+        rng.integers(0, span_hours * 60, patients) * 60_000_000_000
+    )
+    timestamp = arrival + step * STEP_MINUTES * 60_000_000_000
+
+    frame = pd.DataFrame({
+        "timestamp": pd.to_datetime(timestamp),
+        "patient_id": pd.Categorical.from_codes(
+            np.repeat(np.arange(patients), steps), categories=_ids("P", patients, 7)
+        ),
+        "age": per_patient(rng.integers(25, 91, patients)),
+        "gender": per_patient(rng.integers(0, 2, patients)),
+        "heart_rate": np.rint(heart_rate + rng.normal(0, 3, size)).astype(np.int64),
+        "sbp": np.rint(sbp + rng.normal(0, 4, size)).astype(np.int64),
+        "dbp": np.rint(rng.normal(69, 12, size)).astype(np.int64),
+        "ck_mb": np.round(ck_mb, 2),
+        "troponin": np.round(troponin, 3),
+    })
+
+    if hospital_ids is not None:
+        hospital_ids = np.asarray(hospital_ids, dtype=object)
+        frame["hospital_id"] = pd.Categorical.from_codes(
+            per_patient(rng.integers(0, len(hospital_ids), patients)),
+            categories=hospital_ids
+        )
+
+    return frame
+
+
+def generate_network(hospitals, snapshots=1, seed=0, start="2026-01-31 06:00:00"):
+    """
+    (static, state) frames for `hospitals` facilities with `snapshots`
+    state rows each, SNAPSHOT_MINUTES apart.
+
+    Static rows carry no hospital_id and are listed in the order the
+    hospitals first appear in the state rows, as in the bundled files.
+    Occupancy random-walks within capacity.
+    """
+    rng = np.random.default_rng(seed)
+    hospital_ids = _ids("HOSP_", hospitals, 3 if hospitals <= 1000 else 6)
+
+    icu_total = rng.integers(4, 25, hospitals)
+    ward_total = rng.integers(20, 100, hospitals)
+
+    static = pd.DataFrame({
+        "name": [f"Synthetic Hospital {i}" for i in range(hospitals)],
+        "facility_type": rng.choice(["private hospital", "public hospital"], hospitals),
+        "icu_beds_total": icu_total,
+        "ward_beds_total": ward_total,
+        "trauma_supported": rng.choice(["Yes", "No"], hospitals),
+        "max_daily_admissions": rng.integers(10, 60, hospitals),
+    })
+
+    def walk(total, start_share):
+        level = np.rint(total * start_share)
+        steps = rng.integers(-1, 2, (snapshots, hospitals))
+        steps[0] = 0
+        occupied = np.clip(level + np.cumsum(steps, axis=0), 0, total)
+        return occupied.astype(np.int64).ravel()
+
+    # Rows ordered by snapshot time, then hospital
+    tick = np.repeat(np.arange(snapshots), hospitals)
+    state = pd.DataFrame({
+        "hospital_id": np.tile(hospital_ids, snapshots),
+        "lat": np.tile(CENTER_LAT + rng.uniform(-SPREAD_DEG, SPREAD_DEG, hospitals), snapshots),
+        "long": np.tile(CENTER_LONG + rng.uniform(-SPREAD_DEG, SPREAD_DEG, hospitals), snapshots),
+        "icu_beds_total": np.tile(icu_total, snapshots),
+        "ward_beds_total": np.tile(ward_total, snapshots),
+        "icu_beds_occupied": walk(icu_total, rng.uniform(0.4, 0.95, hospitals)),
+        "ward_beds_occupied": walk(ward_total, rng.uniform(0.3, 0.9, hospitals)),
+        "icu_accepting": np.where(rng.random(len(tick)) < 0.95, "Yes", "No"),
+        "ward_accepting": np.where(rng.random(len(tick)) < 0.95, "Yes", "No"),
+        "timestamp": pd.Timestamp(start) + pd.to_timedelta(tick * SNAPSHOT_MINUTES, unit="min"),
+    })
+
+    return static, state
+
+
+def generate_arrivals(count, span_hours=168, seed=0, start="2026-01-31 06:00:00"):
+    """
+    Admission request frame of `count` arrivals spread uniformly over
+    `span_hours`, sorted by arrival_time.
+    """
+    rng = np.random.default_rng(seed)
+
+    minutes = np.sort(rng.integers(0, span_hours * 60, count))
+    severity = np.clip(np.rint(rng.normal(62, 16, count)), 1, 100).astype(np.int64)
+
+    return pd.DataFrame({
+        "patient_id": _ids("PAT_", count, 4 if count <= 10_000 else 7),
+        "arrival_time": pd.Timestamp(start) + pd.to_timedelta(minutes, unit="min"),
+        "severity_score": severity,
+        "requires_icu": (severity >= ICU_SEVERITY).astype(np.int64),
+        "source": rng.choice(["ER", "External", "Transfer"], count, p=[0.5, 0.2, 0.3]),
+        "estimated_cost": np.rint(rng.lognormal(np.log(12_000), 0.7, count)).astype(np.int64),
+    })
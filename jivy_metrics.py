@@ -0,0 +1,332 @@
+"""
+Per-stage timing and LLM token counters, shared by the engine, the
+reasoning chains and the API. Depends on neither package.
+
+- timed(stage): decorator recording the call's duration (sync, async
+  and async-generator functions)
+- timer(stage): context manager for timing a block
+- count_tokens(chain, prompt, completion) / count_reply(chain, prompt,
+  message): LLM token counters
+
+Everything is off by default (JIVY_METRICS=1 turns it on at start-up)
+and can be toggled at runtime with enable() / disable(). While off,
+a timed function costs one extra call and a flag check; nothing is
+recorded.
+
+Durations go into fixed-bucket histograms, so memory stays constant
+however many calls are timed. Metrics are per process: work done in
+pool workers (hospital_flow_engine.parallel /
+scenarios) is not counted here.
+
+Read them back with summary() (JSON-friendly, optionally relative to an
+earlier snapshot()) or prometheus_text() (Prometheus exposition format).
+"""
+import bisect
+import functools
+import inspect
+import os
+import threading
+import time
+
+import numpy as np
+
+
+# Histogram bucket upper bounds in seconds: 1us .. 10s, 4 per decade
+BUCKETS = tuple(float(f"{b:.3g}") for b in np.logspace(-6, 1, 29))
+
+METRIC_PREFIX = "jivy"
+
+_enabled = os.environ.get("JIVY_METRICS", "").lower() in ("1", "true", "yes", "on")
+_lock = threading.Lock()
+_stages = {}
+_tokens = {}
+
+_clock = time.perf_counter
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enabled():
+    return _enabled
+
+
+def reset():
+    """
+    Drop everything recorded so far.
+    """
+    with _lock:
+        _stages.clear()
+        _tokens.clear()
+
+
+# --------------------------------------------------
+# Recording
+# --------------------------------------------------
+class StageHistogram:
+    """
+    Call count, total seconds and bucket counts of one stage.
+    """
+
+    def __init__(self):
+        self.counts = np.zeros(len(BUCKETS) + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def copy(self):
+        other = StageHistogram()
+        other.counts = self.counts.copy()
+        other.count = self.count
+        other.total = self.total
+        return other
+
+    def minus(self, earlier):
+        other = self.copy()
+        if earlier is not None:
+            other.counts -= earlier.counts
+            other.count -= earlier.count
+            other.total -= earlier.total
+        return other
+
+    def percentile(self, q):
+        """
+        Upper bound of the bucket holding the q-th percentile.
+        """
+        if not self.count:
+            return None
+        rank = np.searchsorted(np.cumsum(self.counts), q / 100 * self.count)
+        return BUCKETS[rank] if rank < len(BUCKETS) else float("inf")
+
+
+def observe(stage, seconds):
+    with _lock:
+        histogram = _stages.get(stage)
+        if histogram is None:
+            histogram = _stages[stage] = StageHistogram()
+        histogram.observe(seconds)
+
+
+def count_tokens(chain, prompt, completion):
+    """
+    Add one LLM call's prompt / completion token counts for `chain`.
+    """
+    if not _enabled:
+        return
+    with _lock:
+        counts = _tokens.setdefault(chain, {"prompt": 0, "completion": 0})
+        counts["prompt"] += prompt
+        counts["completion"] += completion
+
+
+def count_reply(chain, prompt, message):
+    """
+    count_tokens() for one chat model reply (see message_tokens).
+    """
+    if _enabled:
+        count_tokens(chain, *message_tokens(prompt, message))
+
+
+def approximate_tokens(text):
+    """
+    Whitespace token count, for backends that report no usage.
+    """
+    return len(str(text).split())
+
+
+def message_tokens(prompt, message):
+    """
+    (prompt, completion) token counts of a chat model reply: reported
+    usage when the backend gives it, else an approximation.
+    """
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+
+    metadata = getattr(message, "response_metadata", None) or {}
+    if "eval_count" in metadata:
+        # Ollama's own counters
+        return metadata.get("prompt_eval_count", 0), metadata["eval_count"]
+
+    return approximate_tokens(prompt), approximate_tokens(message.content)
+
+
+class _Timer:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = _clock()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.stage, _clock() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(stage):
+    """
+    `with timer("stage"):` times the block while metrics are enabled.
+    """
+    return _Timer(stage) if _enabled else _NULL_TIMER
+
+
+def timed(stage):
+    """
+    Decorator timing every call of the function as `stage`.
+    """
+    def wrap(fn):
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            async def timed_agen(*args, **kwargs):
+                if not _enabled:
+                    async for item in fn(*args, **kwargs):
+                        yield item
+                    return
+                # Time to the last item, including time spent waiting on
+                # the model between items
+                start = _clock()
+                try:
+                    async for item in fn(*args, **kwargs):
+                        yield item
+                finally:
+                    observe(stage, _clock() - start)
+            return timed_agen
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def timed_async(*args, **kwargs):
+                if not _enabled:
+                    return await fn(*args, **kwargs)
+                start = _clock()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    observe(stage, _clock() - start)
+            return timed_async
+
+        @functools.wraps(fn)
+        def timed_call(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = _clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(stage, _clock() - start)
+        return timed_call
+
+    return wrap
+
+
+# --------------------------------------------------
+# Reading
+# --------------------------------------------------
+def snapshot():
+    """
+    Copy of everything recorded so far, for summary(since=...).
+    """
+    with _lock:
+        return {
+            "stages": {stage: h.copy() for stage, h in _stages.items()},
+            "tokens": {chain: dict(c) for chain, c in _tokens.items()},
+        }
+
+
+def summary(since=None):
+    """
+    Per-stage calls / total / mean / p50 / p95 / p99 (milliseconds;
+    percentiles are bucket upper bounds) and token counts per chain.
+    With `since` (a snapshot()), only what was recorded after it.
+    """
+    current = snapshot()
+    since = since or {"stages": {}, "tokens": {}}
+
+    stages = {}
+    for stage, histogram in sorted(current["stages"].items()):
+        histogram = histogram.minus(since["stages"].get(stage))
+        if not histogram.count:
+            continue
+        stages[stage] = {
+            "calls": histogram.count,
+            "total_ms": round(histogram.total * 1e3, 6),
+            "mean_ms": round(histogram.total / histogram.count * 1e3, 6),
+            **{
+                f"p{q}_ms": round(histogram.percentile(q) * 1e3, 6)
+                for q in (50, 95, 99)
+            },
+        }
+
+    tokens = {}
+    for chain, counts in sorted(current["tokens"].items()):
+        before = since["tokens"].get(chain, {})
+        counts = {kind: n - before.get(kind, 0) for kind, n in counts.items()}
+        if any(counts.values()):
+            tokens[chain] = counts
+
+    return {"enabled": _enabled, "stages": stages, "llm_tokens": tokens}
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    """
+    All metrics in the Prometheus text exposition format.
+    """
+    current = snapshot()
+    stage_metric = f"{METRIC_PREFIX}_stage_duration_seconds"
+    token_metric = f"{METRIC_PREFIX}_llm_tokens_total"
+
+    lines = [
+        f"# HELP {METRIC_PREFIX}_metrics_enabled Whether stage timing is recording.",
+        f"# TYPE {METRIC_PREFIX}_metrics_enabled gauge",
+        f"{METRIC_PREFIX}_metrics_enabled {int(_enabled)}",
+        f"# HELP {stage_metric} Time spent per engine / reasoning stage call.",
+        f"# TYPE {stage_metric} histogram",
+    ]
+    for stage, histogram in sorted(current["stages"].items()):
+        stage = _label(stage)
+        cumulative = np.cumsum(histogram.counts)
+        for bound, count in zip(BUCKETS, cumulative):
+            lines.append(f'{stage_metric}_bucket{{stage="{stage}",le="{bound:g}"}} {count}')
+        lines.append(f'{stage_metric}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+        lines.append(f'{stage_metric}_sum{{stage="{stage}"}} {histogram.total!r}')
+        lines.append(f'{stage_metric}_count{{stage="{stage}"}} {histogram.count}')
+
+    lines += [
+        f"# HELP {token_metric} LLM tokens per reasoning chain.",
+        f"# TYPE {token_metric} counter",
+    ]
+    for chain, counts in sorted(current["tokens"].items()):
+        for kind, n in sorted(counts.items()):
+            lines.append(f'{token_metric}{{chain="{_label(chain)}",kind="{kind}"}} {n}')
+
+    return "\n".join(lines) + "\n"
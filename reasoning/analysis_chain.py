@@ -1,12 +1,9 @@
-from reasoning.llm import llm
+import jivy_metrics as metrics
+from reasoning.llm import get_llm
 
 
-def analysis_chain(simulation_record: dict):
-    """
-    Analyzes a single simulation outcome.
-    """
-
-    prompt = f"""
+def analysis_prompt(simulation_record: dict):
+    return f"""
     You are analyzing the output of a hospital flow simulation.
 
     Simulation record:
@@ -20,4 +17,26 @@ def analysis_chain(simulation_record: dict):
     - Do NOT invent new data
     """
 
-    return llm.invoke(prompt).content
+
+@metrics.timed("llm_analysis")
+def analysis_chain(simulation_record: dict):
+    """
+    Analyzes a single simulation outcome.
+    """
+
+    prompt = analysis_prompt(simulation_record)
+    message = get_llm().invoke(prompt)
+    metrics.count_reply("analysis", prompt, message)
+    return message.content
+
+
+@metrics.timed("llm_analysis")
+async def analysis_chain_async(simulation_record: dict):
+    """
+    Non-blocking analysis_chain.
+    """
+
+    prompt = analysis_prompt(simulation_record)
+    message = await get_llm().ainvoke(prompt)
+    metrics.count_reply("analysis", prompt, message)
+    return message.content
@@ -0,0 +1,128 @@
+"""
+Batch explanations for a whole simulation run.
+
+Records that differ only by patient / time (same risk level, score
+bucket, decision, engine explanation and pressure band) get the same
+explanation, so each equivalence class is explained once and the text
+is fanned back out to every member.
+
+Run from project root: python -m reasoning.batch --out shift_report.jsonl
+"""
+import argparse
+import json
+import math
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from reasoning.post_simulation_chain import explain_simulation_output
+
+
+SCORE_BUCKET = 2
+PRESSURE_BAND = 0.1
+
+
+def equivalence_key(record: dict, score_bucket=SCORE_BUCKET, pressure_band=PRESSURE_BAND):
+    return (
+        record.get("risk_level"),
+        int(record.get("signal_score", 0)) // score_bucket,
+        record.get("decision"),
+        record.get("engine_explanation"),
+        math.floor(float(record.get("pressure", 0)) / pressure_band + 1e-9),
+    )
+
+
+def class_record(key, score_bucket=SCORE_BUCKET, pressure_band=PRESSURE_BAND):
+    """
+    The record sent to the LLM for one class: shared fields only, with
+    score and pressure given as the ranges the class covers.
+    """
+    risk_level, bucket, decision, engine_explanation, band = key
+    low = bucket * score_bucket
+
+    return {
+        "risk_level": risk_level,
+        "signal_score": f"{low}-{low + score_bucket - 1}",
+        "decision": decision,
+        "engine_explanation": engine_explanation,
+        "pressure": f"{band * pressure_band:.2f}-{(band + 1) * pressure_band:.2f}",
+    }
+
+
+def group_records(outputs, score_bucket=SCORE_BUCKET, pressure_band=PRESSURE_BAND):
+    """
+    {equivalence key: [indexes into outputs]} in first-seen order.
+    """
+    groups = {}
+    for i, record in enumerate(outputs):
+        key = equivalence_key(record, score_bucket, pressure_band)
+        groups.setdefault(key, []).append(i)
+    return groups
+
+
+def explain_batch(outputs, audience="doctor", workers=4, fused=False,
+                  score_bucket=SCORE_BUCKET, pressure_band=PRESSURE_BAND):
+    """
+    Explains every record in `outputs`, one LLM run per equivalence
+    class, with up to `workers` classes in flight. Returns explanations
+    aligned with `outputs`. LLM errors propagate; classes explained
+    before the error are kept by the explanation cache.
+    """
+    groups = group_records(outputs, score_bucket, pressure_band)
+    keys = list(groups)
+
+    def explain(key):
+        return explain_simulation_output(
+            simulation_record=class_record(key, score_bucket, pressure_band),
+            audience=audience,
+            fused=fused,
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        texts = list(pool.map(explain, keys))
+
+    explanations = [None] * len(outputs)
+    for key, text in zip(keys, texts):
+        for i in groups[key]:
+            explanations[i] = text
+
+    return explanations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Explain a full simulation run.")
+    parser.add_argument("--audience", default="doctor")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--fused", action="store_true",
+                        help="one LLM generation per class instead of two")
+    parser.add_argument("--out", default="-", help="JSONL path, or - for stdout")
+    args = parser.parse_args()
+
+    from hospital_flow_engine.simulate import run_simulation
+
+    outputs = run_simulation()
+    explanations = explain_batch(
+        outputs, audience=args.audience, workers=args.workers, fused=args.fused
+    )
+
+    lines = (
+        json.dumps({**record, "explanation": text}, default=str)
+        for record, text in zip(outputs, explanations)
+    )
+
+    if args.out == "-":
+        for line in lines:
+            print(line)
+    else:
+        with open(args.out, "w") as f:
+            for line in lines:
+                f.write(line + "\n")
+
+    print(
+        f"Explained {len(outputs)} records with "
+        f"{len(group_records(outputs))} LLM runs.",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# Bump whenever the analysis / explanation prompts change so stale
+# explanations are never served for the new wording.
+PROMPT_VERSION = "1"
+
+
+def _normalize(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    return str(value)
+
+
+def explanation_key(simulation_record: dict, audience: str, model: str):
+    """
+    Content address of one explanation: the normalized record, the
+    audience, the model and the prompt version.
+    """
+    payload = json.dumps(
+        {
+            "record": simulation_record,
+            "audience": audience,
+            "model": model,
+            "prompt_version": PROMPT_VERSION,
+        },
+        sort_keys=True,
+        default=_normalize,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ExplanationCache:
+    """
+    Two-tier explanation cache.
+
+    - Memory: LRU of up to `max_entries` explanations
+    - Disk (optional, `path`): SQLite table that survives restarts,
+      trimmed to `max_disk_entries` least recently used rows
+
+    Entries older than `ttl_seconds` (if set) are treated as misses.
+
+    Disk reads never write: access times are buffered and saved with the
+    next write (or every `touch_batch` disk hits). Coroutines use aget() /
+    aset(), which answer memory hits inline and run disk work in a
+    worker thread so the event loop never waits on SQLite.
+    """
+
+    def __init__(self, max_entries=1024, path=None, ttl_seconds=None,
+                 max_disk_entries=100_000, touch_batch=256):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self.touch_batch = touch_batch
+        self.path = str(path) if path else None
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()       # memory tier and counters
+        self._db_lock = threading.Lock()    # SQLite connection
+        self._db = None
+        self._disk_entries = 0
+        self._touched = {}                  # key -> access time not yet saved
+        self._stale = set()                 # expired keys not yet deleted
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.path:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS explanations ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created REAL NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS explanations_accessed"
+                " ON explanations (accessed)"
+            )
+            self._db.commit()
+            self._disk_entries = self._db.execute(
+                "SELECT COUNT(*) FROM explanations"
+            ).fetchone()[0]
+
+    def _expired(self, created, now):
+        return self.ttl_seconds is not None and now - created > self.ttl_seconds
+
+    # ---- Lookups ----
+    def get(self, key):
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None or self._db is None:
+            return value if value is not None else self._miss()
+        return self._disk_get(key, now)
+
+    async def aget(self, key):
+        """
+        get() for coroutines: disk lookups run in a worker thread.
+        """
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None or self._db is None:
+            return value if value is not None else self._miss()
+        return await asyncio.to_thread(self._disk_get, key, now)
+
+    def _memory_get(self, key, now):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            value, created = entry
+            if self._expired(created, now):
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self.hits += 1
+            self.memory_hits += 1
+            return value
+
+    def _miss(self):
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _disk_get(self, key, now):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, created FROM explanations WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or self._expired(row[1], now):
+                if row is not None:
+                    self._stale.add(key)
+                return self._miss()
+
+            self._touched[key] = now
+            if len(self._touched) >= self.touch_batch:
+                self._flush()
+                self._db.commit()
+
+        value, created = row
+        with self._lock:
+            self._remember(key, value, created)
+            self.hits += 1
+            self.disk_hits += 1
+        return value
+
+    # ---- Writes ----
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+        if self._db is not None:
+            self._disk_set(key, value, now)
+
+    async def aset(self, key, value):
+        """
+        set() for coroutines: the disk write runs in a worker thread.
+        """
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_set, key, value, now)
+
+    def _disk_set(self, key, value, now):
+        with self._db_lock:
+            self._touched.pop(key, None)
+            self._stale.discard(key)
+            self._flush()
+
+            updated = self._db.execute(
+                "UPDATE explanations SET value = ?, created = ?, accessed = ?"
+                " WHERE key = ?",
+                (value, now, now, key)
+            ).rowcount
+            if not updated:
+                self._db.execute(
+                    "INSERT INTO explanations VALUES (?, ?, ?, ?)",
+                    (key, value, now, now)
+                )
+                self._disk_entries += 1
+
+            # Trim only past the limit, dropping just the excess
+            excess = self._disk_entries - self.max_disk_entries
+            if excess > 0:
+                self._disk_entries -= self._db.execute(
+                    "DELETE FROM explanations WHERE key IN ("
+                    " SELECT key FROM explanations ORDER BY accessed LIMIT ?)",
+                    (excess,)
+                ).rowcount
+
+            self._db.commit()
+
+    def _flush(self):
+        # Buffered access times and expired-row deletes; the caller holds
+        # _db_lock and commits
+        if self._touched:
+            self._db.executemany(
+                "UPDATE explanations SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()]
+            )
+            self._touched.clear()
+        if self._stale:
+            self._disk_entries -= self._db.executemany(
+                "DELETE FROM explanations WHERE key = ?",
+                [(key,) for key in self._stale]
+            ).rowcount
+            self._stale.clear()
+
+    def _remember(self, key, value, created):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._touched.clear()
+                self._stale.clear()
+                self._db.execute("DELETE FROM explanations")
+                self._db.commit()
+                self._disk_entries = 0
+
+    def flush(self):
+        """
+        Save buffered access times now (e.g. before shutdown).
+        """
+        if self._db is not None:
+            with self._db_lock:
+                self._flush()
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": self._disk_entries if self._db is not None else None,
+                "prompt_version": PROMPT_VERSION,
+            }
+
+
+# ------------------------------------------------------------------
+# Process-wide cache used by explain_simulation_output
+# ------------------------------------------------------------------
+_cache = ExplanationCache()
+
+
+def configure_cache(**kwargs):
+    """
+    Replace the process-wide cache (e.g. to add a disk tier).
+    Accepts the ExplanationCache arguments.
+    """
+    global _cache
+    _cache = ExplanationCache(**kwargs)
+    return _cache
+
+
+def get_cache():
+    return _cache
@@ -1,12 +1,9 @@
-from reasoning.llm import llm
+import jivy_metrics as metrics
+from reasoning.llm import get_llm
 
 
-def explanation_chain(analysis: str, audience: str):
-    """
-    Converts technical analysis into a clear explanation.
-    """
-
-    prompt = f"""
+def explanation_prompt(analysis: str, audience: str):
+    return f"""
     Explain the following analysis to a {audience}.
 
     Analysis:
@@ -19,4 +16,48 @@ def explanation_chain(analysis: str, audience: str):
     - Clearly state uncertainty if present
     """
 
-    return llm.invoke(prompt).content
+
+@metrics.timed("llm_explanation")
+def explanation_chain(analysis: str, audience: str):
+    """
+    Converts technical analysis into a clear explanation.
+    """
+
+    prompt = explanation_prompt(analysis, audience)
+    message = get_llm().invoke(prompt)
+    metrics.count_reply("explanation", prompt, message)
+    return message.content
+
+
+@metrics.timed("llm_explanation")
+async def explanation_chain_async(analysis: str, audience: str):
+    """
+    Non-blocking explanation_chain.
+    """
+
+    prompt = explanation_prompt(analysis, audience)
+    message = await get_llm().ainvoke(prompt)
+    metrics.count_reply("explanation", prompt, message)
+    return message.content
+
+
+@metrics.timed("llm_explanation_stream")
+async def explanation_chain_stream(analysis: str, audience: str):
+    """
+    Streams explanation_chain tokens as the model generates them.
+    """
+
+    prompt = explanation_prompt(analysis, audience)
+    parts = []
+
+    async for chunk in get_llm().astream(prompt):
+        if chunk.content:
+            parts.append(chunk.content)
+            yield chunk.content
+
+    # Streams carry no usage report; counts are approximate
+    metrics.count_tokens(
+        "explanation",
+        metrics.approximate_tokens(prompt),
+        metrics.approximate_tokens("".join(parts)),
+    )
@@ -0,0 +1,71 @@
+import jivy_metrics as metrics
+from reasoning.llm import get_llm
+
+
+def fused_prompt(simulation_record: dict, audience: str):
+    return f"""
+    You are explaining the output of a hospital flow simulation
+    to a {audience}.
+
+    Simulation record:
+    {simulation_record}
+
+    First, in two or three bullet points, identify the main drivers of
+    the decision and how risk level and hospital pressure interacted.
+    Then write the explanation for the {audience}.
+
+    Constraints:
+    - Distinguish model output from rule-based logic
+    - Do NOT recommend alternative actions
+    - Do NOT invent new data
+    - Be clear and concise
+    - Use domain-appropriate language
+    - Avoid speculation
+    - Clearly state uncertainty if present
+    """
+
+
+@metrics.timed("llm_fused")
+def fused_chain(simulation_record: dict, audience: str):
+    """
+    Analysis and audience explanation in a single generation.
+    """
+
+    prompt = fused_prompt(simulation_record, audience)
+    message = get_llm().invoke(prompt)
+    metrics.count_reply("fused", prompt, message)
+    return message.content
+
+
+@metrics.timed("llm_fused")
+async def fused_chain_async(simulation_record: dict, audience: str):
+    """
+    Non-blocking fused_chain.
+    """
+
+    prompt = fused_prompt(simulation_record, audience)
+    message = await get_llm().ainvoke(prompt)
+    metrics.count_reply("fused", prompt, message)
+    return message.content
+
+
+@metrics.timed("llm_fused_stream")
+async def fused_chain_stream(simulation_record: dict, audience: str):
+    """
+    Streams fused_chain tokens as the model generates them.
+    """
+
+    prompt = fused_prompt(simulation_record, audience)
+    parts = []
+
+    async for chunk in get_llm().astream(prompt):
+        if chunk.content:
+            parts.append(chunk.content)
+            yield chunk.content
+
+    # Streams carry no usage report; counts are approximate
+    metrics.count_tokens(
+        "fused",
+        metrics.approximate_tokens(prompt),
+        metrics.approximate_tokens("".join(parts)),
+    )
@@ -1,11 +1,77 @@
-from langchain_community.chat_models import ChatOllama
+import os
 
 
-def get_llm():
+MODEL_NAME = os.environ.get("JIVY_LLM_MODEL", "mistral")
+
+# Backend used when none is set explicitly: ollama | template | stub
+DEFAULT_PROVIDER = os.environ.get("JIVY_LLM_PROVIDER", "ollama")
+
+_providers = {}
+_provider = DEFAULT_PROVIDER
+_llm = None
+
+
+def register_provider(name: str, factory):
+    """
+    Register an LLM backend. `factory()` is called on first use.
+    """
+    _providers[name] = factory
+
+
+def _ollama():
+    # Imported here so engine-only processes never load langchain
+    from langchain_community.chat_models import ChatOllama
+
     return ChatOllama(
-        model="mistral",     # or "mistral"
+        model=MODEL_NAME,    # or "mistral"
         temperature=0.2,
     )
 
 
-llm = get_llm()
+def _template():
+    from reasoning.providers import TemplateLLM
+    return TemplateLLM()
+
+
+def _stub():
+    from reasoning.providers import StubLLM
+    return StubLLM()
+
+
+register_provider("ollama", _ollama)
+register_provider("template", _template)
+register_provider("stub", _stub)
+
+
+def set_provider(name: str):
+    """
+    Switch backend; the new one is built lazily on next use.
+    """
+    global _provider, _llm
+    if name not in _providers:
+        raise ValueError(f"Unknown LLM provider: {name}")
+    _provider = name
+    _llm = None
+
+
+def model_name():
+    """
+    Identity of the active backend, used in explanation cache keys.
+    """
+    if _provider == "ollama":
+        return MODEL_NAME
+    return f"{_provider}:{MODEL_NAME}"
+
+
+def get_llm():
+    global _llm
+    if _llm is None:
+        _llm = _providers[_provider]()
+    return _llm
+
+
+def __getattr__(name):
+    # Backwards compatible `from reasoning.llm import llm`, resolved lazily
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
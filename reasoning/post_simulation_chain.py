@@ -1,17 +1,196 @@
-from reasoning.analysis_chain import analysis_chain
-from reasoning.explanation_chain import explanation_chain
+import asyncio
+import os
+import weakref
 
+from reasoning.analysis_chain import analysis_chain, analysis_chain_async
+from reasoning.cache import explanation_key, get_cache
+from reasoning.explanation_chain import (
+    explanation_chain,
+    explanation_chain_async,
+    explanation_chain_stream,
+)
+from reasoning.fused_chain import fused_chain, fused_chain_async, fused_chain_stream
+from reasoning.llm import model_name
 
-def explain_simulation_output(simulation_record: dict, audience: str):
+
+# Max LLM pipelines running at once against the model server
+LLM_CONCURRENCY = int(os.environ.get("JIVY_LLM_CONCURRENCY", "2"))
+
+# Semaphores and in-flight tasks belong to one event loop, so both are
+# kept per running loop (a new loop, e.g. asyncio.run() in a script or a
+# test client, starts with its own)
+_limiters = weakref.WeakKeyDictionary()
+_in_flight = weakref.WeakKeyDictionary()
+
+
+def configure_concurrency(limit: int):
+    """
+    Set how many explanation pipelines may call the LLM concurrently.
+    """
+    global LLM_CONCURRENCY
+    LLM_CONCURRENCY = limit
+    _limiters.clear()
+
+
+def _get_limiter():
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(loop)
+    if limiter is None:
+        limiter = _limiters[loop] = asyncio.Semaphore(LLM_CONCURRENCY)
+    return limiter
+
+
+def _get_in_flight():
+    loop = asyncio.get_running_loop()
+    in_flight = _in_flight.get(loop)
+    if in_flight is None:
+        in_flight = _in_flight[loop] = {}
+    return in_flight
+
+
+def _model_key(fused):
+    # Fused output differs from the two-step chain, so cache it apart
+    return f"{model_name()}+fused" if fused else model_name()
+
+
+def explain_simulation_output(simulation_record: dict, audience: str,
+                              use_cache=True, fused=False):
     """
     Runs reasoning strictly AFTER simulation output is known.
+    Identical record / audience / model / prompt version hits the cache.
+    """
+
+    cache = get_cache() if use_cache else None
+    key = explanation_key(simulation_record, audience, _model_key(fused))
+
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    if fused:
+        explanation = fused_chain(simulation_record, audience)
+    else:
+        analysis = analysis_chain(simulation_record)
+
+        explanation = explanation_chain(
+            analysis=analysis,
+            audience=audience
+        )
+
+    if cache is not None:
+        cache.set(key, explanation)
+
+    return explanation
+
+
+async def explain_simulation_output_async(simulation_record: dict, audience: str,
+                                          use_cache=True, timeout=None, fused=False):
     """
+    Non-blocking explain_simulation_output.
+    fused=True asks for analysis + explanation in one generation.
+
+    - At most LLM_CONCURRENCY pipelines talk to the LLM at once
+    - Concurrent requests for the same record / audience share one run
+    - Raises asyncio.TimeoutError after `timeout` seconds; the shared
+      run keeps going so its result still lands in the cache
+    """
+
+    cache = get_cache() if use_cache else None
+    key = explanation_key(simulation_record, audience, _model_key(fused))
+
+    if cache is not None:
+        cached = await cache.aget(key)
+        if cached is not None:
+            return cached
+
+    in_flight = _get_in_flight()
+    task = in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(
+            _run_pipeline(simulation_record, audience, key, cache, fused)
+        )
+        in_flight[key] = task
+        task.add_done_callback(lambda done: _finish(in_flight, key, done))
+
+    return await asyncio.wait_for(asyncio.shield(task), timeout)
 
-    analysis = analysis_chain(simulation_record)
 
-    explanation = explanation_chain(
-        analysis=analysis,
-        audience=audience
-    )
+def _finish(in_flight, key, task):
+    if in_flight.get(key) is task:
+        del in_flight[key]
+    # Mark the error as retrieved even if every waiter already timed out
+    if not task.cancelled():
+        task.exception()
+
+
+async def _run_pipeline(simulation_record, audience, key, cache, fused=False):
+    async with _get_limiter():
+        if fused:
+            explanation = await fused_chain_async(simulation_record, audience)
+        else:
+            analysis = await analysis_chain_async(simulation_record)
+
+            explanation = await explanation_chain_async(
+                analysis=analysis,
+                audience=audience
+            )
+
+    if cache is not None:
+        await cache.aset(key, explanation)
 
     return explanation
+
+
+async def stream_simulation_explanation(simulation_record: dict, audience: str,
+                                        use_cache=True, fused=False, timeout=None):
+    """
+    Streams the final explanation token by token.
+
+    Two-step mode still waits for the analysis, then streams the
+    explanation; fused=True streams from the first generated token.
+    A cached explanation is yielded whole. The full text is cached once
+    the stream completes.
+
+    Raises asyncio.TimeoutError when the first token (including the wait
+    for an LLM slot and the analysis) or any later one takes longer than
+    `timeout` seconds.
+    """
+
+    cache = get_cache() if use_cache else None
+    key = explanation_key(simulation_record, audience, _model_key(fused))
+
+    if cache is not None:
+        cached = await cache.aget(key)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+
+    tokens = _stream_tokens(simulation_record, audience, fused)
+    try:
+        while True:
+            try:
+                token = await asyncio.wait_for(anext(tokens), timeout)
+            except StopAsyncIteration:
+                break
+            parts.append(token)
+            yield token
+    finally:
+        await tokens.aclose()
+
+    if cache is not None:
+        await cache.aset(key, "".join(parts))
+
+
+async def _stream_tokens(simulation_record, audience, fused):
+    async with _get_limiter():
+        if fused:
+            tokens = fused_chain_stream(simulation_record, audience)
+        else:
+            analysis = await analysis_chain_async(simulation_record)
+            tokens = explanation_chain_stream(analysis=analysis, audience=audience)
+
+        async for token in tokens:
+            yield token
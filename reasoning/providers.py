@@ -0,0 +1,105 @@
+"""
+LLM backends that need no model server.
+
+Both expose the subset of the chat model interface the chains use:
+invoke / ainvoke returning an object with `.content`, and astream
+yielding such chunks.
+"""
+import asyncio
+import re
+import time
+
+
+class Message:
+    def __init__(self, content):
+        self.content = content
+
+
+class _LocalLLM:
+    def render(self, prompt):
+        raise NotImplementedError
+
+    def invoke(self, prompt):
+        return Message(self.render(prompt))
+
+    async def ainvoke(self, prompt):
+        return self.invoke(prompt)
+
+    async def astream(self, prompt):
+        for word in re.findall(r"\S+\s*", self.render(prompt)):
+            yield Message(word)
+
+
+_FIELD = re.compile(
+    r"'(risk_level|signal_score|decision|engine_explanation|pressure)':\s*'?([^',}]+)'?"
+)
+
+
+class TemplateLLM(_LocalLLM):
+    """
+    Deterministic explanations rendered from the record fields in the
+    prompt. Explanation prompts echo the analysis they were given.
+    """
+
+    def render(self, prompt):
+        fields = dict(_FIELD.findall(prompt))
+
+        if not fields and "Analysis:" in prompt:
+            analysis = prompt.split("Analysis:", 1)[1]
+            return analysis.split("Constraints:", 1)[0].strip()
+
+        return (
+            f"Decision {fields.get('decision', 'UNKNOWN')} was made by the rule engine: "
+            f"{fields.get('engine_explanation', 'no engine explanation recorded')}. "
+            f"Patient risk level {fields.get('risk_level', 'unknown')} "
+            f"(signal score {fields.get('signal_score', 'n/a')}), "
+            f"hospital pressure {fields.get('pressure', 'n/a')}."
+        )
+
+
+class StubLLM(_LocalLLM):
+    """
+    Fixed reply for tests; records every prompt it receives.
+    `latency` seconds are spent per call (slept, not computed) to stand
+    in for a model server; `peak` is the most calls seen at once.
+    """
+
+    def __init__(self, reply="stub explanation", latency=0.0):
+        self.reply = reply
+        self.latency = latency
+        self.prompts = []
+        self.active = 0
+        self.peak = 0
+
+    def render(self, prompt):
+        self.prompts.append(prompt)
+        return self.reply
+
+    def _enter(self):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+
+    def invoke(self, prompt):
+        self._enter()
+        try:
+            time.sleep(self.latency)
+            return super().invoke(prompt)
+        finally:
+            self.active -= 1
+
+    async def ainvoke(self, prompt):
+        self._enter()
+        try:
+            await asyncio.sleep(self.latency)
+            return Message(self.render(prompt))
+        finally:
+            self.active -= 1
+
+    async def astream(self, prompt):
+        self._enter()
+        try:
+            await asyncio.sleep(self.latency)
+            async for chunk in super().astream(prompt):
+                yield chunk
+        finally:
+            self.active -= 1
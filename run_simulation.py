@@ -1,9 +1,11 @@
+import jivy_metrics as metrics
+from hospital_flow_engine.results import SimulationIndex
 from hospital_flow_engine.simulate import run_simulation
-from reasoning.post_simulation_chain import explain_simulation_output
 
 
 def main():
-    outputs = run_simulation()
+    outputs, stage_metrics = run_simulation(with_metrics=True)
+    index = SimulationIndex(outputs)
 
     print("\n=== SIMULATION OUTPUTS (Final State per Patient) ===")
     for o in outputs:
@@ -16,6 +18,12 @@ def main():
             f"Why={o['engine_explanation']}"
         )
 
+    # JIVY_METRICS=1: where the run spent its time
+    if metrics.enabled():
+        print("\n=== STAGE TIMINGS (ms) ===")
+        for stage, m in stage_metrics["stages"].items():
+            print(f"{stage:20} calls={m['calls']:<6} total={m['total_ms']:.2f} mean={m['mean_ms']:.4f}")
+
     # 🔁 Interactive loop
     while True:
         patient_id = input(
@@ -27,10 +35,8 @@ def main():
             break
 
         # Find matching patient record
-        selected = next(
-            (o for o in outputs if o["patient_id"] == patient_id),
-            None
-        )
+        positions, _ = index.query(patient_id=patient_id, limit=1)
+        selected = outputs[positions[0]] if positions else None
 
         if not selected:
             print(f"No record found for patient {patient_id}")
@@ -39,6 +45,9 @@ def main():
         print("\n=== SELECTED OUTPUT FOR REASONING ===")
         print(selected)
 
+        # Imported on first use so the simulation itself never loads the LLM stack
+        from reasoning.post_simulation_chain import explain_simulation_output
+
         reasoning = explain_simulation_output(
             simulation_record=selected,
             audience="doctor"
@@ -0,0 +1,251 @@
+"""
+Engine hot-path benchmarks on synthetic cohorts.
+Run from project root:
+    python scripts/bench_engine.py [--sizes 1k,100k,10M] [--out bench.json]
+                                   [--compare previous.json]
+
+For each cohort size, generates patients and a hospital network shaped
+like the bundled data (hospital_flow_engine/synthetic.py) and measures:
+- RiskAgent.observe + update per row, and score_frame for the cohort
+- compute_pressure per hospital state and over the whole network
+- decide per row, and decide_many for the cohort
+- HospitalResourceModel loading from CSV
+- end-to-end simulate_frame (the run_simulation pipeline)
+
+Per-call cases record latency percentiles over up to --max-calls calls;
+every case records throughput and, unless --no-memory, peak traced
+memory from a separate run. Results are saved as JSON; --compare
+prints the change against an earlier results file.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from hospital_flow_engine.engine.decision_engine import decide, decide_many  # noqa: E402
+from hospital_flow_engine.engine.pressure_engine import compute_pressure  # noqa: E402
+from hospital_flow_engine.engine.resource_model import HospitalResourceModel  # noqa: E402
+from hospital_flow_engine.engine.risk_engine import RiskAgent  # noqa: E402
+from hospital_flow_engine.simulate import load_patients, run_simulation, simulate_frame  # noqa: E402
+from hospital_flow_engine.synthetic import generate_cohort, generate_network  # noqa: E402
+
+
+SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+# Hospitals in the synthetic network; snapshots grow with the cohort
+HOSPITALS = 500
+MAX_SNAPSHOTS = 2000
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    if text[-1] in SUFFIXES:
+        return int(float(text[:-1]) * SUFFIXES[text[-1]])
+    return int(text)
+
+
+def _percentiles(latencies_ns):
+    values = np.asarray(latencies_ns) / 1_000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50_us": float(p50), "p95_us": float(p95), "p99_us": float(p99)}
+
+
+def _peak_mb(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(fn, units, memory=True):
+    """
+    Time one whole-batch call of `fn` processing `units` items.
+    """
+    t = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - t
+
+    result = {"units": units, "seconds": seconds, "per_second": units / seconds}
+    if memory:
+        result["peak_mb"] = _peak_mb(fn)
+    return result
+
+
+def run_calls(fn, args, memory=True):
+    """
+    Time `fn(*a)` for every `a` in `args`, keeping per-call latencies.
+    """
+    def calls():
+        for a in args:
+            fn(*a)
+
+    latencies = np.empty(len(args), dtype=np.int64)
+    clock = time.perf_counter_ns
+    for i, a in enumerate(args):
+        t = clock()
+        fn(*a)
+        latencies[i] = clock() - t
+
+    seconds = latencies.sum() / 1e9
+    result = {"units": len(args), "seconds": seconds, "per_second": len(args) / seconds}
+    result.update(_percentiles(latencies))
+    if memory:
+        result["peak_mb"] = _peak_mb(calls)
+    return result
+
+
+def bench_size(rows, max_calls, memory):
+    snapshots = min(max(1, rows // HOSPITALS), MAX_SNAPSHOTS)
+    static, state = generate_network(HOSPITALS, snapshots)
+    patients = generate_cohort(rows, hospital_ids=pd.unique(state["hospital_id"]))
+    results = {"rows": len(patients), "hospitals": HOSPITALS, "snapshots": snapshots}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        static_path = Path(tmp) / "static.csv"
+        state_path = Path(tmp) / "state.csv"
+        static.to_csv(static_path, index=False)
+        state.to_csv(state_path, index=False)
+
+        results["resource_model_load"] = run_case(
+            lambda: HospitalResourceModel(static_path, state_path), len(state), memory
+        )
+        model = HospitalResourceModel(static_path, state_path)
+
+    sample = patients.iloc[:max_calls]
+    sample_rows = sample.to_dict("records")
+
+    # ---- Risk agent ----
+    def observe_update(agent, row):
+        agent.observe(row)
+        agent.update(row["patient_id"])
+
+    agent = RiskAgent(window_size=5)
+    results["risk_observe_update"] = run_calls(
+        observe_update, [(agent, row) for row in sample_rows], memory=False
+    )
+    if memory:
+        fresh = RiskAgent(window_size=5)
+        results["risk_observe_update"]["peak_mb"] = _peak_mb(
+            lambda: [observe_update(fresh, row) for row in sample_rows]
+        )
+
+    results["risk_score_frame"] = run_case(
+        lambda: RiskAgent(window_size=5).score_frame(patients), len(patients), memory
+    )
+
+    # ---- Pressure ----
+    state_rows = [(row, row) for row in state.iloc[:max_calls].to_dict("records")]
+    results["compute_pressure"] = run_calls(compute_pressure, state_rows, memory)
+    results["compute_pressure_array"] = run_case(
+        lambda: compute_pressure(state, state), len(state), memory
+    )
+
+    # ---- Decisions ----
+    scored = RiskAgent(window_size=5).score_frame(patients)
+    risk_states = scored[["risk_level", "signal_score", "confidence", "reasons"]].to_dict("records")
+    resource_states = [
+        model.resource_state_at(ts, hid)
+        for ts, hid in zip(
+            patients.loc[scored.index, "timestamp"], patients.loc[scored.index, "hospital_id"]
+        )
+    ]
+    pairs = list(zip(risk_states, resource_states))
+
+    results["decide"] = run_calls(decide, pairs[:max_calls], memory)
+    results["decide_many"] = run_case(
+        lambda: decide_many(risk_states, resource_states), len(pairs), memory
+    )
+
+    # ---- End to end ----
+    results["simulate_frame"] = run_case(
+        lambda: simulate_frame(patients, model), len(patients), memory
+    )
+
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True,
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "commit": commit,
+        "time": pd.Timestamp.now().isoformat(),
+    }
+
+
+def compare(current, previous):
+    """
+    Print throughput / latency change per case against an older run.
+    """
+    print(f"\n{'size':>10} {'case':24} {'per_second':>12} {'p50':>8}")
+    for size, cases in current["results"].items():
+        old_cases = previous["results"].get(size, {})
+        for case, result in cases.items():
+            old = old_cases.get(case)
+            if not isinstance(result, dict) or not isinstance(old, dict):
+                continue
+            speed = result["per_second"] / old["per_second"] - 1
+            p50 = ""
+            if "p50_us" in result and "p50_us" in old:
+                p50 = f"{result['p50_us'] / old['p50_us'] - 1:+.0%}"
+            print(f"{size:>10} {case:24} {speed:+12.0%} {p50:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", default="1k,100k",
+                        help="comma-separated cohort rows, e.g. 1k,100k,10M")
+    parser.add_argument("--max-calls", type=int, default=100_000,
+                        help="cap on timed per-call invocations")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the peak memory runs")
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None)
+    args = parser.parse_args()
+
+    report = {"environment": environment(), "results": {}}
+
+    # Bundled data through the real entry point
+    report["results"]["bundled"] = {
+        "run_simulation": run_case(run_simulation, len(load_patients()), not args.no_memory)
+    }
+
+    for text in args.sizes.split(","):
+        rows = parse_size(text)
+        print(f"benchmarking {rows} rows ...", file=sys.stderr)
+        report["results"][str(rows)] = bench_size(rows, args.max_calls, not args.no_memory)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(text)
+    print(text)
+
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
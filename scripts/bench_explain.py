@@ -0,0 +1,121 @@
+"""
+Explanation endpoint under load, against a stub LLM with injected latency.
+Run from project root:
+    python scripts/bench_explain.py [--clients 32] [--latency 0.5]
+                                    [--concurrency 2] [--polls 200]
+
+Drives the FastAPI app in-process (no model server, no network):
+1. /api/simulation/run polled --polls times on an idle app (baseline)
+2. the same polling (kept up until the last one answers) while
+   --clients distinct /api/reasoning/explain requests wait on a StubLLM
+   that sleeps --latency seconds per call
+
+Reports simulation p50 / p95 / p99 for both phases, explain latency,
+and the most LLM calls the stub saw at once (must not exceed
+--concurrency). Exits non-zero if the simulation p99 under load is more
+than --slack times the idle p99 or the concurrency bound was broken.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Keep the explanation cache in memory so runs never hit earlier results
+os.environ["JIVY_EXPLAIN_CACHE_PATH"] = ""
+
+import httpx  # noqa: E402
+
+from backend.main import app  # noqa: E402
+from reasoning import llm  # noqa: E402
+from reasoning.post_simulation_chain import configure_concurrency  # noqa: E402
+from reasoning.providers import StubLLM  # noqa: E402
+
+
+def _percentiles(latencies):
+    p50, p95, p99 = np.percentile(np.asarray(latencies) * 1e3, [50, 95, 99])
+    return {"p50_ms": p50, "p95_ms": p95, "p99_ms": p99}
+
+
+def _print_row(name, stats):
+    print(f"{name:30} " + "  ".join(f"{k}={v:9.2f}" for k, v in stats.items()))
+
+
+async def _poll(client, polls, busy=None):
+    """
+    Latencies of `polls` requests, continuing while any `busy` task runs.
+    """
+    latencies = []
+    while len(latencies) < polls or (busy and not all(t.done() for t in busy)):
+        start = time.perf_counter()
+        response = await client.get("/api/simulation/run")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def _explain(client, i):
+    record = {"patient_id": f"BENCH{i:05d}", "decision": "OBSERVE",
+              "engine_explanation": "Risk stable"}
+    start = time.perf_counter()
+    response = await client.post("/api/reasoning/explain", json={"simulation_record": record})
+    body = response.json()
+    if not body.get("llm_available"):
+        raise RuntimeError(f"explain fell back: {body['explanation']!r}")
+    return time.perf_counter() - start
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm-up: first call builds the simulation session
+        await _poll(client, 3)
+        idle = await _poll(client, args.polls)
+
+        explains = [asyncio.ensure_future(_explain(client, i)) for i in range(args.clients)]
+        await asyncio.sleep(0)
+        loaded = await _poll(client, args.polls, busy=explains)
+        explained = await asyncio.gather(*explains)
+
+    return idle, loaded, explained
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Explain endpoint load benchmark")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--polls", type=int, default=200)
+    parser.add_argument("--slack", type=float, default=3.0)
+    args = parser.parse_args()
+
+    stub = StubLLM(latency=args.latency)
+    llm.register_provider("bench-stub", lambda: stub)
+    llm.set_provider("bench-stub")
+    configure_concurrency(args.concurrency)
+
+    idle, loaded, explained = asyncio.run(run(args))
+
+    idle_stats, loaded_stats = _percentiles(idle), _percentiles(loaded)
+    _print_row("simulation/run idle", idle_stats)
+    _print_row("simulation/run, LLM busy", loaded_stats)
+    _print_row("reasoning/explain", _percentiles(explained))
+    print(f"LLM calls: {len(stub.prompts)}, peak concurrent {stub.peak} "
+          f"(limit {args.concurrency})")
+
+    ok = (
+        loaded_stats["p99_ms"] <= args.slack * max(idle_stats["p99_ms"], 1.0)
+        and stub.peak <= args.concurrency
+    )
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Import-time benchmark: engine-only vs reasoning startup.
+Run from project root: python scripts/bench_startup.py
+Each case runs in a fresh interpreter; reports wall time of the imports
+and whether langchain was loaded.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RUNS = 5
+
+CASES = {
+    "engine only": "import hospital_flow_engine.simulate",
+    "run_simulation entry point": "import run_simulation",
+    "reasoning (lazy LLM)": "import reasoning.post_simulation_chain",
+    "reasoning + first LLM use": (
+        "import reasoning.post_simulation_chain; "
+        "from reasoning.llm import get_llm; get_llm()"
+    ),
+}
+
+PROBE = """
+import sys, time
+t = time.perf_counter()
+{stmt}
+elapsed = time.perf_counter() - t
+loaded = any(m.startswith("langchain") for m in sys.modules)
+print(f"{{elapsed * 1000:.1f}} {{loaded}}")
+"""
+
+
+def measure(stmt):
+    times = []
+    loaded = False
+    for _ in range(RUNS):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(stmt=stmt)],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        if out.returncode != 0:
+            return None, out.stderr.strip().splitlines()[-1]
+        ms, flag = out.stdout.split()
+        times.append(float(ms))
+        loaded = flag == "True"
+    return sorted(times)[len(times) // 2], loaded
+
+
+def main():
+    print(f"{'case':32} {'median ms':>10}  langchain loaded")
+    for name, stmt in CASES.items():
+        ms, loaded = measure(stmt)
+        if ms is None:
+            print(f"{name:32} {'error':>10}  {loaded}")
+        else:
+            print(f"{name:32} {ms:10.1f}  {loaded}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Shared fixtures: a synthetic hospital network and a patient cohort
+spread over it (hospital_flow_engine/synthetic.py), and its records
+from the original per-row loop as the reference.
+"""
+import pandas as pd
+import pytest
+
+from hospital_flow_engine.engine.resource_model import HospitalResourceModel
+from hospital_flow_engine.simulate import simulate_frame
+from hospital_flow_engine.synthetic import generate_cohort, generate_network
+
+
+@pytest.fixture(scope="session")
+def network(tmp_path_factory):
+    static, state = generate_network(12, snapshots=300, seed=5)
+    tmp = tmp_path_factory.mktemp("network")
+    static.to_csv(tmp / "static.csv", index=False)
+    state.to_csv(tmp / "state.csv", index=False)
+    model = HospitalResourceModel(tmp / "static.csv", tmp / "state.csv")
+    return model, pd.unique(state["hospital_id"])
+
+
+@pytest.fixture(scope="session")
+def cohort(network):
+    _, hospital_ids = network
+    # Interleave patients in time order, as a live feed would
+    patients = generate_cohort(4000, hospital_ids=hospital_ids, seed=11)
+    return patients.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+
+@pytest.fixture(scope="session")
+def per_row(cohort, network):
+    return simulate_frame(cohort, network[0], batch=False)
@@ -0,0 +1,72 @@
+"""
+Explain endpoints fall back to the engine explanation instead of failing.
+
+Run from project root:
+    python -m pytest -q tests
+"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.main as backend
+from reasoning import llm
+from reasoning.post_simulation_chain import configure_concurrency
+from reasoning.providers import StubLLM
+
+
+RECORD = {"patient_id": "P0001", "decision": "OBSERVE", "engine_explanation": "Risk stable"}
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setenv("JIVY_EXPLAIN_CACHE_PATH", "")
+    monkeypatch.setattr(backend, "_explanation_cache", None)
+    configure_concurrency(2)
+    yield TestClient(backend.app)
+    llm.set_provider(llm.DEFAULT_PROVIDER)
+
+
+def _use_stub(stub):
+    llm.register_provider("test-stub", lambda: stub)
+    llm.set_provider("test-stub")
+
+
+def _events(response):
+    events = []
+    for message in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in message.split("\n"))
+        events.append((lines.get("event"), json.loads(lines["data"])))
+    return events
+
+
+def test_unopenable_cache_falls_back(client, monkeypatch, tmp_path):
+    _use_stub(StubLLM())
+    monkeypatch.setenv("JIVY_EXPLAIN_CACHE_PATH", str(tmp_path / "missing" / "cache.db"))
+
+    body = client.post("/api/reasoning/explain", json={"simulation_record": RECORD}).json()
+    assert body["llm_available"] is False
+    assert body["explanation"].startswith("Risk stable")
+
+    events = _events(client.post("/api/reasoning/explain/stream",
+                                 json={"simulation_record": RECORD}))
+    assert [event for event, _ in events] == ["fallback"]
+
+
+def test_stream_times_out_to_fallback(client, monkeypatch):
+    _use_stub(StubLLM(latency=5))
+    monkeypatch.setattr(backend, "LLM_TIMEOUT", 0.05)
+
+    events = _events(client.post("/api/reasoning/explain/stream",
+                                 json={"simulation_record": RECORD, "fused": True}))
+    assert [event for event, _ in events] == ["fallback"]
+    assert "timed out" in events[0][1]["explanation"]
+
+
+def test_stream_sends_tokens_then_end(client):
+    _use_stub(StubLLM(reply="all good"))
+
+    events = _events(client.post("/api/reasoning/explain/stream",
+                                 json={"simulation_record": RECORD, "fused": True}))
+    assert [event for event, _ in events] == [None, None, "end"]
+    assert "".join(data["token"] for event, data in events if event is None) == "all good"
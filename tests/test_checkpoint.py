@@ -0,0 +1,82 @@
+"""
+Checkpointed streaming: interrupted and resumed runs against one full run.
+
+Run from project root:
+    python -m pytest -q tests
+"""
+import numpy as np
+import pytest
+
+from hospital_flow_engine import checkpoint
+from hospital_flow_engine.checkpoint import (
+    iter_checkpointed_simulation,
+    load_checkpoint,
+    save_checkpoint,
+)
+from hospital_flow_engine.engine.risk_engine import RiskAgent
+from hospital_flow_engine.simulate import DATA_DIR, iter_simulation
+
+
+SOURCE = DATA_DIR / "heart_attack_temporal_5steps.csv"
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    # Several blocks (and so several checkpoints) over the bundled cohort
+    monkeypatch.setattr(checkpoint, "BLOCK_BYTES", 2048)
+
+
+def _assert_same_state(a, b):
+    a, b = a.state_arrays(), b.state_arrays()
+    assert sorted(a) == sorted(b)
+    for name in a:
+        assert np.array_equal(np.asarray(a[name]), np.asarray(b[name])), name
+
+
+def test_resume_after_interruption_matches_full_run(tmp_path, small_blocks):
+    full_path = tmp_path / "full.npz"
+    full = list(iter_checkpointed_simulation(SOURCE, full_path))
+    assert full == list(iter_simulation(SOURCE))
+
+    path = tmp_path / "agent.npz"
+    stream = iter_checkpointed_simulation(SOURCE, path, every_rows=1)
+    before = [record for _, record in zip(range(len(full) // 2), stream)]
+    stream.close()
+
+    assert load_checkpoint(path).rows < load_checkpoint(full_path).rows
+    after = list(iter_checkpointed_simulation(SOURCE, path, every_rows=1))
+
+    # Rows between the last checkpoint and the interruption are replayed
+    replayed = len(before) + len(after) - len(full)
+    assert replayed >= 0
+    assert before[:len(before) - replayed] + after == full
+    _assert_same_state(load_checkpoint(path).risk_agent, load_checkpoint(full_path).risk_agent)
+
+
+def test_partial_last_line_waits_for_the_rest(tmp_path, small_blocks):
+    data = SOURCE.read_bytes()
+    cut = data.index(b",", len(data) // 2)   # mid-line
+    source = tmp_path / "patients.csv"
+    source.write_bytes(data[:cut])
+    path = tmp_path / "agent.npz"
+
+    before = list(iter_checkpointed_simulation(source, path))
+    saved = load_checkpoint(path)
+    assert data[:saved.byte_offset].endswith(b"\n")
+    assert saved.byte_offset <= cut
+
+    source.write_bytes(data)
+    after = list(iter_checkpointed_simulation(source, path))
+
+    assert before + after == list(iter_simulation(SOURCE))
+
+
+def test_restored_hit_counters_match_live_agent(tmp_path):
+    agent = RiskAgent(window_size=5, incremental=True)
+    list(iter_simulation(SOURCE, risk_agent=agent))
+
+    path = tmp_path / "agent.npz"
+    save_checkpoint(path, agent)
+    restored = load_checkpoint(path).risk_agent
+
+    assert dict(restored.patient_hits) == dict(agent.patient_hits)
@@ -0,0 +1,79 @@
+"""
+DecisionLogWriter queue policy and writer-thread failures.
+
+Run from project root:
+    python -m pytest -q tests
+"""
+import threading
+
+import pytest
+
+from hospital_flow_engine.event_log import DecisionLogReader, DecisionLogWriter
+
+
+RISK_STATE = {"risk_level": "LOW", "signal_score": 0.1, "confidence": 1.0, "reasons": []}
+RESOURCE_STATE = {"pressure": 0.5, "icu_full": False}
+
+
+def _append(log, i):
+    log.append(f"2024-01-01 00:00:{i % 60:02d}", f"P{i:04d}", "H1",
+               RISK_STATE, RESOURCE_STATE, "OBSERVE", "Risk stable")
+
+
+def _stall(log):
+    """
+    Hold the writer thread inside its next write until released.
+    """
+    release = threading.Event()
+    write = log._write
+
+    def slow_write(item):
+        release.wait()
+        write(item)
+
+    log._write = slow_write
+    return release
+
+
+def test_block_policy_keeps_every_event(tmp_path):
+    with DecisionLogWriter(tmp_path, max_queued=4) as log:
+        for i in range(200):
+            _append(log, i)
+
+    assert log.dropped == 0
+    assert len(list(DecisionLogReader(tmp_path).query())) == 200
+
+
+def test_drop_policy_counts_dropped_events(tmp_path):
+    log = DecisionLogWriter(tmp_path, max_queued=4, when_full="drop")
+    release = _stall(log)
+
+    for i in range(20):
+        _append(log, i)
+    release.set()
+    log.close()
+
+    written = len(list(DecisionLogReader(tmp_path).query()))
+    assert log.dropped > 0
+    assert written + log.dropped == 20
+
+
+def test_append_raises_once_writer_has_died(tmp_path):
+    log = DecisionLogWriter(tmp_path)
+
+    def fail(item):
+        raise OSError("disk full")
+
+    log._write = fail
+    _append(log, 0)
+    log._thread.join()
+
+    with pytest.raises(OSError, match="disk full"):
+        _append(log, 1)
+    with pytest.raises(OSError, match="disk full"):
+        log.close()
+
+
+def test_unknown_full_policy_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        DecisionLogWriter(tmp_path, when_full="spill")
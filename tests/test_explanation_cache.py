@@ -0,0 +1,73 @@
+"""
+Two-tier explanation cache: disk persistence, LRU trimming, async access.
+
+Run from project root:
+    python -m pytest -q tests
+"""
+import asyncio
+
+from reasoning.cache import ExplanationCache
+
+
+def _disk_keys(cache):
+    return {key for (key,) in cache._db.execute("SELECT key FROM explanations")}
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = tmp_path / "cache.db"
+    ExplanationCache(path=path).set("a", "explained")
+
+    cache = ExplanationCache(path=path)
+    assert cache.get("a") == "explained"
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.stats()["disk_entries"] == 1
+
+
+def test_trims_least_recently_used_past_limit(tmp_path):
+    cache = ExplanationCache(max_entries=1, path=tmp_path / "cache.db",
+                             max_disk_entries=3)
+    for key in "abc":
+        cache.set(key, key)
+
+    # Read "a" from disk (memory holds only "c"): it is now recently used
+    assert cache.get("a") == "a"
+    cache.set("d", "d")
+
+    assert _disk_keys(cache) == {"a", "c", "d"}
+    assert cache.stats()["disk_entries"] == 3
+
+
+def test_disk_reads_do_not_write(tmp_path):
+    cache = ExplanationCache(max_entries=1, path=tmp_path / "cache.db")
+    cache.set("a", "a")
+    cache.set("b", "b")
+
+    before = cache._db.total_changes
+    assert cache.get("a") == "a"
+    assert cache._db.total_changes == before
+
+    cache.flush()
+    assert cache._db.total_changes == before + 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ExplanationCache(path=tmp_path / "cache.db", ttl_seconds=-1)
+    cache.set("a", "a")
+
+    assert cache.get("a") is None
+    cache.flush()
+    assert _disk_keys(cache) == set()
+    assert cache.stats()["disk_entries"] == 0
+
+
+def test_async_access_matches_sync(tmp_path):
+    path = tmp_path / "cache.db"
+
+    async def roundtrip():
+        cache = ExplanationCache(max_entries=1, path=path)
+        await cache.aset("a", "A")
+        await cache.aset("b", "B")
+        return await cache.aget("a"), await cache.aget("missing")
+
+    assert asyncio.run(roundtrip()) == ("A", None)
+    assert ExplanationCache(path=path).get("b") == "B"
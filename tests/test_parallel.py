@@ -0,0 +1,26 @@
+"""
+Sharded process-pool runs against the serial run, record for record
+and in input row order after the merge.
+
+Run from project root:
+    python -m pytest -q tests
+"""
+import pytest
+
+from hospital_flow_engine.parallel import run_simulation_parallel, shard_of
+from hospital_flow_engine.simulate import run_simulation
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_parallel_matches_serial_in_row_order(cohort, network, per_row, workers):
+    # Patients are interleaved in time order, so every shard holds rows
+    # scattered across the input and the merge has to restore the order
+    assert len(set(shard_of(cohort["patient_id"][:50], workers))) == workers
+
+    records = run_simulation_parallel(workers=workers, patients=cohort,
+                                      resource_model=network[0])
+    assert records == [record for _, record in per_row]
+
+
+def test_parallel_matches_run_simulation():
+    assert run_simulation_parallel(workers=2) == run_simulation()
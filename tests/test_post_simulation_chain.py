@@ -0,0 +1,51 @@
+"""
+Async explanation pipeline against a stub LLM.
+
+Run from project root:
+    python -m pytest -q tests
+"""
+import asyncio
+
+import pytest
+
+from reasoning import llm
+from reasoning.post_simulation_chain import (
+    configure_concurrency,
+    explain_simulation_output_async,
+)
+from reasoning.providers import StubLLM
+
+
+@pytest.fixture
+def stub():
+    stub = StubLLM(latency=0.01)
+    llm.register_provider("test-stub", lambda: stub)
+    llm.set_provider("test-stub")
+    configure_concurrency(2)
+    yield stub
+    llm.set_provider(llm.DEFAULT_PROVIDER)
+
+
+async def _explain_all(count, same_record=False):
+    records = [{"patient_id": "P0" if same_record else f"P{i}"} for i in range(count)]
+    return await asyncio.gather(*(
+        explain_simulation_output_async(record, "doctor", use_cache=False)
+        for record in records
+    ))
+
+
+def test_concurrency_is_bounded(stub):
+    assert asyncio.run(_explain_all(8)) == ["stub explanation"] * 8
+    assert stub.peak <= 2
+
+
+def test_each_event_loop_gets_its_own_limiter(stub):
+    # The semaphore and in-flight map must not stay bound to the first loop
+    for _ in range(3):
+        assert asyncio.run(_explain_all(6)) == ["stub explanation"] * 6
+
+
+def test_identical_requests_share_one_run(stub):
+    asyncio.run(_explain_all(5, same_record=True))
+    # One analysis + one explanation call
+    assert len(stub.prompts) == 2
@@ -0,0 +1,219 @@
+"""
+The rule tables against frozen copies of the if-chains they replaced
+(hospital_flow_engine decide() and the baseline runner), over grids that
+hit every threshold exactly.
+
+Run from project root:
+    python -m pytest -q tests
+"""
+import itertools
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from baseline_model.baseline_runner import (
+    CONFIG_DIR,
+    compute_risk,
+    compute_risk_frame,
+    decide_action,
+    decide_actions,
+)
+from hospital_flow_engine.engine.decision_engine import decide, decide_many, set_decision_rules
+
+
+# --------------------------------------------------
+# Frozen copies of the original logic
+# --------------------------------------------------
+def old_decide(risk_state, resource_state):
+    pressure = resource_state["pressure"]
+    icu_full = resource_state.get("icu_full", False)
+
+    risk_level = risk_state["risk_level"]
+    confidence = risk_state.get("confidence", 1.0)
+    reasons = risk_state.get("reasons", [])
+
+    worsening = any(r in reasons for r in [
+        "worsening_heart_rate",
+        "falling_blood_pressure",
+        "rising_troponin_trend",
+        "rising_ck_mb_trend"
+    ])
+
+    if pressure >= 0.9:
+        return "BLOCK", "Hospital at critical capacity"
+
+    if risk_level == "CRITICAL":
+        if icu_full:
+            return "ESCALATE", "Critical risk but ICU unavailable"
+        return "PRIORITIZE", "Critical patient prioritized"
+
+    if risk_level == "HIGH":
+        if worsening and confidence >= 0.8:
+            return "PRIORITIZE", "High risk with worsening trends"
+        if pressure >= 0.75:
+            return "DELAY", "High risk but system overloaded"
+        return "ALLOW", "High risk, resources available"
+
+    if risk_level == "MODERATE":
+        if worsening:
+            return "OBSERVE", "Moderate risk with early deterioration"
+        return "ALLOW", "Moderate risk stable"
+
+    return "OBSERVE", "Risk stable"
+
+
+def old_compute_risk(row):
+    if (
+        row["spo2"] < 90
+        or row["heart_rate"] > 120
+        or row["systolic_bp"] < 90
+    ):
+        return "HIGH"
+
+    if (
+        90 <= row["spo2"] <= 94
+        or 100 <= row["heart_rate"] <= 120
+    ):
+        return "MEDIUM"
+
+    return "LOW"
+
+
+with open(CONFIG_DIR / "baseline_decision_map.json") as f:
+    DECISION_MAP = json.load(f)
+
+
+def old_decide_action(risk, icu_beds):
+    action = DECISION_MAP[risk]
+
+    if action == "ESCALATE" and icu_beds == 0:
+        return "PRIORITIZE"
+
+    return action
+
+
+# --------------------------------------------------
+# Grids
+# --------------------------------------------------
+_MISSING = object()
+
+RISK_LEVELS = ["LOW", "MODERATE", "HIGH", "CRITICAL"]
+PRESSURES = [0.0, 0.5, 0.74, 0.7499, 0.75, 0.76, 0.89, 0.8999, 0.9, 0.91, 1.0]
+ICU_FULL = [True, False, _MISSING]
+CONFIDENCES = [0.0, 0.79, 0.7999, 0.8, 0.81, 1.0, _MISSING]
+REASONS = [
+    _MISSING,
+    [],
+    ["worsening_heart_rate"],
+    ["falling_blood_pressure"],
+    ["rising_troponin_trend"],
+    ["rising_ck_mb_trend"],
+    ["high_troponin"],
+    ["high_troponin", "rising_ck_mb_trend"],
+]
+
+
+def _decision_grid():
+    for risk_level, pressure, icu_full, confidence, reasons in itertools.product(
+        RISK_LEVELS, PRESSURES, ICU_FULL, CONFIDENCES, REASONS
+    ):
+        risk_state = {"risk_level": risk_level}
+        if confidence is not _MISSING:
+            risk_state["confidence"] = confidence
+        if reasons is not _MISSING:
+            risk_state["reasons"] = reasons
+
+        resource_state = {"pressure": pressure}
+        if icu_full is not _MISSING:
+            resource_state["icu_full"] = icu_full
+
+        yield risk_state, resource_state
+
+
+def _vitals_grid():
+    spo2 = [85, 89, 89.9, 90, 90.1, 92, 94, 94.1, 95, 99]
+    heart_rate = [60, 99, 99.9, 100, 110, 120, 120.1, 121, 140]
+    systolic_bp = [70, 89, 89.9, 90, 90.1, 120]
+    return pd.DataFrame(
+        list(itertools.product(spo2, heart_rate, systolic_bp)),
+        columns=["spo2", "heart_rate", "systolic_bp"],
+    )
+
+
+@pytest.fixture(autouse=True)
+def default_decision_rules():
+    set_decision_rules()
+    yield
+    set_decision_rules()
+
+
+# --------------------------------------------------
+# Decision engine
+# --------------------------------------------------
+def test_decide_matches_if_chain():
+    for risk_state, resource_state in _decision_grid():
+        assert decide(risk_state, resource_state) == old_decide(risk_state, resource_state), (
+            risk_state, resource_state
+        )
+
+
+def test_decide_many_matches_if_chain():
+    grid = list(_decision_grid())
+    risk_states = [risk for risk, _ in grid]
+    resource_states = [resource for _, resource in grid]
+
+    decisions, explanations = decide_many(risk_states, resource_states)
+    expected = [old_decide(risk, resource) for risk, resource in grid]
+
+    assert list(zip(decisions, explanations)) == expected
+
+
+def test_risk_state_shadows_resource_state():
+    risk_state = {"risk_level": "CRITICAL", "icu_full": True}
+    resource_state = {"pressure": 0.5, "icu_full": False}
+
+    assert decide(risk_state, resource_state)[0] == "ESCALATE"
+    assert decide_many([risk_state], [resource_state])[0] == ["ESCALATE"]
+
+
+def test_decide_needs_pressure_and_risk_level():
+    with pytest.raises(KeyError):
+        decide({"risk_level": "LOW"}, {})
+    with pytest.raises(KeyError):
+        decide({}, {"pressure": 0.5})
+
+
+def test_match_matches_compiled_matcher():
+    rules = set_decision_rules()
+    for risk_state, resource_state in _decision_grid():
+        values = dict(resource_state)
+        values.update(risk_state)
+        assert rules.match(values) is rules.matcher(2)(risk_state, resource_state)
+
+
+# --------------------------------------------------
+# Baseline runner
+# --------------------------------------------------
+def test_baseline_risk_matches_if_chain():
+    vitals = _vitals_grid()
+    expected = [old_compute_risk(row) for _, row in vitals.iterrows()]
+
+    assert [compute_risk(row) for _, row in vitals.iterrows()] == expected
+    assert [compute_risk(row) for row in vitals.to_dict("records")] == expected
+    assert compute_risk_frame(vitals).tolist() == expected
+
+
+def test_baseline_decisions_match_if_chain():
+    risks = list(DECISION_MAP)
+    beds = [0, 1, 5]
+    pairs = list(itertools.product(risks, beds))
+    expected = [old_decide_action(risk, icu_beds) for risk, icu_beds in pairs]
+
+    assert [decide_action(risk, icu_beds) for risk, icu_beds in pairs] == expected
+
+    vector = decide_actions(
+        np.array([risk for risk, _ in pairs]), np.array([b for _, b in pairs])
+    )
+    assert vector.tolist() == expected
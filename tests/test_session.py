@@ -0,0 +1,52 @@
+"""
+SimulationSession: full runs, appended tails and partial lines all give
+the records of one streaming pass over the complete rows.
+
+Run from project root:
+    python -m pytest -q tests
+"""
+import pytest
+
+from hospital_flow_engine.session import SimulationSession
+from hospital_flow_engine.simulate import DATA_DIR, iter_simulation
+from hospital_flow_engine.synthetic import generate_cohort
+
+
+@pytest.fixture(params=["bundled", "synthetic"])
+def patient_bytes(request, tmp_path):
+    if request.param == "bundled":
+        return (DATA_DIR / "heart_attack_temporal_5steps.csv").read_bytes()
+    path = tmp_path / "synthetic.csv"
+    generate_cohort(400, seed=3).to_csv(path, index=False)
+    return path.read_bytes()
+
+
+def _expected(tmp_path, data):
+    path = tmp_path / "expected.csv"
+    path.write_bytes(data)
+    return list(iter_simulation(path))
+
+
+def test_full_run_matches_streaming(tmp_path, patient_bytes):
+    path = tmp_path / "patients.csv"
+    path.write_bytes(patient_bytes)
+
+    session = SimulationSession(patients_path=path)
+    assert session.refresh()[0] == "full"
+    assert session.outputs == _expected(tmp_path, patient_bytes)
+
+
+def test_tail_after_full_run_matches_one_pass(tmp_path, patient_bytes):
+    # Cut mid-line: the partial row waits until it is complete
+    cut = patient_bytes.index(b",", len(patient_bytes) // 2)
+    path = tmp_path / "patients.csv"
+    path.write_bytes(patient_bytes[:cut])
+
+    session = SimulationSession(patients_path=path)
+    session.refresh()
+    complete = patient_bytes[:patient_bytes.rfind(b"\n", 0, cut) + 1]
+    assert session.outputs == _expected(tmp_path, complete)
+
+    path.write_bytes(patient_bytes)
+    assert session.refresh()[0] == "tail"
+    assert session.outputs == _expected(tmp_path, patient_bytes)
@@ -0,0 +1,62 @@
+"""
+Every single-process simulation path against the per-row loop: batch
+scoring and streaming, on bundled and synthetic data.
+
+Run from project root:
+    python -m pytest -q tests
+"""
+import itertools
+
+import numpy as np
+
+from hospital_flow_engine.engine.pressure_engine import compute_pressure
+from hospital_flow_engine.simulate import iter_simulation, run_simulation, simulate_frame
+
+
+def test_decisions_vary(per_row):
+    # Guard against a cohort too tame to exercise the rules
+    decisions = {record["decision"] for _, record in per_row}
+    assert len(decisions) >= 3
+
+
+def test_pressure_arrays_round_like_scalars():
+    # (icu occupied, icu total, ward occupied, ward total) around and on
+    # half-cents, including cases where np.round and round() disagree
+    pairs = [
+        (143, 143, 195, 400), (138, 144, 412, 412), (10, 48, 30, 30),
+        (81, 81, 299, 368), (5, 5, 78, 96), (91, 120, 242, 242),
+    ] + list(itertools.product(range(0, 49), [48, 144], range(0, 97), [96, 400]))
+    state = {
+        "icu_beds_occupied": np.array([p[0] for p in pairs]),
+        "ward_beds_occupied": np.array([p[2] for p in pairs]),
+    }
+    static = {
+        "icu_beds_total": np.array([p[1] for p in pairs]),
+        "ward_beds_total": np.array([p[3] for p in pairs]),
+    }
+    scalars = [
+        compute_pressure(
+            {"icu_beds_occupied": icu, "ward_beds_occupied": ward},
+            {"icu_beds_total": icu_total, "ward_beds_total": ward_total},
+        )
+        for icu, icu_total, ward, ward_total in pairs
+    ]
+    assert compute_pressure(state, static).tolist() == scalars
+
+    # The grid must include ties where plain np.round would disagree
+    raw = 0.6 * state["icu_beds_occupied"] / static["icu_beds_total"] \
+        + 0.4 * state["ward_beds_occupied"] / static["ward_beds_total"]
+    assert (np.round(np.minimum(raw, 1.0), 2) != np.array(scalars)).any()
+
+
+def test_batch_matches_per_row(cohort, network, per_row):
+    assert simulate_frame(cohort, network[0], batch=True) == per_row
+
+
+def test_streaming_matches_per_row(cohort, network, per_row):
+    streamed = list(iter_simulation(cohort, resource_model=network[0]))
+    assert streamed == [record for _, record in per_row]
+
+
+def test_run_simulation_batch_matches_per_row():
+    assert run_simulation(batch=True) == run_simulation(batch=False)